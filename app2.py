@@ -1,16 +1,49 @@
 # app.py
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
-import time
-from sklearn.linear_model import LinearRegression
-from sklearn.exceptions import NotFittedError
-from sklearn.model_selection import train_test_split
+import functools
+import os
+import uuid
+
+# Set STAFFSPHERE_MODEL_DIR to persist fitted models across restarts
+MODEL_DIR = os.environ.get("STAFFSPHERE_MODEL_DIR", "")
+# Set STAFFSPHERE_SNAPSHOT_DIR to keep every upload and chart trends across them
+SNAPSHOT_DIR = os.environ.get("STAFFSPHERE_SNAPSHOT_DIR", "")
+# Uploads at least this large (MB) default to streaming mode
+STREAMING_THRESHOLD_MB = float(os.environ.get("STAFFSPHERE_STREAMING_MB", "200"))
+# Memory budget (MB) for datasets shared across sessions; least recently used ones are dropped beyond it
+DATASET_BUDGET_MB = float(os.environ.get("STAFFSPHERE_DATASET_MB", "2048"))
+# Runs recorded by the sidebar profiler are appended here as JSON lines (empty disables the log)
+PROFILE_LOG = os.environ.get("STAFFSPHERE_PROFILE_LOG", "staffsphere_profile.jsonl")
 
 # ---------------------------- PAGE CONFIG ----------------------------
 st.set_page_config(page_title="StaffSphere | Employee Dashboard", layout="wide", page_icon="💼")
 
+# ---------------------------- PROFILER ----------------------------
+# Off by default. When on, every run is split into stages (prof.mark below) timed for wall clock and
+# peak traced memory; results show in a panel at the bottom of the page and go to PROFILE_LOG.
+from stage_profiler import StageProfiler, aggregate_stages, read_log, tracing_sessions
+
+if "profiler" not in st.session_state:
+    st.session_state["profiler"] = StageProfiler(PROFILE_LOG)
+prof = st.session_state["profiler"]
+profiling = st.sidebar.toggle("⏱️ Profile this dashboard", key="profiling")
+trace_memory = profiling and st.sidebar.checkbox(
+    "Trace peak memory (slows every stage, server-wide)", value=False, key="profiling_memory",
+    help="tracemalloc runs for the whole server process while any session traces memory")
+prof.configure(profiling, trace_memory)
+prof.begin("script")
+prof.mark("page & upload")
+
+def profiled(stage):
+    """Records a fragment's own reruns as a run of `stage`; during a full run the enclosing mark covers it."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with prof.run(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
 # ---------------------------- CSS STYLING ----------------------------
 st.markdown("""
 <style>
@@ -170,8 +203,13 @@ st.markdown("<div class='neon-title'>💼 StaffSphere</div>", unsafe_allow_html=
 st.markdown("<div class='slogan'>“Where employee performance meets clarity.”</div>", unsafe_allow_html=True)
 
 # ---------------------------- UPLOAD SECTION ----------------------------
-uploaded = st.file_uploader("📂 Upload Employee_Progress_Data CSV", type=["csv"])
-if not uploaded:
+data_source = st.radio("Data source", ["📂 Upload file", "🟢 Live (MasterEMS)"], horizontal=True, key="data_source",
+                       help="Live mode builds the dashboard from the MasterEMS records in the working directory")
+live_mode = data_source.startswith("🟢")
+uploaded = None
+if not live_mode:
+    uploaded = st.file_uploader("📂 Upload Employee_Progress_Data CSV", type=["csv", "parquet", "feather", "arrow"])
+if not live_mode and not uploaded:
     st.markdown("""
         <div style='text-align:center; margin-top:60px;'>
             <div style='display:inline-block; background:linear-gradient(90deg,#00ffd522,#9b59b622);
@@ -183,120 +221,342 @@ if not uploaded:
     """, unsafe_allow_html=True)
     st.stop()
 
-# ---------------------------- LOADING ANIMATION & LOAD DATA ----------------------------
-with st.spinner("✨ Processing your data... Please wait!"):
-    st.markdown("<div class='loading-dots'>Loading<span>.</span><span>.</span><span>.</span></div>", unsafe_allow_html=True)
-    time.sleep(1.2)  # small delay for animation visibility
-
-    df = pd.read_csv(uploaded)
-
-    # Validate required columns
-    required_cols = ["Tasks_Completed", "Tasks_Pending", "Efficiency_%", "Attendance_%", "Basic_Salary", "Name"]
-    for col in required_cols:
-        if col not in df.columns:
-            st.error(f"Missing required column: {col}")
-            st.stop()
-
-    # Derived metrics
-    df["Tasks_Assigned"] = df["Tasks_Completed"].fillna(0) + df["Tasks_Pending"].fillna(0)
-    # avoid division by zero
-    df["Progress_%"] = np.where(df["Tasks_Assigned"] > 0, df["Tasks_Completed"] / df["Tasks_Assigned"] * 100, 0)
-    df["Progress_%"] = df["Progress_%"].fillna(0)
-    # make sure numeric types
-    num_cols = ["Tasks_Completed", "Tasks_Pending", "Tasks_Assigned", "Efficiency_%", "Attendance_%", "Basic_Salary", "Progress_%"]
-    for c in num_cols:
-        df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0)
-
-# ---------------------------- SMART HIGHLIGHTS ----------------------------
-st.markdown("---")
-st.markdown("<h3 style='text-align:center;margin-bottom:20px;'>🌟 Smart Highlights</h3>", unsafe_allow_html=True)
-
-colH1, colH2, colH3 = st.columns(3)
+# ---------------------------- ANALYTICS STACK ----------------------------
+prof.mark("imports")
+# Imported behind the upload gate: the first page only needs streamlit. scikit-learn is deferred
+# further, to the first model fit (see forecasting.py / online_model.py).
+import pandas as pd
+import numpy as np
+import plotly.express as px
+from chart_data import DEFAULT_POINT_BUDGET, choose_render_mode, grid_bins, stratified_sample, top_n
+from dataset_registry import DatasetRegistry
+from forecasting import (FEATURE_COLS, FORECAST_COLS, PROJECTION_MONTHS, add_derived_metrics, dataset_fingerprint, forecast_frame,
+                         load_or_train_model, predict_efficiency, project_efficiency, scenario_sweep)
+from group_ranks import ORGANIZATION, GroupRanker, ordinal
+from name_index import NameIndex
+from olap_cube import AggregationCube
+from online_model import OnlineEfficiencyModel
+from predictions_export import EXPORT_FORMATS, export_bytes, export_file_name
+from progress_schema import REQUIRED_COLS, iter_progress_chunks, nullable_ints, read_progress, source_fingerprint
+from progress_validation import ProgressValidator, validate_progress
+from snapshot_store import TREND_MEASURES, SnapshotStore, department_trend, rolling_stats
+from streaming_kpis import ProgressAggregator, summarize_progress
+from table_pager import PAGE_SIZES, filter_mask, filtered_positions, page_count, page_rows, sort_order
 
-# Top performer
-with colH1:
-    try:
-        top = df.loc[df["Efficiency_%"].idxmax()]
-        top_name = top["Name"]
-        top_eff = top["Efficiency_%"]
-        top_att = top["Attendance_%"]
-    except Exception:
-        top_name, top_eff, top_att = "N/A", 0.0, 0.0
+# ---------------------------- SUMMARY CARD HELPERS ----------------------------
+def card_note_html(note):
+    return f"<p style='font-size:13px; opacity:0.8; margin:4px 0 0;'>{note}</p>" if note else ""
 
-    st.markdown(f"""
+def top_card_html(top, note=None):
+    return f"""
     <div class='card' style='text-align:center;'>
         <div class='title-flex'>
             <div class='icon-badge top-icon'>🏆</div>
             <h4 style='margin:0;'>Top Performer <span class='badge'>⭐</span></h4>
         </div>
-        <p style='font-size:18px; margin:5px 0;'><b>{top_name}</b></p>
+        <p style='font-size:18px; margin:5px 0;'><b>{top['name']}</b></p>
         <div style='height:6px; width:80%; background:#222; border-radius:4px; margin:8px auto; overflow:hidden;'>
-            <div style='width:{top_eff}%; height:100%; background:linear-gradient(90deg,#00ffd5,#9b59b6);'></div>
+            <div style='width:{top['eff']}%; height:100%; background:linear-gradient(90deg,#00ffd5,#9b59b6);'></div>
         </div>
-        <p style='color:#00ffd5;'>Efficiency: {top_eff:.1f}%</p>
-        <p style='color:#9b59b6;'>Attendance: {top_att:.1f}%</p>
+        <p style='color:#00ffd5;'>Efficiency: {top['eff']:.1f}%</p>
+        <p style='color:#9b59b6;'>Attendance: {top['att']:.1f}%</p>
+        {card_note_html(note)}
     </div>
-    """, unsafe_allow_html=True)
+    """
 
-# Lowest attendance (alert card with pulse)
-with colH2:
-    try:
-        low = df.loc[df["Attendance_%"].idxmin()]
-        low_name = low["Name"]
-        low_att = low["Attendance_%"]
-        low_eff = low["Efficiency_%"]
-    except Exception:
-        low_name, low_att, low_eff = "N/A", 0.0, 0.0
-
-    st.markdown(f"""
+def low_card_html(low, note=None):
+    return f"""
     <div class='card alert-card' style='text-align:center;'>
         <div class='title-flex'>
             <div class='icon-badge low-icon'>⛔</div>
             <h4 style='margin:0;'>Lowest Attendance</h4>
         </div>
-        <p style='font-size:18px; margin:5px 0;'><b>{low_name}</b></p>
-        <p style='color:#9b59b6;'>Attendance: {low_att:.1f}%</p>
-        <p style='color:#00ffd5;'>Efficiency: {low_eff:.1f}%</p>
+        <p style='font-size:18px; margin:5px 0;'><b>{low['name']}</b></p>
+        <p style='color:#9b59b6;'>Attendance: {low['att']:.1f}%</p>
+        <p style='color:#00ffd5;'>Efficiency: {low['eff']:.1f}%</p>
+        {card_note_html(note)}
     </div>
-    """, unsafe_allow_html=True)
+    """
 
-# Overall summary
-with colH3:
-    avg_eff = df["Efficiency_%"].mean()
-    avg_att = df["Attendance_%"].mean()
-    completion_rate = (df["Tasks_Completed"].sum() / df["Tasks_Assigned"].sum() * 100) if df["Tasks_Assigned"].sum() > 0 else 0
-    st.markdown(f"""
+def overall_card_html(summary):
+    return f"""
     <div class='card' style='text-align:center;'>
         <div class='title-flex'>
             <div class='icon-badge sum-icon'>📊</div>
             <h4 style='margin:0;'>Overall Summary</h4>
         </div>
-        <p>Avg Efficiency: <b style='color:#00ffd5'>{avg_eff:.1f}%</b></p>
-        <p>Avg Attendance: <b style='color:#9b59b6'>{avg_att:.1f}%</b></p>
-        <p>Completion Rate: <b style='color:#00ffd5'>{completion_rate:.1f}%</b></p>
+        <p>Avg Efficiency: <b style='color:#00ffd5'>{summary['avg_eff']:.1f}%</b></p>
+        <p>Avg Attendance: <b style='color:#9b59b6'>{summary['avg_att']:.1f}%</b></p>
+        <p>Completion Rate: <b style='color:#00ffd5'>{summary['completion_rate']:.1f}%</b></p>
     </div>
-    """, unsafe_allow_html=True)
+    """
 
-# ---------------------------- DASHBOARD CONTENT ----------------------------
-st.markdown("---")
-st.markdown("<h3 style='text-align:center;margin-bottom:20px;'>📈 Employee Analytics Dashboard</h3>", unsafe_allow_html=True)
-
-# KPIs
-st.markdown("<div class='card'>", unsafe_allow_html=True)
-c1, c2, c3, c4 = st.columns(4)
-with c1:
-    st.metric("Employees", f"{len(df)}")
-with c2:
-    st.metric("Avg Efficiency", f"{df['Efficiency_%'].mean():.1f}%")
-with c3:
-    st.metric("Avg Attendance", f"{df['Attendance_%'].mean():.1f}%")
-with c4:
-    completion_rate = (df['Tasks_Completed'].sum() / df['Tasks_Assigned'].sum() * 100) if df['Tasks_Assigned'].sum() > 0 else 0
-    st.metric("Completion Rate", f"{completion_rate:.1f}%")
-st.markdown("</div>", unsafe_allow_html=True)
+def summary_layout():
+    """Draws the highlight + KPI headers and returns empty slots so cards can be (re)filled later."""
+    st.markdown("---")
+    st.markdown("<h3 style='text-align:center;margin-bottom:20px;'>🌟 Smart Highlights</h3>", unsafe_allow_html=True)
+    hl_slots = [c.empty() for c in st.columns(3)]
+    st.markdown("---")
+    st.markdown("<h3 style='text-align:center;margin-bottom:20px;'>📈 Employee Analytics Dashboard</h3>", unsafe_allow_html=True)
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    kpi_slots = [c.empty() for c in st.columns(4)]
+    st.markdown("</div>", unsafe_allow_html=True)
+    return hl_slots, kpi_slots
+
+def fill_summary(hl_slots, kpi_slots, summary, notes=None):
+    """notes: optional {"top": ..., "low": ...} lines under the highlight cards"""
+    notes = notes or {}
+    hl_slots[0].markdown(top_card_html(summary["top"], notes.get("top")), unsafe_allow_html=True)
+    # Lowest attendance (alert card with pulse)
+    hl_slots[1].markdown(low_card_html(summary["low"], notes.get("low")), unsafe_allow_html=True)
+    hl_slots[2].markdown(overall_card_html(summary), unsafe_allow_html=True)
+    kpi_slots[0].metric("Employees", f"{summary['rows']}")
+    kpi_slots[1].metric("Avg Efficiency", f"{summary['avg_eff']:.1f}%")
+    kpi_slots[2].metric("Avg Attendance", f"{summary['avg_att']:.1f}%")
+    kpi_slots[3].metric("Completion Rate", f"{summary['completion_rate']:.1f}%")
+
+def department_attendance_pie(dept_att):
+    st.markdown("**Average Attendance by Department**")
+    if not dept_att.empty:
+        fig2 = px.pie(names=dept_att.index, values=dept_att.values, hole=0.55,
+                      color_discrete_sequence=px.colors.sequential.Plasma)
+        st.plotly_chart(fig2, use_container_width=True)
+    else:
+        st.info("Department data not available.")
+
+def data_quality_report(report, chunked=False):
+    """Validation summary of an upload (see progress_validation.py); rejected rows are left out of every figure."""
+    if not report:
+        return
+    if not report["rejected"]:
+        st.caption(f"✅ All {report['rows']:,} rows passed validation")
+        return
+    st.warning(f"{report['rejected']:,} of {report['rows']:,} rows ({report['rejected'] / report['rows']:.1%}) "
+               "break the data rules and are left out of the dashboard.")
+    with st.expander("🧪 Data quality report"):
+        st.dataframe(report["checks"], use_container_width=True, hide_index=True)
+        rejected = report["rejected_rows"]
+        if chunked:
+            st.caption("Streaming mode: repeated Employee_IDs are only detected within each chunk.")
+        st.caption(f"First {len(rejected):,} rejected rows" if len(rejected) < report["rejected"] else "Rejected rows")
+        st.dataframe(rejected, use_container_width=True, hide_index=True)
+        st.download_button("⬇️ Download rejected rows (CSV)", data=lambda: export_bytes(rejected),
+                           file_name="rejected_rows.csv", mime="text/csv", on_click="ignore")
+
+# ---------------------------- STREAMING MODE (huge uploads) ----------------------------
+prof.mark("load data")
+# Reads the upload in chunks and keeps only running aggregates, so memory stays bounded
+streaming = not live_mode and st.checkbox("⚡ Streaming mode (summary KPIs only, bounded memory)",
+                                          value=uploaded.size / 1e6 >= STREAMING_THRESHOLD_MB,
+                                          help=f"On by default for files over {STREAMING_THRESHOLD_MB:.0f} MB")
+if streaming:
+    hl_slots, kpi_slots = summary_layout()
+    bar = st.progress(0.0, text="Streaming rows...")
+    agg = ProgressAggregator()
+    validator = ProgressValidator()
+    invalid = {}  # non-numeric cells of the current chunk
+    for chunk, frac in iter_progress_chunks(uploaded, invalid=invalid):
+        missing = [c for c in REQUIRED_COLS if c not in chunk.columns]
+        if missing:
+            bar.empty()
+            st.error(f"Missing required column: {missing[0]}")
+            st.stop()
+        reject = validator.check(chunk, row_offset=validator.rows, invalid=invalid)
+        summary = agg.update(chunk[~reject] if reject.any() else chunk).summary()
+        fill_summary(hl_slots, kpi_slots, summary)
+        bar.progress(frac, text=f"Streamed {agg.rows:,} rows")
+    bar.empty()
+    summary = agg.summary()
+    fill_summary(hl_slots, kpi_slots, summary)
+    data_quality_report(validator.report(), chunked=True)
+    department_attendance_pie(summary["dept_attendance"])
+    st.info("Streaming mode shows summary KPIs only. Untick it to load charts and forecasts for the full dataset.")
+    prof.annotate(rows=agg.rows, mode="streaming")
+    prof.end()
+    st.stop()
+
+# ---------------------------- SHARED DATASETS ----------------------------
+# One registry per server process: every session on the same file (or live version) shares one read-only
+# copy and works on a Copy-on-Write view of it, so memory grows per dataset, not per viewer
+@st.cache_resource
+def get_dataset_registry():
+    return DatasetRegistry(int(DATASET_BUDGET_MB * 1024 * 1024))
+
+registry = get_dataset_registry()
+session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex)
+
+def dataset_derived(key, name, build, spinner=None):
+    """
+    Object built once from dataset `key` and shared by all sessions; it lives in the registry entry next to the
+    frame, so it counts toward STAFFSPHERE_DATASET_MB and is dropped when the dataset is evicted.
+    """
+    def build_with_spinner():
+        with st.spinner(spinner):
+            return build()
+    return registry.derived(key, name, build_with_spinner if spinner else build)
+
+# ---------------------------- LIVE DATA (MasterEMS) ----------------------------
+# One shared source per server process; each rerun only rebuilds employees changed since the last one
+@st.cache_resource(show_spinner="Connecting to MasterEMS...")
+def get_ems_source():
+    from ems_source import EMSFrameSource
+    return EMSFrameSource()
+
+def load_live_frame(frame):
+    df = frame.reset_index()
+    return add_derived_metrics(df) if len(df) else df
+
+LIVE_KEY_PREFIX = "ems-"
+
+if live_mode:
+    ems_source = get_ems_source()
+    refreshed = ems_source.refresh()
+    # the version bumps only when a row actually changed, so the shared frame and the per-dataset caches
+    # below stay warm; it is read together with its frame, in case another session refreshes in between
+    live_version, live_frame = ems_source.current()
+    data_key = f"{LIVE_KEY_PREFIX}{live_version}"
+    df = registry.get(data_key, lambda: load_live_frame(live_frame), session_id)
+    live_frame = None
+    # older versions will not be asked for again: drop them (and everything derived from them) now
+    for key in registry.keys():
+        if key.startswith(LIVE_KEY_PREFIX) and int(key[len(LIVE_KEY_PREFIX):]) < live_version:
+            registry.discard(key)
+    if df.empty:
+        st.info("MasterEMS has no employees yet. Run master_ems.py (or add employees) and refresh.")
+        st.stop()
+    st.caption(f"🟢 Live from MasterEMS · {len(df)} employees · {refreshed} row(s) refreshed this run")
+    st.button("🔄 Refresh")
+
+# ---------------------------- LOADING ANIMATION & LOAD DATA ----------------------------
+# Page structure: only the widgets above (data source, streaming, forecast model) rerun the whole script.
+# Every other widget lives in an st.fragment below that takes its inputs as arguments, so moving it
+# reruns just that section; the shared inputs (dataset, summary, model, forecasts) are cached per key.
+
+# Parsed once per upload content and shared read-only by every section and session
+def load_upload_frame(source):
+    # typed, column-pruned read (see progress_schema.PROGRESS_SCHEMA)
+    invalid = {}  # cells such as "95%" that were read as NaN, reported as "not numeric"
+    df = read_progress(source, invalid=invalid)
+    report = None
+    if all(c in df.columns for c in REQUIRED_COLS):
+        # rows breaking the declared rules are set aside rather than coerced to 0 (see progress_validation.py)
+        reject, report = validate_progress(df, invalid)
+        if reject.any():
+            df = df[~reject].reset_index(drop=True)
+        # Derived metrics
+        add_derived_metrics(df)
+    return df, report
+
+if not live_mode:
+    # content hash of the upload, computed once per uploaded file; keys the shared frame and every per-dataset cache below
+    if st.session_state.get("upload_id") != uploaded.file_id:
+        st.session_state["upload_id"], st.session_state["upload_key"] = uploaded.file_id, source_fingerprint(uploaded)
+    data_key = st.session_state["upload_key"]
+    with st.spinner("✨ Processing your data... Please wait!"):
+        df = registry.get(data_key, lambda: load_upload_frame(uploaded), session_id)
+    # st.file_uploader hands every run its own copy of the file bytes, and fragments keep this run's
+    # globals alive; drop it now that the shared frame exists
+    uploaded = None
+    # Validate required columns
+    missing_cols = [c for c in REQUIRED_COLS if c not in df.columns]
+    if missing_cols:
+        st.error(f"Missing required column: {missing_cols[0]}")
+        st.stop()
+    shared = registry.info(data_key)
+    if shared:
+        st.caption(f"{shared['rows']:,} rows · {shared['mb']:,.1f} MB shared by {shared['sessions']} open session(s)")
+    data_quality_report(registry.meta(data_key))
+    if df.empty:
+        st.error("No rows left to analyze: every row breaks the data rules.")
+        st.stop()
+
+prof.annotate(rows=len(df), data_key=data_key, mode="live" if live_mode else "upload")
+
+# ---------------------------- SMART HIGHLIGHTS & KPIs ----------------------------
+prof.mark("summary & KPIs")
+@st.cache_data(show_spinner=False, max_entries=16)
+def cached_summary(key, _df):
+    return summarize_progress(_df)
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def cached_top_n(key, _df):
+    return top_n(_df, "Efficiency_%", 10, ["Name", "Efficiency_%"])
+
+# Group-wise percentile tables and top / bottom K, built once per dataset and shared by all sessions
+def get_ranker(key, df):
+    return dataset_derived(key, "ranker", lambda: GroupRanker(df), "Ranking employees...")
+
+def highlight_notes(ranker, df):
+    """Where the top performer and the lowest attendance stand inside their own department."""
+    notes = {}
+    if "Department" not in ranker.levels:
+        return notes
+    for card, pick, metric in [("top", ranker.top("Efficiency_%", k=1), "Productivity_Index"),
+                               ("low", ranker.top("Attendance_%", k=1, bottom=True), "Efficiency_%")]:
+        if len(pick) and metric in ranker.metrics:
+            row = df.iloc[pick[0]]
+            pct = ranker.percentile(metric, row[metric], "Department", row["Department"])
+            if pct is not None:
+                notes[card] = f"{ordinal(pct)} percentile of {metric} in {row['Department']}"
+    return notes
+
+summary = cached_summary(data_key, df)
+ranker = get_ranker(data_key, df)
+hl_slots, kpi_slots = summary_layout()
+fill_summary(hl_slots, kpi_slots, summary, highlight_notes(ranker, df))
+
+@st.fragment
+@profiled("group leaders")
+def group_leaders_panel(df, ranker):
+    with st.expander("🏅 Leaders by Department / Designation"):
+        c1, c2, c3, c4 = st.columns(4)
+        level = c1.selectbox("Group by", ranker.levels, index=min(1, len(ranker.levels) - 1), key="leaders_level")
+        group = None if level == ORGANIZATION else c2.selectbox(level, ranker.groups(level), key="leaders_group")
+        metric = c3.selectbox("Metric", ranker.metrics, key="leaders_metric")
+        bottom = c4.radio("Show", ["Top", "Bottom"], horizontal=True, key="leaders_side") == "Bottom"
+        leaders = ranker.leaders(df, metric, level, group, bottom=bottom)
+        st.dataframe(leaders, use_container_width=True, hide_index=True)
+        st.caption(f"{'Bottom' if bottom else 'Top'} {len(leaders)} of {group or 'the organization'} by {metric}; "
+                   f"percentile within the same group")
+
+group_leaders_panel(df, ranker)
+
+# Charts are built from reduced data (see chart_data.py); only what is drawn is sent to the browser
+@st.cache_data(show_spinner=False, max_entries=32)
+def salary_efficiency_points(key, budget, _df):
+    cols = [c for c in ["Name", "Department", "Basic_Salary", "Efficiency_%"] if c in _df.columns]
+    return stratified_sample(_df[cols], budget)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def salary_efficiency_grid(key, _df):
+    return grid_bins(_df, "Basic_Salary", "Efficiency_%")
+
+@st.fragment
+@profiled("charts")
+def salary_efficiency_chart(df, data_key):
+    st.markdown("**Salary vs Efficiency**")
+    m1, m2 = st.columns(2)
+    render_choice = m1.selectbox("Render", ["Auto", "Points (WebGL)", "Density grid"], key="scatter_mode")
+    point_budget = m2.select_slider("Point budget", [1000, 2000, 5000, 10000, 20000, 50000],
+                                    value=DEFAULT_POINT_BUDGET, key="point_budget")
+    render_mode = {"Points (WebGL)": "webgl", "Density grid": "density"}.get(render_choice) or choose_render_mode(len(df), point_budget)
+    if render_mode == "density":
+        grid = salary_efficiency_grid(data_key, df)
+        fig3 = px.imshow(np.where(grid["counts"] > 0, grid["counts"], np.nan), x=grid["x"], y=grid["y"],
+                         origin="lower", aspect="auto", color_continuous_scale="Plasma",
+                         labels=dict(x="Basic_Salary", y="Efficiency_%", color="Employees"))
+    else:
+        points = salary_efficiency_points(data_key, point_budget, df)
+        fig3 = px.scatter(points, x="Basic_Salary", y="Efficiency_%", color="Efficiency_%",
+                          color_continuous_scale="Plasma", hover_data=["Name"],
+                          render_mode="webgl" if render_mode == "webgl" else "auto")
+        if len(points) < len(df):
+            st.caption(f"Showing a {len(points):,}-point stratified sample of {len(df):,} employees")
+    st.plotly_chart(fig3, use_container_width=True)
 
 # Top employees chart + department pie
-top10 = df.sort_values(by="Efficiency_%", ascending=False).head(10)
+prof.mark("charts")
+top10 = cached_top_n(data_key, df)
 col1, col2 = st.columns([2, 1], gap="large")
 
 with col1:
@@ -306,22 +566,12 @@ with col1:
     st.plotly_chart(fig1, use_container_width=True)
 
 with col2:
-    st.markdown("**Average Attendance by Department**")
-    if "Department" in df.columns:
-        avg_att = df.groupby("Department")["Attendance_%"].mean().sort_values(ascending=False)
-        fig2 = px.pie(names=avg_att.index, values=avg_att.values, hole=0.55,
-                      color_discrete_sequence=px.colors.sequential.Plasma)
-        st.plotly_chart(fig2, use_container_width=True)
-    else:
-        st.info("Department data not available.")
+    department_attendance_pie(summary["dept_attendance"])
 
 st.markdown("---")
 col3, col4 = st.columns(2, gap="large")
 with col3:
-    st.markdown("**Salary vs Efficiency**")
-    fig3 = px.scatter(df, x="Basic_Salary", y="Efficiency_%", color="Efficiency_%",
-                      color_continuous_scale="Plasma", hover_data=["Name"])
-    st.plotly_chart(fig3, use_container_width=True)
+    salary_efficiency_chart(df, data_key)
 
 with col4:
     st.markdown("**Efficiency Trend (Top 10)**")
@@ -332,26 +582,140 @@ with col4:
     else:
         st.info("No data to display.")
 
+# ---------------------------- DRILL-DOWN EXPLORER ----------------------------
+# Built once per dataset; every slice below is answered from the cube's cells, not the raw frame
+def get_cube(key, df):
+    return dataset_derived(key, "cube", lambda: AggregationCube(df), "Building aggregation cube...")
+
+@st.fragment
+@profiled("drill-down")
+def drill_down_explorer(cube):
+    st.markdown("---")
+    st.markdown("<h3 style='text-align:center;margin-bottom:12px;'>🧊 Drill-down Explorer</h3>", unsafe_allow_html=True)
+    d1, d2 = st.columns([2, 1])
+    drill_by = d1.multiselect("Group by", cube.dimensions, default=cube.dimensions[:1], max_selections=2, key="cube_by")
+    drill_measure = d2.selectbox("Measure", cube.measures, key="cube_measure")
+    with st.expander("Filters"):
+        fcols = st.columns(len(cube.dimensions))
+        drill_filters = {d: fcols[i].multiselect(d, cube.members(d), key=f"cube_f_{d}") for i, d in enumerate(cube.dimensions)}
+    drill = cube.query(drill_by, drill_filters)
+    if drill.empty:
+        st.info("No employees match these filters.")
+    elif drill_by:
+        fig_cube = px.bar(drill, x=drill_by[0], y=drill_measure, color=drill_by[1] if len(drill_by) > 1 else None,
+                          barmode="group", error_y=f"{drill_measure}_std", hover_data=["rows"],
+                          color_discrete_sequence=px.colors.sequential.Plasma)
+        st.plotly_chart(fig_cube, use_container_width=True)
+        st.dataframe(drill[drill_by + ["rows", drill_measure, f"{drill_measure}_std", f"{drill_measure}_sum"]], use_container_width=True)
+    else:
+        st.metric(f"Avg {drill_measure} ({int(drill['rows'].iloc[0]):,} employees)", f"{drill[drill_measure].iloc[0]:.2f}")
+
+prof.mark("drill-down")
+cube = get_cube(data_key, df)
+if cube.dimensions:
+    drill_down_explorer(cube)
+
+# ---------------------------- TRENDS ACROSS UPLOADS ----------------------------
+# Each upload is recorded once (by content hash) in the snapshot store; trends come from its per-department moments
+@st.cache_resource
+def get_snapshot_store(root):
+    return SnapshotStore(root)
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def cached_department_trend(key, measure, window, _store):
+    return rolling_stats(department_trend(_store.department_moments(), measure), window=window)
+
+@st.fragment
+@profiled("trends")
+def trends_section(store, measures):
+    snapshots = store.snapshots()
+    if len(snapshots) < 2:
+        st.info("Upload another export (a later Last_Updated) to see trends.")
+        return
+    tr1, tr2, tr3 = st.columns([1, 1, 2])
+    trend_measure = tr1.selectbox("Measure", measures, key="trend_measure")
+    trend_window = tr2.slider("Rolling window (snapshots)", 1, 12, 3, key="trend_window")
+    trend = cached_department_trend((store.root, len(store.manifest)), trend_measure, trend_window, store)
+    trend_groups = sorted(trend["Department"].unique())
+    trend_pick = tr3.multiselect("Series", trend_groups, default=["All"] if "All" in trend_groups else trend_groups[:1],
+                                 key="trend_groups")
+    view = trend[trend["Department"].isin(trend_pick)]
+    fig_trend = px.line(view, x="Snapshot", y="mean", color="Department", markers=True,
+                        labels={"mean": f"Avg {trend_measure}"}, title=f"{trend_measure} across {len(snapshots)} snapshots")
+    for dept, g in view.groupby("Department"):
+        fig_trend.add_scatter(x=g["Snapshot"], y=g["mean_roll_mean"], mode="lines", line=dict(dash="dot"),
+                              name=f"{dept} ({trend_window}-snapshot avg)")
+    st.plotly_chart(fig_trend, use_container_width=True)
+    latest = trend[trend["Snapshot"] == trend["Snapshot"].max()]
+    st.dataframe(latest[["Department", "rows", "mean", "mean_change", "mean_roll_mean", "mean_roll_std"]]
+                 .rename(columns={"mean": "Latest", "mean_change": "Change", "mean_roll_mean": "Rolling avg",
+                                  "mean_roll_std": "Rolling std"})
+                 .sort_values("Latest", ascending=False), use_container_width=True)
+
+prof.mark("trends")
+snapshot_store = get_snapshot_store(SNAPSHOT_DIR) if SNAPSHOT_DIR else None
+st.markdown("---")
+st.markdown("### 📈 Trends Across Uploads", unsafe_allow_html=True)
+if snapshot_store is None:
+    st.caption("Set STAFFSPHERE_SNAPSHOT_DIR to keep each upload and chart efficiency / attendance over time.")
+else:
+    if not live_mode and "Employee_ID" not in df.columns:
+        st.caption("This upload has no Employee_ID column, so it is not recorded as a snapshot "
+                   "(employees are tracked across uploads by their ID).")
+    elif not live_mode:
+        snap_info = snapshot_store.add(df, data_key)
+        if not snap_info["skipped"]:
+            st.caption(f"Recorded snapshot {snap_info['snapshot']}: {snap_info['stored']} new/changed of {snap_info['rows']} employees")
+    trends_section(snapshot_store, [m for m in TREND_MEASURES if m in df.columns])
+
 # ---------------------------- FORECASTING SETUP ----------------------------
+prof.mark("model")
 st.markdown("---")
 st.markdown("<h3 style='text-align:center;margin-bottom:12px;'>🔮 Forecasting & Predictive Insights</h3>", unsafe_allow_html=True)
 
-# Prepare model training data (features -> Efficiency_%)
-FEATURE_COLS = ["Tasks_Assigned", "Attendance_%", "Basic_Salary", "Progress_%"]
-# If not enough rows to train a model, we will fallback
-model = LinearRegression()
-can_train = len(df) >= 10  # require minimum samples to get a somewhat reasonable model
-
-if can_train:
-    X = df[FEATURE_COLS].values
-    y = df["Efficiency_%"].values
-    try:
-        model.fit(X, y)
-        model_trained = True
-    except Exception:
-        model_trained = False
+# Model training is shared across sessions: one fit per (dataset, feature list)
+def get_efficiency_model(key, fingerprint, feature_cols, df):
+    return dataset_derived(key, ("model", feature_cols),
+                           lambda: load_or_train_model(df[list(feature_cols) + ["Efficiency_%"]], fingerprint, list(feature_cols), MODEL_DIR),
+                           "Training forecast model...")
+
+# Incremental mode keeps one partial_fit model per process and feeds it only new/changed rows
+@st.cache_resource
+def get_online_model(feature_cols):
+    return (OnlineEfficiencyModel.load(MODEL_DIR) if MODEL_DIR else None) or OnlineEfficiencyModel(list(feature_cols))
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def cached_fingerprint(key, cols, _df):
+    return dataset_fingerprint(_df, list(cols))
+
+train_cols = FEATURE_COLS + ["Efficiency_%"]
+data_fp = cached_fingerprint(data_key, tuple(train_cols), df)
+model_mode = st.radio("Forecast model", ["Full refit", "Incremental"], horizontal=True, key="model_mode",
+                      help="Incremental updates a shared SGD model with rows whose Employee_ID is new or whose Last_Updated changed")
+if model_mode == "Incremental":
+    online = get_online_model(tuple(FEATURE_COLS))
+    upd = online.update(df, data_fp)
+    if upd["updated"] and MODEL_DIR:
+        online.save(MODEL_DIR)
+    track_full = st.checkbox("Track against full refit", value=True)
+    if not upd["skipped"] and online.fitted:
+        baseline = get_efficiency_model(data_key, data_fp, tuple(FEATURE_COLS), df)[0] if track_full else None
+        online.evaluate(df, baseline, data_fp)
+    model = online if online.fitted else None
+    model_trained = model is not None
+    model_tag = f"online-{online.rows_seen}-{len(online.applied)}"
+    if model_trained:
+        st.caption(f"Model: SGDRegressor (incremental) · learned {upd['updated']:,} new/changed of {upd['rows']:,} rows this upload" if not upd["skipped"]
+                   else f"Model: SGDRegressor (incremental) · snapshot already learned ({online.rows_seen:,} rows total)")
+        with st.expander("Incremental vs full-refit metrics"):
+            st.dataframe(pd.DataFrame(online.history), use_container_width=True)
 else:
-    model_trained = False
+    model, model_meta = get_efficiency_model(data_key, data_fp, tuple(FEATURE_COLS), df)
+    model_trained = model is not None
+    model_tag = f"full-{data_fp}"
+    if model_trained:
+        r2_txt = f"{model_meta['r2_holdout']:.3f}" if model_meta.get("r2_holdout") is not None else "n/a"
+        st.caption(f"Model: LinearRegression on {model_meta['rows']} rows · holdout R² {r2_txt} · {model_meta.get('source', 'trained')}")
 
 # Helper: predict next-month efficiency for a single employee given adjustments
 def predict_efficiency_for_employee(row, attendance_adj_pct=0.0, tasks_completed_adj_pct=0.0):
@@ -361,160 +725,320 @@ def predict_efficiency_for_employee(row, attendance_adj_pct=0.0, tasks_completed
     tasks_completed_adj_pct: percentage change to tasks completed
     returns predicted_eff (float)
     """
-    # Create modified copy
-    attendance = max(0.0, row["Attendance_%"] * (1 + attendance_adj_pct / 100.0))
-    tasks_completed = max(0.0, row["Tasks_Completed"] * (1 + tasks_completed_adj_pct / 100.0))
-    tasks_pending = row.get("Tasks_Pending", 0.0)
-    tasks_assigned = tasks_completed + tasks_pending
-    progress = (tasks_completed / tasks_assigned * 100.0) if tasks_assigned > 0 else 0.0
-    basic_salary = row["Basic_Salary"]
-    feat = np.array([[tasks_assigned, attendance, basic_salary, progress]])
-    if model_trained:
-        try:
-            pred = model.predict(feat)[0]
-            # clamp predictions 0-100
-            pred = float(np.clip(pred, 0, 100))
-            return pred
-        except Exception:
-            return row["Efficiency_%"]
-    else:
-        # fallback heuristic: adjust current efficiency proportionally to attendance and progress
-        # baseline: current efficiency scaled by attendance change and progress
-        eff = row["Efficiency_%"] * (attendance / max(1e-6, row["Attendance_%"])) * (progress / max(1e-6, row["Progress_%"] if row["Progress_%"]>0 else 1))
-        # if progress was zero, don't explode
-        if not np.isfinite(eff) or eff <= 0:
-            return row["Efficiency_%"]
-        return float(np.clip(eff, 0, 100))
+    return float(predict_efficiency(model, row.to_frame().T, attendance_adj_pct, tasks_completed_adj_pct)[0])
 
 # ---------------------------- SIDEBAR: Employee selector + personal forecast ----------------------------
+# Name search index is built once per dataset and shared by all sessions
+def get_name_index(key, df):
+    return dataset_derived(key, "names", lambda: NameIndex.from_frame(df), "Indexing employee names...")
+
+name_index = get_name_index(data_key, df)
+
+def employee_label(emp_id):
+    return f"{name_index.names[name_index.position_of(emp_id)]} · {emp_id}"
+
+# search, scenario sliders and the personal forecast only depend on each other: one sidebar fragment
+@st.fragment
+@profiled("employee panel")
+def employee_forecast_panel(df, name_index, ranker, snapshot_store):
+    emp_query = st.text_input("Find employee", "", help="Type the start of a first or last name")
+    emp_id = st.selectbox("Select Employee", name_index.search(emp_query, limit=50), format_func=employee_label)
+    emp_pos = name_index.position_of(emp_id) if emp_id is not None else None
+    employee = name_index.names[emp_pos] if emp_pos is not None else None
+    if emp_query and emp_id is None:
+        st.info("No matching employees.")
+    if emp_pos is not None:
+        with st.expander("📐 Percentile ranks"):
+            st.dataframe(ranker.employee_percentiles(df.iloc[emp_pos]), use_container_width=True)
+            st.caption("Share of the organization / the employee's own group at or below this employee")
+
+    st.markdown("### Forecast scenario")
+    scenario = st.selectbox("Scenario", ["Baseline (0%)", "Optimistic (+5% attendance)", "Pessimistic (-5% attendance)"])
+    # allow fine tuning
+    adj_slider = st.slider("Additional attendance adjustment (%)", -20, 20, 0, step=1, help="Extra manual tweak to attendance for the forecast (±%)")
+    task_adj_slider = st.slider("Tasks Completed adj (%)", -20, 20, 0, step=1, help="Adjust tasks completed to simulate productivity change")
+
+    # map preset scenario to attendance change
+    scenario_map = {"Baseline (0%)": 0.0, "Optimistic (+5% attendance)": 5.0, "Pessimistic (-5% attendance)": -5.0}
+    preset_att_adj = scenario_map.get(scenario, 0.0)
+    total_att_adj = preset_att_adj + adj_slider
+
+    if st.button("Show Progress & Forecast") and emp_pos is not None:
+        emp_row = df.iloc[emp_pos]
+        # show progress pie
+        fig_progress = px.pie(
+            names=["Completed", "Remaining"],
+            values=[emp_row["Tasks_Completed"], max(0, emp_row["Tasks_Assigned"] - emp_row["Tasks_Completed"])],
+            hole=0.6,
+        )
+        fig_progress.update_traces(textinfo='label+percent')
+        st.plotly_chart(fig_progress, use_container_width=True)
+        st.markdown(f"""
+        <div style='background: linear-gradient(90deg,#00ffd544,#9b59b660);
+                    border-radius:8px; padding:10px; text-align:center; margin-bottom:8px; color:#e8eef1'>
+            <b>Efficiency:</b> {emp_row['Efficiency_%']:.1f}%<br>
+            <b>Attendance:</b> {emp_row['Attendance_%']:.1f}%<br>
+            <b>Progress:</b> {emp_row['Progress_%']:.1f}%
+        </div>""", unsafe_allow_html=True)
+
+        # predict next-month with adjustments
+        pred_next = predict_efficiency_for_employee(emp_row, attendance_adj_pct=total_att_adj, tasks_completed_adj_pct=task_adj_slider)
+
+        # create 6-month projection: current -> predicted -> extrapolate by linear monthly growth derived from difference
+        values = project_efficiency(emp_row["Efficiency_%"], pred_next).tolist()
+
+        personal_df = pd.DataFrame({"Month": PROJECTION_MONTHS, "Efficiency": values})
+        fig_personal = px.line(personal_df, x="Month", y="Efficiency", markers=True, title=f"{employee} — 6-month Projection")
+        st.plotly_chart(fig_personal, use_container_width=True)
+
+        # recorded history from earlier uploads (one point per Last_Updated)
+        if snapshot_store is not None and "Employee_ID" in emp_row.index:
+            history = snapshot_store.employee_history(emp_row["Employee_ID"], ["Efficiency_%", "Attendance_%"])
+            if len(history) > 1:
+                fig_hist = px.line(history, x="Last_Updated", y=["Efficiency_%", "Attendance_%"], markers=True,
+                                   title=f"{employee} — History ({len(history)} snapshots)")
+                st.plotly_chart(fig_hist, use_container_width=True)
+
+        st.markdown(f"**Predicted Next Month Efficiency:** {pred_next:.1f}%")
+        st.download_button(f"📄 Download Report ({employee})",
+                           f"Employee Report for {employee}\nPredicted Next-Month Efficiency: {pred_next:.1f}%",
+                           file_name=f"{employee}_forecast_report.txt")
+
+prof.mark("employee panel")
 st.sidebar.title("📊 Track Employee Progress & Forecast")
-employee = st.sidebar.selectbox("Select Employee", df["Name"].tolist())
-
-st.sidebar.markdown("### Forecast scenario")
-scenario = st.sidebar.selectbox("Scenario", ["Baseline (0%)", "Optimistic (+5% attendance)", "Pessimistic (-5% attendance)"])
-# allow fine tuning
-adj_slider = st.sidebar.slider("Additional attendance adjustment (%)", -20, 20, 0, step=1, help="Extra manual tweak to attendance for the forecast (±%)")
-task_adj_slider = st.sidebar.slider("Tasks Completed adj (%)", -20, 20, 0, step=1, help="Adjust tasks completed to simulate productivity change")
-
-# map preset scenario to attendance change
-scenario_map = {"Baseline (0%)": 0.0, "Optimistic (+5% attendance)": 5.0, "Pessimistic (-5% attendance)": -5.0}
-preset_att_adj = scenario_map.get(scenario, 0.0)
-total_att_adj = preset_att_adj + adj_slider
-
-if st.sidebar.button("Show Progress & Forecast"):
-    emp_row = df[df["Name"] == employee].iloc[0]
-    # show progress pie
-    fig_progress = px.pie(
-        names=["Completed", "Remaining"],
-        values=[emp_row["Tasks_Completed"], max(0, emp_row["Tasks_Assigned"] - emp_row["Tasks_Completed"])],
-        hole=0.6,
-    )
-    fig_progress.update_traces(textinfo='label+percent')
-    st.sidebar.plotly_chart(fig_progress, use_container_width=True)
-    st.sidebar.markdown(f"""
-    <div style='background: linear-gradient(90deg,#00ffd544,#9b59b660);
-                border-radius:8px; padding:10px; text-align:center; margin-bottom:8px; color:#e8eef1'>
-        <b>Efficiency:</b> {emp_row['Efficiency_%']:.1f}%<br>
-        <b>Attendance:</b> {emp_row['Attendance_%']:.1f}%<br>
-        <b>Progress:</b> {emp_row['Progress_%']:.1f}%
-    </div>""", unsafe_allow_html=True)
-
-    # predict next-month with adjustments
-    pred_next = predict_efficiency_for_employee(emp_row, attendance_adj_pct=total_att_adj, tasks_completed_adj_pct=task_adj_slider)
-
-    # create 6-month projection: current -> predicted -> extrapolate by linear monthly growth derived from difference
-    current_eff = emp_row["Efficiency_%"]
-    months = ["Now", "M+1", "M+2", "M+3", "M+4", "M+5"]
-    values = [current_eff, pred_next]
-    # derive monthly growth from difference / 4, then apply a decaying growth factor for realism
-    diff = pred_next - current_eff
-    monthly_step = diff / 1.5  # faster convergence for demo
-    for i in range(2, 6):
-        next_val = values[-1] + monthly_step * (0.85 ** (i-2))  # decay
-        values.append(float(np.clip(next_val, 0, 100)))
-
-    personal_df = pd.DataFrame({"Month": months, "Efficiency": values})
-    fig_personal = px.line(personal_df, x="Month", y="Efficiency", markers=True, title=f"{employee} — 6-month Projection")
-    st.sidebar.plotly_chart(fig_personal, use_container_width=True)
-
-    st.sidebar.markdown(f"**Predicted Next Month Efficiency:** {pred_next:.1f}%")
-    st.sidebar.download_button(f"📄 Download Report ({employee})",
-                               f"Employee Report for {employee}\nPredicted Next-Month Efficiency: {pred_next:.1f}%",
-                               file_name=f"{employee}_forecast_report.txt")
+with st.sidebar:
+    employee_forecast_panel(df, name_index, ranker, snapshot_store)
+
+# ---------------------------- PAGINATED TABLES ----------------------------
+# Sort orders are cached per dataset + scenario; each rerun only filters and materialises one page.
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_sort_order(key, sort_col, descending, _values):
+    return sort_order(_values, descending)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_filter_mask(key, name_query, departments, value_col, value_range, _df):
+    return filter_mask(_df, name_query, departments, value_col, value_range)
+
+@st.fragment
+@profiled("table")
+def paged_table(tdf, cols, key, data_key, sort_options, default_sort=None, descending=True, rename=None):
+    """
+    tdf: full frame (never copied); cols: columns to show
+    sort_options: columns offered for server-side sort; default_sort None keeps file order
+    data_key: cache key for everything derived from tdf (dataset + scenario)
+    Runs as a fragment: paging, sorting and filtering rerun only this table.
+    """
+    f1, f2, f3, f4 = st.columns([2, 2, 2, 1])
+    sort_labels = ["(file order)"] + sort_options
+    sort_by = f1.selectbox("Sort by", sort_labels, index=sort_labels.index(default_sort) if default_sort else 0, key=f"{key}_sort")
+    name_query = f2.text_input("Filter name", "", key=f"{key}_name")
+    departments = ()
+    if "Department" in tdf.columns:
+        dept_values = list(tdf["Department"].cat.categories) if isinstance(tdf["Department"].dtype, pd.CategoricalDtype) else sorted(tdf["Department"].dropna().unique())
+        departments = tuple(f3.multiselect("Department", dept_values, key=f"{key}_dept"))
+    desc = f4.checkbox("Desc", value=descending, key=f"{key}_desc")
+    value_col, value_range = None, None
+    if "Predicted_Eff_Next" in cols:
+        value_col = "Predicted_Eff_Next"
+        value_range = st.slider("Predicted efficiency range (%)", 0.0, 100.0, (0.0, 100.0), step=0.5, key=f"{key}_range")
+        if value_range == (0.0, 100.0):
+            value_col, value_range = None, None
+
+    if sort_by == "(file order)":
+        order = np.arange(len(tdf))
+    else:
+        order = cached_sort_order(data_key, sort_by, desc, tdf[sort_by])
+    mask = cached_filter_mask(data_key, name_query, departments, value_col, value_range, tdf)
+    positions = filtered_positions(order, mask)
+
+    p1, p2 = st.columns([1, 3])
+    page_size = p1.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{key}_size")
+    n_pages = page_count(len(positions), page_size)
+    page = p2.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, step=1, key=f"{key}_page")
+    page_df = page_rows(tdf, positions, page, page_size, cols)
+    if rename:
+        page_df = page_df.rename(columns=rename)
+    st.dataframe(page_df, use_container_width=True)
+    start = (page - 1) * page_size
+    st.caption(f"Rows {min(start + 1, len(positions)):,}–{min(start + page_size, len(positions)):,} of {len(positions):,}")
+
+# ---------------------------- SCENARIO SWEEP ----------------------------
+# Whole response surface of (attendance adj, tasks adj) in one broadcasted pass, cached per dataset + model
+@st.cache_data(show_spinner="Sweeping scenarios...", max_entries=16)
+def cached_scenario_sweep(key, model_key, step, _model, _df):
+    grid = np.arange(-20, 21, step)
+    return scenario_sweep(_model, _df, grid, grid)
+
+@st.fragment
+@profiled("scenario sweep")
+def scenario_sweep_section(df, model, data_key, model_tag):
+    st.markdown("---")
+    st.markdown("### 🗺️ Scenario Sweep (Attendance × Tasks Completed)", unsafe_allow_html=True)
+    sw1, sw2 = st.columns([1, 2])
+    sweep_step = sw1.selectbox("Grid step (%)", [1, 2, 5], index=1, key="sweep_step")
+    sweep = cached_scenario_sweep(data_key, model_tag, sweep_step, model, df)
+    sweep_view = sw2.selectbox("Breakdown", ["All employees"] + sweep["groups"], key="sweep_view")
+    if sweep_view == "All employees":
+        surface = sweep["mean"]
+    else:
+        surface = sweep["group_mean"][sweep["groups"].index(sweep_view)]
+    fig_sweep = px.imshow(surface, x=sweep["tasks_adj"], y=sweep["attendance_adj"], origin="lower", aspect="auto",
+                          color_continuous_scale="Plasma",
+                          labels=dict(x="Tasks completed adj (%)", y="Attendance adj (%)", color="Avg predicted eff (%)"))
+    st.plotly_chart(fig_sweep, use_container_width=True)
+    if len(sweep["groups"]) > 1:
+        a0 = int(np.argmin(np.abs(sweep["attendance_adj"]))); t0 = int(np.argmin(np.abs(sweep["tasks_adj"])))
+        dept_sweep = pd.DataFrame({
+            "Group": sweep["groups"], "Employees": sweep["group_rows"],
+            "Baseline": sweep["group_mean"][:, a0, t0],
+            "Worst (-20/-20)": sweep["group_mean"][:, 0, 0],
+            "Best (+20/+20)": sweep["group_mean"][:, -1, -1],
+        }).sort_values("Baseline", ascending=False)
+        st.dataframe(dept_sweep, use_container_width=True)
+
+prof.mark("scenario sweep")
+scenario_sweep_section(df, model, data_key, model_tag)
 
 # ---------------------------- OVERALL FORECAST SECTION ----------------------------
-st.markdown("---")
-st.markdown("### 🔁 Overall Next-Month Forecast (All Employees)", unsafe_allow_html=True)
-st.markdown("Use the sliders to simulate optimistic/pessimistic scenarios across the organization.", unsafe_allow_html=True)
-
-colA1, colA2 = st.columns([2,1], gap="large")
-with colA2:
-    org_att_adj = st.slider("Org-wide attendance adj (%)", -10, 10, 0, step=1)
-    org_task_adj = st.slider("Org-wide tasks completed adj (%)", -10, 10, 0, step=1)
-    apply_btn = st.button("Apply Organization Scenario")
-
-# compute baseline predictions (no extra button required)
-preds = []
-for idx, row in df.iterrows():
-    # baseline pred (no org-wide adjustment)
-    baseline_pred = predict_efficiency_for_employee(row, attendance_adj_pct=0.0, tasks_completed_adj_pct=0.0)
-    preds.append(baseline_pred)
-df["Predicted_Eff_Next"] = preds
-
-# apply org-wide if requested (recompute predicted column)
-if 'apply_btn' in locals() and apply_btn:
-    preds_adj = []
-    for idx, row in df.iterrows():
-        p = predict_efficiency_for_employee(row, attendance_adj_pct=org_att_adj, tasks_completed_adj_pct=org_task_adj)
-        preds_adj.append(p)
-    df["Predicted_Eff_Next"] = preds_adj
-
-# show a table of Name | Current | Predicted
-table_df = df[["Name", "Efficiency_%", "Predicted_Eff_Next"]].copy()
-table_df = table_df.sort_values(by="Predicted_Eff_Next", ascending=False).reset_index(drop=True)
-table_df.columns = ["Name", "Current_Eff_%", "Predicted_Eff_Next_%"]
-with colA1:
-    st.dataframe(table_df, use_container_width=True)
-
-# Plot: current vs predicted (for all) and a 6-month projection stack (averaged)
-avg_current = df["Efficiency_%"].mean()
-avg_pred = df["Predicted_Eff_Next"].mean()
-
-# Create 6-month projected average line for display using same extrapolation trick
-avg_values = [avg_current, avg_pred]
-diff = avg_pred - avg_current
-monthly_step = diff / 1.5
-for i in range(2,6):
-    next_val = avg_values[-1] + monthly_step * (0.85 ** (i-2))
-    avg_values.append(float(np.clip(next_val, 0, 100)))
-months = ["Now","M+1","M+2","M+3","M+4","M+5"]
-overall_proj_df = pd.DataFrame({"Month": months, "Avg_Efficiency": avg_values})
-
-fig_overall = px.line(overall_proj_df, x="Month", y="Avg_Efficiency", markers=True, title="Overall Avg Efficiency — 6-Month Projection")
-fig_overall.add_scatter(x=["Now","M+1"], y=[avg_current, avg_pred], mode="lines+markers", name="Now→Next", line=dict(dash="dash"))
-st.plotly_chart(fig_overall, use_container_width=True)
-
-# download predicted CSV
-st.download_button("💾 Download Predictions (CSV)", df.to_csv(index=False).encode('utf-8'),
-                   file_name="employees_with_predictions.csv")
-
-# ---------------------------- DATA TABLE ----------------------------
-st.markdown("---")
-st.subheader("📋 Data Table (with Predicted Next-Month Efficiency)")
-display_cols = ["Name", "Department"] if "Department" in df.columns else ["Name"]
-display_cols += ["Basic_Salary", "Efficiency_%", "Predicted_Eff_Next", "Attendance_%", "Tasks_Assigned", "Tasks_Completed", "Progress_%"]
-st.dataframe(df[display_cols].rename(columns={"Predicted_Eff_Next": "Predicted_Eff_Next_%"}), use_container_width=True)
+# Vectorized over all rows, adds Predicted_Eff_Next and the Eff_M+1..Eff_M+5 projection.
+# Only the prediction columns are kept per (dataset, org scenario, model), next to the dataset in the registry;
+# they are joined onto this session's frame, so the shared dataset is untouched and no old frame is kept alive.
+def cached_forecast(scenario_key, model_key, df, model):
+    def build():
+        return forecast_frame(df.copy(deep=False), model, *scenario_key[1:])[FORECAST_COLS].copy()
+    preds = dataset_derived(scenario_key[0], ("forecast", model_key) + scenario_key[1:], build, "Forecasting...")
+    return pd.concat([df, preds], axis=1)
+
+# Export files are only serialized when the download button is clicked (Streamlit calls `data` lazily),
+# once per dataset + scenario + format + columns. Bytes are immutable, so cache_resource shares them without a copy.
+@st.cache_resource(show_spinner=False, max_entries=4)
+def cached_export(scenario_key, model_key, fmt, columns, _fdf):
+    # integer columns written as in batch_forecast output (33, not 33.0)
+    return export_bytes(nullable_ints(_fdf.copy(deep=False)), fmt, columns)
+
+@st.fragment
+@profiled("export options")
+def export_panel(fdf, scenario_key, model_tag):
+    with st.expander("💾 Download Predictions"):
+        e1, e2 = st.columns([1, 3])
+        fmt = e1.radio("Format", list(EXPORT_FORMATS), format_func=lambda f: EXPORT_FORMATS[f]["label"])
+        columns = tuple(e2.multiselect("Columns", list(fdf.columns), default=list(fdf.columns)))
+        def build_export():
+            with prof.run("export", kind="download", format=fmt, columns=len(columns)):
+                return cached_export(scenario_key, model_tag, fmt, columns, fdf)
+        st.download_button(f"💾 Download Predictions ({EXPORT_FORMATS[fmt]['label']})", build_export,
+                           file_name=export_file_name("employees_with_predictions", fmt), mime=EXPORT_FORMATS[fmt]["mime"],
+                           on_click="ignore", disabled=not columns)
+        st.caption("Holds the columns the dashboard reads (see progress_schema.PROGRESS_SCHEMA) plus the predictions; "
+                   "other columns of the original export are not included.")
+
+# org sliders drive the forecast table, the projection, the export and the data table (all inside this fragment)
+@st.fragment
+@profiled("overall forecast")
+def overall_forecast_section(df, model, data_key, model_tag):
+    st.markdown("---")
+    st.markdown("### 🔁 Overall Next-Month Forecast (All Employees)", unsafe_allow_html=True)
+    st.markdown("Use the sliders to simulate optimistic/pessimistic scenarios across the organization.", unsafe_allow_html=True)
+
+    colA1, colA2 = st.columns([2,1], gap="large")
+    with colA2:
+        org_att_adj = st.slider("Org-wide attendance adj (%)", -10, 10, 0, step=1)
+        org_task_adj = st.slider("Org-wide tasks completed adj (%)", -10, 10, 0, step=1)
+        apply_btn = st.button("Apply Organization Scenario")
+
+    # baseline predictions (no org-wide adjustment) unless the org scenario is applied
+    org_adj = (0, 0)
+    if apply_btn:
+        org_adj = (org_att_adj, org_task_adj)
+    scenario_key = (data_key,) + org_adj
+    fdf = cached_forecast(scenario_key, model_tag, df, model)
+
+    # show a table of Name | Current | Predicted
+    with colA1:
+        paged_table(fdf, ["Name", "Efficiency_%", "Predicted_Eff_Next"], "forecast_tbl", scenario_key,
+                    ["Predicted_Eff_Next", "Name", "Department"] if "Department" in fdf.columns else ["Predicted_Eff_Next", "Name"],
+                    default_sort="Predicted_Eff_Next",
+                    rename={"Efficiency_%": "Current_Eff_%", "Predicted_Eff_Next": "Predicted_Eff_Next_%"})
+
+    # Plot: current vs predicted (for all) and a 6-month projection stack (averaged)
+    avg_current = fdf["Efficiency_%"].mean()
+    avg_pred = fdf["Predicted_Eff_Next"].mean()
+
+    # Create 6-month projected average line for display using same extrapolation trick
+    avg_values = project_efficiency(avg_current, avg_pred).tolist()
+    overall_proj_df = pd.DataFrame({"Month": PROJECTION_MONTHS, "Avg_Efficiency": avg_values})
+
+    fig_overall = px.line(overall_proj_df, x="Month", y="Avg_Efficiency", markers=True, title="Overall Avg Efficiency — 6-Month Projection")
+    fig_overall.add_scatter(x=["Now","M+1"], y=[avg_current, avg_pred], mode="lines+markers", name="Now→Next", line=dict(dash="dash"))
+    st.plotly_chart(fig_overall, use_container_width=True)
+
+    # download predictions (serialized on click)
+    export_panel(fdf, scenario_key, model_tag)
+
+    # ---------------------------- DATA TABLE ----------------------------
+    st.markdown("---")
+    st.subheader("📋 Data Table (with Predicted Next-Month Efficiency)")
+    display_cols = ["Name", "Department"] if "Department" in fdf.columns else ["Name"]
+    display_cols += ["Basic_Salary", "Efficiency_%", "Predicted_Eff_Next", "Attendance_%", "Tasks_Assigned", "Tasks_Completed", "Progress_%"]
+    paged_table(fdf, display_cols, "data_tbl", scenario_key,
+                [c for c in ["Name", "Department", "Predicted_Eff_Next", "Efficiency_%", "Attendance_%", "Basic_Salary"] if c in display_cols],
+                descending=False, rename={"Predicted_Eff_Next": "Predicted_Eff_Next_%"})
+
+prof.mark("overall forecast")
+overall_forecast_section(df, model, data_key, model_tag)
 
 # ---------------------------- SIDEBAR: Quick search box (convenience) ----------------------------
 # (non-blocking) quick search to focus on an employee in main table
+@st.fragment
+@profiled("quick search")
+def quick_search_box(name_index):
+    quick_search = st.text_input("Quick search name (highlights main table)", "")
+    if quick_search:
+        n_matches = name_index.count(quick_search)
+        if n_matches:
+            st.success(f"Found {n_matches} match(es). Use the main table to review.")
+        else:
+            st.info("No matches.")
+
+prof.mark("quick search")
 st.sidebar.markdown("---")
-quick_search = st.sidebar.text_input("Quick search name (highlights main table)", "")
-if quick_search:
-    subset = df[df["Name"].str.contains(quick_search, case=False, na=False)]
-    if not subset.empty:
-        st.sidebar.success(f"Found {len(subset)} match(es). Use the main table to review.")
-    else:
-        st.sidebar.info("No matches.")
+with st.sidebar:
+    quick_search_box(name_index)
+
+# ---------------------------- PROFILER PANEL ----------------------------
+prof.end()
+
+@st.fragment
+def profiler_panel(prof):
+    st.markdown("---")
+    st.markdown("### ⏱️ Profiler", unsafe_allow_html=True)
+    st.button("🔄 Refresh", key="profiler_refresh", help="Fragment reruns and downloads are recorded as their own runs")
+    runs = list(prof.history)
+    last = next((r for r in reversed(runs) if r["kind"] == "script"), None)
+    if last is None:
+        st.info("No full run recorded yet.")
+        return
+    breakdown = pd.DataFrame(last["stages"])
+    breakdown["share_%"] = (100 * breakdown["wall_ms"] / max(breakdown["wall_ms"].sum(), 1e-9)).round(1)
+    st.caption(f"Last full run: {last['total_ms']:,.0f} ms · {last.get('rows', 0):,} rows · {last['ts']}"
+               + ("" if prof.trace_memory else " · memory not traced"))
+    st.dataframe(breakdown.sort_values("wall_ms", ascending=False), use_container_width=True)
+    if prof.trace_memory:
+        st.caption(f"peak_mb / net_mb are server-wide: they include allocations of other sessions running at the same time. "
+                   f"overlap marks stages measured while another session was also tracing memory "
+                   f"({tracing_sessions()} session(s) tracing now), whose peaks may be cut short.")
+    hist = pd.DataFrame([{"run": i, "kind": r["kind"], **s} for i, r in enumerate(runs[-50:], start=max(len(runs) - 50, 0) + 1)
+                         for s in r["stages"]])
+    fig_prof = px.bar(hist, x="run", y="wall_ms", color="stage", hover_data=["kind", "peak_mb"],
+                      title=f"Wall time per run (last {min(len(runs), 50)} runs)")
+    st.plotly_chart(fig_prof, use_container_width=True)
+    datasets = registry.stats()
+    st.caption(f"Dataset registry: {len(datasets)} dataset(s), {registry.nbytes / 1e6:,.1f} MB of {DATASET_BUDGET_MB:,.0f} MB")
+    if PROFILE_LOG and st.checkbox(f"Aggregate all sessions ({PROFILE_LOG})", key="profiler_aggregate"):
+        st.dataframe(pd.DataFrame(aggregate_stages(read_log(PROFILE_LOG))), use_container_width=True)
+
+if prof.enabled:
+    profiler_panel(prof)
 
 # ---------------------------- FOOTER ----------------------------
 st.markdown("<div style='text-align:center; color:#7d8790; margin-top:20px;'>© 2025 StaffSphere • Where employee performance meets clarity.</div>", unsafe_allow_html=True)
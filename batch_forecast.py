@@ -0,0 +1,218 @@
+"""
+Headless batch forecasting for Employee_Progress_Data exports.
+
+Runs the same pipeline as the dashboard (typed read -> derived metrics -> LinearRegression on
+FEATURE_COLS -> next-month prediction + 6-month projection) and writes one predictions file per
+input, with Predicted_Eff_Next and Eff_M+1..Eff_M+5 columns.
+
+    python batch_forecast.py exports/*.csv --out-dir predictions --format parquet --workers 8
+    python batch_forecast.py huge.csv --output huge_predictions.csv --chunksize 500000
+
+Several inputs are processed one file per worker; a single input is split into chunks that are
+predicted in parallel and written back in order. Without --model each file gets its own model,
+trained on its accepted rows exactly like the dashboard does when that file is uploaded.
+
+Every file first goes through the dashboard's data-quality checks (progress_validation.py), read
+over the columns they need only. Rejected rows are dropped from training and from the predictions,
+and are written with their line number and reason to <input name>_rejected.csv next to the output.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, List, Dict, Any, Tuple
+
+import numpy as np
+import pandas as pd
+
+from forecasting import add_derived_metrics, forecast_frame, train_efficiency_model
+from progress_schema import (DATE_COLS, DEFAULT_CHUNK_ROWS, PROGRESS_SCHEMA, REQUIRED_COLS, UNIQUE_COLS, VALUE_RANGES,
+                             iter_progress_chunks, nullable_ints, read_progress)
+from progress_validation import validate_progress
+
+TRAIN_SOURCE_COLS = ["Tasks_Completed", "Tasks_Pending", "Attendance_%", "Basic_Salary", "Efficiency_%"]
+# columns the data-quality checks look at (they include TRAIN_SOURCE_COLS and every numeric schema column)
+VALIDATION_COLS = [c for c in PROGRESS_SCHEMA if c in {*REQUIRED_COLS, *VALUE_RANGES, *UNIQUE_COLS, *DATE_COLS}]
+
+# ---------- Pipeline steps ----------
+def validate_file(path: str) -> Tuple[pd.DataFrame, np.ndarray, Dict[str, Any]]:
+    """
+    Applies the dashboard's data-quality checks to the whole of `path` (repeated IDs span the file).
+    returns (VALIDATION_COLS frame, reject mask, report with every rejected row)
+    """
+    invalid: Dict[str, np.ndarray] = {}
+    df = read_progress(path, columns=VALIDATION_COLS, invalid=invalid)
+    reject, report = validate_progress(df, invalid, max_rejected=len(df))
+    return df, reject, report
+
+def train_on(df: pd.DataFrame):
+    """Fits the dashboard model on the accepted rows of a file."""
+    model, _ = train_efficiency_model(add_derived_metrics(df[TRAIN_SOURCE_COLS].reset_index(drop=True)))
+    return model
+
+def train_for_file(path: str):
+    """Fits the dashboard model on the accepted rows of `path`, reading only the columns it needs."""
+    df, reject, _ = validate_file(path)
+    return train_on(df[~reject])
+
+def predict_chunk(chunk: pd.DataFrame, model, attendance_adj: float = 0.0, tasks_adj: float = 0.0) -> pd.DataFrame:
+    add_derived_metrics(chunk)
+    forecast_frame(chunk, model, attendance_adj, tasks_adj)
+    # keep one output schema across chunks, written like the dashboard export: nullable ints, plain strings
+    nullable_ints(chunk)
+    for c in chunk.columns:
+        if isinstance(chunk[c].dtype, pd.CategoricalDtype):
+            chunk[c] = chunk[c].astype(object)
+    return chunk
+
+class PredictionWriter:
+    """Appends prediction chunks to a CSV or Parquet file."""
+    def __init__(self, path: str, fmt: str):
+        self.path = path
+        self.fmt = fmt
+        self.rows = 0
+        self._pq_writer = None
+        self._schema = None
+        self._csv = None
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+
+    def write(self, df: pd.DataFrame):
+        if self.fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._pq_writer is None:
+                self._schema = table.schema
+                self._pq_writer = pq.ParquetWriter(self.path, self._schema)
+            self._pq_writer.write_table(table.cast(self._schema))
+        else:
+            if self._csv is None:
+                self._csv = open(self.path, "w", newline="", encoding="utf-8")
+                df.to_csv(self._csv, index=False)
+            else:
+                df.to_csv(self._csv, index=False, header=False)
+        self.rows += len(df)
+
+    def close(self):
+        if self._pq_writer is not None:
+            self._pq_writer.close()
+        if self._csv is not None:
+            self._csv.close()
+
+def output_path(src: str, out_dir: str, fmt: str) -> str:
+    stem = os.path.splitext(os.path.basename(src))[0]
+    return os.path.join(out_dir, f"{stem}_predictions.{'parquet' if fmt == 'parquet' else 'csv'}")
+
+def rejects_path(src: str, dst: str) -> str:
+    stem = os.path.splitext(os.path.basename(src))[0]
+    return os.path.join(os.path.dirname(dst), f"{stem}_rejected.csv")
+
+# ---------- Drivers ----------
+def forecast_file(src: str, dst: str, fmt: str = "csv", model=None, chunksize: int = DEFAULT_CHUNK_ROWS,
+                  attendance_adj: float = 0.0, tasks_adj: float = 0.0, pool: Optional[ProcessPoolExecutor] = None,
+                  workers: int = 1) -> Dict[str, Any]:
+    """
+    Forecasts the accepted rows of one file chunk by chunk. With `pool`, chunks are predicted in parallel
+    (at most 2 x workers in flight) and written in input order. Rejected rows go to rejects_path().
+    """
+    t0 = time.time()
+    df, reject, report = validate_file(src)
+    if model is None:
+        model = train_on(df[~reject])
+    del df
+    writer = PredictionWriter(dst, fmt)  # creates the output directory
+    bad = rejects_path(src, dst)
+    if report["rejected"]:
+        report["rejected_rows"].to_csv(bad, index=False)
+    elif os.path.exists(bad):
+        os.remove(bad)
+
+    def accepted_chunks():
+        offset = 0
+        for chunk, _ in iter_progress_chunks(src, chunksize):
+            drop = reject[offset:offset + len(chunk)]
+            offset += len(chunk)
+            yield chunk[~drop].reset_index(drop=True) if drop.any() else chunk
+
+    try:
+        if pool is None:
+            for chunk in accepted_chunks():
+                writer.write(predict_chunk(chunk, model, attendance_adj, tasks_adj))
+        else:
+            pending = deque()
+            for chunk in accepted_chunks():
+                pending.append(pool.submit(predict_chunk, chunk, model, attendance_adj, tasks_adj))
+                if len(pending) >= 2 * workers:
+                    writer.write(pending.popleft().result())
+            while pending:
+                writer.write(pending.popleft().result())
+    finally:
+        writer.close()
+    return {"input": src, "output": dst, "rows": writer.rows, "rejected": report["rejected"],
+            "rejects": bad if report["rejected"] else None,
+            "model": "trained" if model is not None else "heuristic", "seconds": round(time.time() - t0, 2)}
+
+def _forecast_file_job(args):
+    return forecast_file(*args)
+
+def run(inputs: List[str], out_dir: str = "predictions", fmt: str = "csv", output: Optional[str] = None,
+        model=None, chunksize: int = DEFAULT_CHUNK_ROWS, workers: int = 0,
+        attendance_adj: float = 0.0, tasks_adj: float = 0.0) -> List[Dict[str, Any]]:
+    workers = workers or os.cpu_count() or 1
+    if len(inputs) == 1:
+        dst = output or output_path(inputs[0], out_dir, fmt)
+        if workers == 1:
+            return [forecast_file(inputs[0], dst, fmt, model, chunksize, attendance_adj, tasks_adj)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return [forecast_file(inputs[0], dst, fmt, model, chunksize, attendance_adj, tasks_adj, pool, workers)]
+    jobs = [(src, output_path(src, out_dir, fmt), fmt, model, chunksize, attendance_adj, tasks_adj) for src in inputs]
+    if workers == 1:
+        return [_forecast_file_job(j) for j in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_forecast_file_job, jobs))
+
+# ---------- CLI ----------
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Batch next-month efficiency forecasts for progress exports.")
+    p.add_argument("inputs", nargs="+", help="CSV / Parquet / Feather files or glob patterns")
+    p.add_argument("--out-dir", default="predictions", help="directory for <name>_predictions.* files")
+    p.add_argument("--output", help="output path (single input only)")
+    p.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    p.add_argument("--model", help="joblib model to use for every file (e.g. from STAFFSPHERE_MODEL_DIR)")
+    p.add_argument("--chunksize", type=int, default=DEFAULT_CHUNK_ROWS)
+    p.add_argument("--workers", type=int, default=0, help="process pool size (default: CPU count)")
+    p.add_argument("--attendance-adj", type=float, default=0.0, help="org-wide attendance adjustment (%%)")
+    p.add_argument("--tasks-adj", type=float, default=0.0, help="org-wide tasks completed adjustment (%%)")
+    args = p.parse_args(argv)
+
+    inputs: List[str] = []
+    for pattern in args.inputs:
+        matches = sorted(glob.glob(pattern))
+        inputs.extend(matches or [pattern])
+    missing = [f for f in inputs if not os.path.exists(f)]
+    if missing:
+        print(f"Input not found: {missing[0]}", file=sys.stderr)
+        return 2
+    if args.output and len(inputs) > 1:
+        print("--output can only be used with a single input", file=sys.stderr)
+        return 2
+    model = None
+    if args.model:
+        import joblib
+        model = joblib.load(args.model)
+
+    results = run(inputs, args.out_dir, args.format, args.output, model, args.chunksize, args.workers,
+                  args.attendance_adj, args.tasks_adj)
+    for r in results:
+        print(f" {r['input']} -> {r['output']}: {r['rows']} rows in {r['seconds']}s ({r['model']})")
+        if r["rejected"]:
+            print(f"   {r['rejected']} rejected row(s) -> {r['rejects']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+"""
+Load test: N concurrent browser sessions viewing the same upload on one local Streamlit server.
+
+Starts `streamlit run app2.py` headless, then simulates each session over the same websocket protocol
+the browser uses: open the page, upload the file (HTTP PUT, like the uploader widget), then apply its own
+org-wide scenario a few times (a fragment rerun, as the browser would send it). Every session stays
+connected until the end, like managers keeping a tab open, so the server's resident memory growth per
+session is what each extra viewer costs.
+
+    python bench/concurrent_sessions.py --sessions 16
+    python bench/concurrent_sessions.py --csv big.csv --sessions 8 --json after.json
+    python bench/concurrent_sessions.py --compare before.json after.json
+
+A warm-up session loads the file (and fits the model) first; what that costs is reported as the
+one-off per-dataset memory, separately from the per-session figure. Server memory is read from
+/proc (Linux).
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import Optional, List, Dict, Any, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+UPLOADER = "📂 Upload Employee_Progress_Data CSV"
+SCENARIO_SLIDER = "Org-wide attendance adj (%)"
+APPLY_BUTTON = "Apply Organization Scenario"
+
+# ---------- Server ----------
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(app: str, port: int, timeout: float = 60) -> subprocess.Popen:
+    import requests
+    env = {**os.environ, "STAFFSPHERE_PROFILE_LOG": ""}
+    proc = subprocess.Popen([sys.executable, "-m", "streamlit", "run", app, "--server.headless", "true",
+                             "--server.port", str(port), "--server.enableXsrfProtection", "false",
+                             "--browser.gatherUsageStats", "false"],
+                            cwd=os.path.dirname(app), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/_stcore/health", timeout=1).ok:
+                return proc
+        except requests.RequestException:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("streamlit server did not start")
+
+def rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+# ---------- Simulated browser session ----------
+class Session:
+    """One websocket session: tracks widget ids (by type and label), their fragment and the widget state it sends."""
+    def __init__(self, port: int, timeout: float):
+        from websockets.sync.client import connect
+        self.port = port
+        self.timeout = timeout
+        self._stack = ExitStack()
+        self.ws = self._stack.enter_context(
+            connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"], max_size=None))
+        self.session_id = ""
+        self.widgets: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        self.states: Dict[str, Any] = {}
+
+    def _send(self, back_msg):
+        self.ws.send(back_msg.SerializeToString())
+
+    def _receive_until(self, kind: str):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(self.ws.recv(timeout=self.timeout))
+            which = msg.WhichOneof("type")
+            if which == "new_session":
+                self.session_id = msg.new_session.initialize.session_id
+            elif which == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                el = msg.delta.new_element
+                widget = getattr(el, el.WhichOneof("type"))
+                if getattr(widget, "id", "") and hasattr(widget, "label"):
+                    self.widgets[(el.WhichOneof("type"), widget.label)] = (widget.id, msg.delta.fragment_id)
+            if which == kind:
+                return msg
+
+    def rerun(self, fragment_id: str = "") -> float:
+        """Sends the current widget state, waits for the run to finish; returns ms."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        bm = BackMsg()
+        bm.rerun_script.widget_states.widgets.extend(self.states.values())
+        bm.rerun_script.fragment_id = fragment_id
+        t0 = time.perf_counter()
+        self._send(bm)
+        finished = self._receive_until("script_finished").script_finished
+        ms = (time.perf_counter() - t0) * 1000
+        # triggers (button clicks) only fire once
+        self.states = {k: v for k, v in self.states.items() if not v.HasField("trigger_value")}
+        if finished == 1:
+            raise RuntimeError("app failed to compile")
+        return ms
+
+    def upload(self, name: str, data: bytes):
+        import requests
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.Common_pb2 import UploadedFileInfo
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+        bm = BackMsg()
+        bm.file_urls_request.request_id = "upload"
+        bm.file_urls_request.file_names.append(name)
+        bm.file_urls_request.session_id = self.session_id
+        self._send(bm)
+        urls = self._receive_until("file_urls_response").file_urls_response.file_urls[0]
+        r = requests.put(f"http://127.0.0.1:{self.port}{urls.upload_url}", files={"file": (name, data, "text/csv")})
+        r.raise_for_status()
+        wid, _ = self.widgets[("file_uploader", UPLOADER)]
+        state = WidgetState(id=wid)
+        state.file_uploader_state_value.uploaded_file_info.append(
+            UploadedFileInfo(name=name, size=len(data), file_id=urls.file_id, file_urls=urls))
+        self.states[wid] = state
+
+    def set_slider(self, label: str, value: float) -> str:
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+        wid, fragment = self.widgets[("slider", label)]
+        state = WidgetState(id=wid)
+        state.double_array_value.data.append(value)
+        self.states[wid] = state
+        return fragment
+
+    def click(self, label: str) -> str:
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+        wid, fragment = self.widgets[("button", label)]
+        self.states[wid] = WidgetState(id=wid, trigger_value=True)
+        return fragment
+
+    def close(self):
+        self._stack.close()
+
+def open_session(port: int, data: bytes, name: str, timeout: float) -> Tuple[Session, float]:
+    """A session with the file uploaded; returns (session, first full run ms)."""
+    s = Session(port, timeout)
+    s.rerun()
+    s.upload(name, data)
+    return s, s.rerun()
+
+def session_worker(i: int, port: int, data: bytes, name: str, reruns: int, timeout: float,
+                   start: threading.Barrier) -> Dict[str, Any]:
+    start.wait()
+    s, first = open_session(port, data, name, timeout)
+    times = []
+    for r in range(reruns):
+        # every session explores its own scenario, so per-session state differs
+        s.set_slider(SCENARIO_SLIDER, ((i + r) % 5) - 2)
+        times.append(s.rerun(s.click(APPLY_BUTTON)))
+    return {"session": s, "first_ms": first, "rerun_ms": times}
+
+def _pct(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    s = sorted(values)
+    return round(s[min(int(round(q * (len(s) - 1))), len(s) - 1)], 1)
+
+def measure(app: str, csv: str, sessions: int = 8, reruns: int = 3, timeout: float = 600) -> Dict[str, Any]:
+    with open(csv, "rb") as f:
+        data = f.read()
+    name = os.path.basename(csv)
+    port = _free_port()
+    server = start_server(app, port)
+    results: List[Dict[str, Any]] = []
+    try:
+        rss_start = rss_mb(server.pid)
+        warm, warm_ms = open_session(port, data, name, timeout)
+        warm.close()
+        time.sleep(1.0)
+        rss_warm = rss_mb(server.pid)
+
+        start = threading.Barrier(sessions)
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(sessions) as pool:
+            results = list(pool.map(lambda i: session_worker(i, port, data, name, reruns, timeout, start), range(sessions)))
+        wall = time.perf_counter() - t0
+        time.sleep(1.0)
+        rss_end = rss_mb(server.pid)  # every session is still connected
+    finally:
+        for r in results:
+            r["session"].close()
+        server.terminate()
+        server.wait(timeout=30)
+
+    first = [r["first_ms"] for r in results]
+    rerun = [t for r in results for t in r["rerun_ms"]]
+    per_session = None if rss_end is None or rss_warm is None else round((rss_end - rss_warm) / sessions, 2)
+    per_dataset = None if rss_warm is None or rss_start is None else round(rss_warm - rss_start, 1)
+    return {
+        "app": os.path.relpath(app, ROOT), "csv": name, "file_mb": round(len(data) / 1e6, 2),
+        "sessions": sessions, "reruns": reruns, "wall_s": round(wall, 2),
+        "rss_start_mb": rss_start, "rss_warm_mb": rss_warm, "rss_end_mb": rss_end,
+        "per_dataset_mb": per_dataset, "per_session_mb": per_session, "warmup_ms": round(warm_ms, 1),
+        "first_load_ms": {"p50": _pct(first, 0.5), "p95": _pct(first, 0.95), "max": _pct(first, 1.0)},
+        "rerun_ms": {"p50": _pct(rerun, 0.5), "p95": _pct(rerun, 0.95), "max": _pct(rerun, 1.0)},
+    }
+
+# ---------- Report ----------
+ROWS = [("Per-session RSS (MB)", lambda r: r["per_session_mb"]),
+        ("Server RSS, all sessions open (MB)", lambda r: None if r["rss_end_mb"] is None else round(r["rss_end_mb"], 1)),
+        ("One-off per dataset (MB)", lambda r: r["per_dataset_mb"]),
+        ("First load p50 / p95 (ms)", lambda r: f"{r['first_load_ms']['p50']} / {r['first_load_ms']['p95']}"),
+        ("Scenario rerun p50 / p95 (ms)", lambda r: f"{r['rerun_ms']['p50']} / {r['rerun_ms']['p95']}"),
+        ("Wall time (s)", lambda r: r["wall_s"])]
+
+def compare_table(before: Dict[str, Any], after: Dict[str, Any]) -> str:
+    lines = [f"{after['sessions']} concurrent sessions, {after['reruns']} scenario reruns each "
+             f"({after['csv']}, {after['file_mb']} MB)", "", "| | Before | After |", "|---|---:|---:|"]
+    lines += [f"| {label} | {get(before)} | {get(after)} |" for label, get in ROWS]
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Server memory and latency of N concurrent dashboard sessions on one file.")
+    p.add_argument("--app", default=os.path.join(ROOT, "app2.py"))
+    p.add_argument("--csv", default=os.path.join(ROOT, "Employee_Progress_Data_1500.csv"))
+    p.add_argument("--sessions", type=int, default=8)
+    p.add_argument("--reruns", type=int, default=3)
+    p.add_argument("--json", help="write the report here")
+    p.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="print a markdown table of two --json runs")
+    args = p.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as f1, open(args.compare[1]) as f2:
+            print(compare_table(json.load(f1), json.load(f2)))
+        return 0
+    report = measure(os.path.abspath(args.app), os.path.abspath(args.csv), args.sessions, args.reruns)
+    for label, get in ROWS:
+        print(f"{label:<36} {get(report)}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=1)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
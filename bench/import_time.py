@@ -0,0 +1,168 @@
+"""
+Cold-start import cost of the dashboard, from `python -X importtime`.
+
+Runs the app headlessly in a fresh interpreter and attributes every module imported during each
+stage — the first page (nothing uploaded yet) and, with --csv, the run after an upload — grouped
+by top-level package. Streamlit's own imports are paid by a warm-up script first, so the numbers
+are what app2.py and its helper modules add.
+
+    python bench/import_time.py                         # pre-upload stage only
+    python bench/import_time.py --csv Employee_Progress_Data_1500.csv
+    python bench/import_time.py --check               # exit 1 on a cold-start regression
+    python bench/import_time.py --json after.json
+    python bench/import_time.py --compare before.json after.json
+
+--check fails when a HEAVY_PACKAGES import happens before the upload gate, or when the pre-upload
+imports exceed --budget-ms.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Optional, List, Dict, Any
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_PACKAGES = ["sklearn", "scipy", "plotly", "pyarrow", "joblib"]
+STAGE_MARK = "@@stage "
+
+# warm-up touches the same streamlit APIs as the page before the upload gate
+_CHILD = r'''
+import os, sys, time, json
+app, csv = sys.argv[1], sys.argv[2]
+os.chdir(os.path.dirname(app)); sys.path.insert(0, os.path.dirname(app))
+from streamlit.testing.v1 import AppTest
+warm = AppTest.from_string("""
+import streamlit as st
+st.set_page_config(page_title="warm-up", layout="wide")
+st.markdown("<b>x</b>", unsafe_allow_html=True)
+st.radio("r", ["a", "b"], horizontal=True)
+st.file_uploader("f", type=["csv"])
+st.stop()
+""")
+warm.run()
+timings = {}
+at = AppTest.from_file(app, default_timeout=600)
+sys.stderr.write("@@stage pre-upload\n"); sys.stderr.flush()
+t0 = time.perf_counter(); at.run(); timings["pre-upload"] = time.perf_counter() - t0
+if csv:
+    with open(csv, "rb") as f:
+        at.file_uploader[0].upload(os.path.basename(csv), f.read(), "text/csv")
+    sys.stderr.write("@@stage upload\n"); sys.stderr.flush()
+    t0 = time.perf_counter(); at.run(); timings["upload"] = time.perf_counter() - t0
+sys.stderr.write("@@stage end\n"); sys.stderr.flush()
+print(json.dumps({k: round(v * 1000, 1) for k, v in timings.items()}))
+'''
+
+def parse_importtime(stderr: str) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    stage -> {"packages": {top-level package: cumulative ms}, "heavy": {HEAVY_PACKAGES entry: cumulative ms}}
+    "packages" only counts imports made directly by the app; "heavy" also finds heavy packages
+    pulled in indirectly (e.g. sklearn via forecasting), counted once at their outermost import.
+    """
+    per_stage: Dict[str, List[str]] = {}
+    current = None
+    for line in stderr.splitlines():
+        if line.startswith(STAGE_MARK):
+            current = line[len(STAGE_MARK):].strip()
+            if current != "end":
+                per_stage[current] = []
+        elif current in per_stage and line.startswith("import time:"):
+            per_stage[current].append(line)
+    out = {}
+    for stage, lines in per_stage.items():
+        packages: Dict[str, float] = defaultdict(float)
+        heavy: Dict[str, float] = defaultdict(float)
+        stack: List[tuple] = []  # (depth, root) of ancestors; importtime prints children before parents
+        for line in reversed(lines):
+            parts = line.split("|")
+            if len(parts) != 3 or not parts[1].strip().isdigit():
+                continue
+            raw = parts[2].rstrip()
+            name = raw.strip()
+            depth = (len(raw) - len(raw.lstrip(" ")) - 1) // 2
+            root = name.split(".")[0]
+            ms = int(parts[1]) / 1000.0
+            while stack and stack[-1][0] >= depth:
+                stack.pop()
+            if depth == 0:
+                packages[root] += ms
+            if root in HEAVY_PACKAGES and all(r != root for _, r in stack):
+                heavy[root] += ms
+            stack.append((depth, root))
+        out[stage] = {"packages": dict(packages), "heavy": dict(heavy)}
+    return out
+
+def measure(app: str, csv: Optional[str] = None) -> Dict[str, Any]:
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", _CHILD, app, csv or ""],
+                          capture_output=True, text=True, env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"})
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+    wall = json.loads(proc.stdout.strip().splitlines()[-1])
+    stages = parse_importtime(proc.stderr)
+    report: Dict[str, Any] = {"app": os.path.relpath(app, ROOT), "python": sys.version.split()[0], "stages": {}}
+    for stage, parsed in stages.items():
+        pkgs = parsed["packages"]
+        report["stages"][stage] = {
+            "run_ms": wall.get(stage),
+            "import_ms": round(sum(pkgs.values()), 1),
+            "packages": {k: round(v, 1) for k, v in sorted(pkgs.items(), key=lambda kv: -kv[1])},
+            "heavy": {k: round(v, 1) for k, v in sorted(parsed["heavy"].items(), key=lambda kv: -kv[1])},
+        }
+    return report
+
+# ---------- Report ----------
+def markdown(report: Dict[str, Any], top: int = 8) -> str:
+    lines = []
+    for stage, s in report["stages"].items():
+        heavy = ", ".join(f"{p} {ms} ms" for p, ms in s["heavy"].items()) or "none"
+        lines += [f"**{stage}** — imports {s['import_ms']} ms, run {s['run_ms']} ms · heavy packages: {heavy}", "",
+                  "| Package | Import (ms) |", "|---|---:|"]
+        lines += [f"| {p} | {ms} |" for p, ms in list(s["packages"].items())[:top]]
+        lines.append("")
+    return "\n".join(lines)
+
+def compare_table(before: Dict[str, Any], after: Dict[str, Any]) -> str:
+    lines = ["| Stage | Imports before (ms) | Imports after (ms) | Run before (ms) | Run after (ms) | Heavy packages before → after |",
+             "|---|---:|---:|---:|---:|---|"]
+    for stage in after["stages"]:
+        b, a = before["stages"].get(stage, {}), after["stages"][stage]
+        hb = ", ".join(b.get("heavy", {})) or "none"
+        ha = ", ".join(a["heavy"]) or "none"
+        lines.append(f"| {stage} | {b.get('import_ms', '-')} | {a['import_ms']} | {b.get('run_ms', '-')} | {a['run_ms']} | {hb} → {ha} |")
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Import-time (cold start) report for the Streamlit dashboard.")
+    p.add_argument("--app", default=os.path.join(ROOT, "app2.py"))
+    p.add_argument("--csv", help="also measure the first run after uploading this file")
+    p.add_argument("--json", help="write the report here")
+    p.add_argument("--check", action="store_true", help="exit 1 if heavy packages load before upload or the budget is exceeded")
+    p.add_argument("--budget-ms", type=float, default=300.0, help="pre-upload import budget for --check")
+    p.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="print a markdown table of two --json reports")
+    args = p.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as f1, open(args.compare[1]) as f2:
+            print(compare_table(json.load(f1), json.load(f2)))
+        return 0
+    report = measure(os.path.abspath(args.app), os.path.abspath(args.csv) if args.csv else None)
+    print(markdown(report))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=1)
+    if args.check:
+        pre = report["stages"]["pre-upload"]
+        heavy = list(pre["heavy"])
+        if heavy:
+            print(f"FAIL: {', '.join(heavy)} imported before the upload gate", file=sys.stderr)
+            return 1
+        if pre["import_ms"] > args.budget_ms:
+            print(f"FAIL: pre-upload imports took {pre['import_ms']} ms (budget {args.budget_ms:.0f} ms)", file=sys.stderr)
+            return 1
+        print("OK: cold start within budget")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
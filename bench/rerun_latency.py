@@ -0,0 +1,163 @@
+"""
+Rerun latency of the dashboard per widget interaction.
+
+Loads the app headlessly (streamlit.testing AppTest), uploads a progress file, then for each widget
+below changes its value and times the rerun Streamlit would perform in the browser: a fragment-only
+rerun when the widget lives inside an st.fragment, otherwise the whole script.
+
+    python bench/rerun_latency.py                                   # app2.py + sample CSV
+    python bench/rerun_latency.py --csv big.csv --repeat 5 --json after.json
+    python bench/rerun_latency.py --compare before.json after.json  # markdown table
+
+Each measurement starts from a freshly loaded page (untimed); st.cache_* state is process-wide, so
+like on a long-running server, caches stay warm across measurements.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Optional, List, Dict, Any
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (label, widget type, value) — labels are stable across app versions; first match wins
+INTERACTIONS = [
+    ("Tasks Completed adj (%)", "slider", 5),
+    ("Additional attendance adjustment (%)", "slider", 5),
+    ("Scenario", "selectbox", "Optimistic (+5% attendance)"),
+    ("Find employee", "text_input", "an"),
+    ("Org-wide attendance adj (%)", "slider", 5),
+    ("Render", "selectbox", "Density grid"),
+    ("Group by", "multiselect", ["Department", "City"]),
+    ("Grid step (%)", "selectbox", 5),
+    ("Rows per page", "selectbox", 100),
+    ("Quick search name (highlights main table)", "text_input", "mi"),
+    ("Format", "radio", "csv.gz"),
+    ("Forecast model", "radio", "Incremental"),
+]
+
+# ---------- Fragment-aware runs ----------
+_state: Dict[str, Any] = {"fragment_queue": [], "widget_fragments": {}}
+
+def _install_runner_patch():
+    """Lets AppTest replay a widget change as the fragment-scoped rerun the browser would request."""
+    from streamlit.runtime.scriptrunner import RerunData
+    from streamlit.testing.v1 import local_script_runner as lsr
+    from streamlit.testing.v1.element_tree import parse_tree_from_messages
+
+    def run(self, widget_state=None, query_params=None, timeout=3, page_hash=""):
+        rerun = RerunData(widget_states=widget_state, page_script_hash=page_hash,
+                          fragment_id_queue=list(_state["fragment_queue"]))
+        if rerun.fragment_id_queue:
+            # a fresh runner already holds a pending full rerun, which would absorb a fragment request
+            with self._requests._lock:
+                self._requests._rerun_data = rerun
+        else:
+            self.request_rerun(rerun)
+        try:
+            if not self._script_thread:
+                self.start()
+            lsr.require_widgets_deltas(self, timeout)
+        finally:
+            self.join()
+        msgs = self.forward_msgs()
+        if not _state["fragment_queue"]:
+            _state["widget_fragments"] = _widget_fragments(msgs)
+        return parse_tree_from_messages(msgs)
+
+    lsr.LocalScriptRunner.run = run
+
+def _widget_fragments(msgs) -> Dict[str, str]:
+    out = {}
+    for msg in msgs:
+        if not msg.HasField("delta") or not msg.delta.HasField("new_element"):
+            continue
+        el = msg.delta.new_element
+        kind = el.WhichOneof("type")
+        wid = getattr(getattr(el, kind, None), "id", "") if kind else ""
+        if wid:
+            out[wid] = msg.delta.fragment_id
+    return out
+
+def _find(at, label: str, kind: str):
+    for w in at.get(kind):
+        if getattr(w, "label", None) == label:
+            return w
+    return None
+
+def _fresh_app(app: str, csv: str, timeout: float):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(app, default_timeout=timeout)
+    at.run()
+    with open(csv, "rb") as f:
+        at.file_uploader[0].upload(os.path.basename(csv), f.read(), "text/csv")
+    at.run()
+    return at
+
+def measure(app: str, csv: str, repeat: int = 3, timeout: float = 600) -> Dict[str, Any]:
+    _install_runner_patch()
+    at = _fresh_app(app, csv, timeout)
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    t0 = time.perf_counter(); at.run(); idle = time.perf_counter() - t0
+    results: List[Dict[str, Any]] = [{"widget": "(rerun, nothing changed)", "scope": "script", "ms": [round(idle * 1000, 1)]}]
+    for label, kind, value in INTERACTIONS:
+        timings, scope = [], "missing"
+        for _ in range(repeat):
+            at = _fresh_app(app, csv, timeout)  # same settled page before every measurement
+            w = _find(at, label, kind)
+            if w is None:
+                break
+            frag = _state["widget_fragments"].get(w.id, "")
+            scope = "fragment" if frag else "script"
+            w.set_value(value)
+            _state["fragment_queue"] = [frag] if frag else []
+            try:
+                t0 = time.perf_counter(); at.run(); timings.append(round((time.perf_counter() - t0) * 1000, 1))
+            finally:
+                _state["fragment_queue"] = []
+            if at.exception:
+                raise RuntimeError(f"{label}: {at.exception[0].value}")
+        results.append({"widget": label, "scope": scope, "ms": timings})
+    for r in results:
+        r["median_ms"] = round(statistics.median(r["ms"]), 1) if r["ms"] else None
+    return {"app": os.path.relpath(app, ROOT), "csv": os.path.basename(csv), "repeat": repeat, "results": results}
+
+# ---------- Report ----------
+def compare_table(before: Dict[str, Any], after: Dict[str, Any]) -> str:
+    b = {r["widget"]: r for r in before["results"]}
+    lines = [f"Rerun latency, median of {after['repeat']} ({after['csv']})", "",
+             "| Widget | Before (ms) | After (ms) | After scope | Speed-up |", "|---|---:|---:|---|---:|"]
+    for r in after["results"]:
+        old = b.get(r["widget"], {}).get("median_ms")
+        new = r["median_ms"]
+        ratio = f"{old / new:.1f}x" if old and new else "-"
+        lines.append(f"| {r['widget']} | {old if old is not None else '-'} | {new if new is not None else '-'} | {r['scope']} | {ratio} |")
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Per-widget rerun latency of the Streamlit dashboard.")
+    p.add_argument("--app", default=os.path.join(ROOT, "app2.py"))
+    p.add_argument("--csv", default=os.path.join(ROOT, "Employee_Progress_Data_1500.csv"))
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--json", help="write raw timings here")
+    p.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="print a markdown table of two --json runs")
+    args = p.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as f1, open(args.compare[1]) as f2:
+            print(compare_table(json.load(f1), json.load(f2)))
+        return 0
+    sys.path.insert(0, ROOT)
+    report = measure(os.path.abspath(args.app), os.path.abspath(args.csv), args.repeat)
+    for r in report["results"]:
+        print(f"{r['widget']:<45} {r['scope']:<9} {r['median_ms']} ms")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=1)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
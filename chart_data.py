@@ -0,0 +1,56 @@
+from typing import Optional, Dict, Any, Sequence
+
+import numpy as np
+import pandas as pd
+
+# ---------- Chart data reduction ----------
+# Everything here runs server-side so the browser only receives what a chart can actually show.
+DEFAULT_POINT_BUDGET = 5000
+DEFAULT_GRID = (60, 40)  # x bins, y bins
+
+def top_n(df: pd.DataFrame, col: str, n: int = 10, cols: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Top-n rows by `col` via partial selection (nlargest), without sorting the whole frame."""
+    out = df.nlargest(n, col)
+    return out[list(cols)] if cols is not None else out
+
+def stratified_sample(df: pd.DataFrame, budget: int = DEFAULT_POINT_BUDGET, by: Optional[str] = "Department",
+                      random_state: int = 0) -> pd.DataFrame:
+    """
+    Keeps about `budget` rows, allocating the budget to groups of `by` in proportion to their size
+    (every non-empty group keeps at least one row). Falls back to a plain random sample without `by`.
+    """
+    if len(df) <= budget:
+        return df
+    if not by or by not in df.columns:
+        return df.sample(n=budget, random_state=random_state)
+    codes, _ = pd.factorize(df[by], use_na_sentinel=False)
+    counts = np.bincount(codes)
+    quota = np.maximum(1, np.floor(counts * budget / len(df)).astype(int))
+    rng = np.random.default_rng(random_state)
+    # random key per row, then keep the `quota` smallest keys inside each group
+    keys = rng.random(len(df))
+    order = np.lexsort((keys, codes))
+    sorted_codes = codes[order]
+    starts = np.r_[0, np.cumsum(counts)[:-1]]
+    rank_in_group = np.arange(len(df)) - starts[sorted_codes]
+    keep = np.sort(order[rank_in_group < quota[sorted_codes]])
+    return df.iloc[keep]
+
+def grid_bins(df: pd.DataFrame, x: str, y: str, bins=DEFAULT_GRID) -> Dict[str, Any]:
+    """
+    2D histogram of (x, y).
+    returns dict(x=bin centers, y=bin centers, counts=2D array [y, x]) ready for a heatmap trace
+    """
+    xv = df[x].to_numpy(dtype="float64")
+    yv = df[y].to_numpy(dtype="float64")
+    ok = np.isfinite(xv) & np.isfinite(yv)
+    counts, xe, ye = np.histogram2d(xv[ok], yv[ok], bins=bins)
+    return {"x": (xe[:-1] + xe[1:]) / 2, "y": (ye[:-1] + ye[1:]) / 2, "counts": counts.T}
+
+def choose_render_mode(n_rows: int, budget: int = DEFAULT_POINT_BUDGET) -> str:
+    """svg for small frames, sampled WebGL points up to 20x the budget, density grid beyond that."""
+    if n_rows <= budget:
+        return "svg"
+    if n_rows <= budget * 20:
+        return "webgl"
+    return "density"
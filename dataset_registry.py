@@ -0,0 +1,171 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Callable, Hashable
+
+import pandas as pd
+
+# ---------- Shared dataset registry ----------
+DEFAULT_MAX_MB = 2048
+ACTIVE_SESSION_SECONDS = 15 * 60
+
+def object_bytes(obj: Any) -> int:
+    """Approximate size of a cached object: frame memory, its nbytes attribute, or the sum over a tuple (0 if unknown)."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, tuple):
+        return sum(object_bytes(o) for o in obj)
+    return int(getattr(obj, "nbytes", 0) or 0)
+
+def copy_on_write() -> bool:
+    """True when pandas Copy-on-Write is active: always from pandas 3.0, opt-in (mode.copy_on_write) on 2.x."""
+    return int(pd.__version__.split(".")[0]) >= 3 or pd.get_option("mode.copy_on_write") is True
+
+class DatasetRegistry:
+    """
+    One process-wide, read-only copy of every loaded dataset, keyed by content hash (or live version).
+    A key is loaded once even when several sessions ask at the same time. get() hands out a shallow copy:
+    with pandas Copy-on-Write (pandas >= 3.0, see requirements.txt), columns a session adds or overwrites land
+    in its own copy, so the shared columns are never modified and each session only pays for what it derives.
+    Without Copy-on-Write a shallow copy would share writes, so every session gets a deep copy instead.
+    Least recently used datasets beyond max_bytes / max_entries are dropped from the registry
+    (sessions still holding one keep their reference until they move on).
+    A loader may return (frame, meta) to keep small per-dataset results (e.g. the validation report) next to the frame.
+    Objects built from a dataset (ranker, cube, model, forecasts) live in the same entry via derived(): they count
+    toward max_bytes and are dropped together with the dataset.
+    """
+    def __init__(self, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024, max_entries: int = 8, max_derived: int = 16):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.max_derived = max_derived
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # per dataset key, or per (key, derived name), while it is being built
+        self._loading: Dict[Any, threading.Lock] = {}
+
+    def get(self, key: str, loader: Callable[[], Any], session: Optional[str] = None) -> pd.DataFrame:
+        """Dataset `key`, calling loader() on the first request only."""
+        entry = self._once(key, lambda: self._lookup(key, session), lambda: self._store(key, loader, session))
+        return entry["frame"].copy(deep=not copy_on_write())
+
+    def _once(self, lock_key: Any, lookup: Callable[[], Any], build: Callable[[], Any]) -> Any:
+        """lookup(), or build() under a per-lock_key lock so concurrent first requests build once."""
+        found = lookup()
+        if found is None:
+            with self._lock:
+                key_lock = self._loading.setdefault(lock_key, threading.Lock())
+            try:
+                with key_lock:
+                    found = lookup()
+                    if found is None:
+                        found = build()
+            finally:
+                # also when build() raises, so a failed key does not keep its lock
+                with self._lock:
+                    self._loading.pop(lock_key, None)
+        return found
+
+    def _lookup(self, key: str, session: Optional[str]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry["hits"] += 1
+                self._touch(entry, session)
+            return entry
+
+    def _store(self, key: str, loader: Callable[[], Any], session: Optional[str]) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        loaded = loader()
+        frame, meta = loaded if isinstance(loaded, tuple) else (loaded, None)
+        entry = {"frame": frame, "meta": meta, "bytes": int(frame.memory_usage(deep=True).sum()), "rows": len(frame),
+                 "load_s": round(time.perf_counter() - t0, 3), "hits": 0, "sessions": {}, "derived": OrderedDict()}
+        with self._lock:
+            self._touch(entry, session)
+            self._entries[key] = entry
+            self._evict(keep=key)
+        return entry
+
+    # ---------- Derived objects ----------
+    def derived(self, key: str, name: Hashable, build: Callable[[], Any]) -> Any:
+        """
+        Object `name` built from dataset `key` by build(), built once and kept in the dataset's entry: its size
+        (see object_bytes) counts toward max_bytes, each dataset keeps its max_derived most recently used objects
+        and all of them go when the dataset is evicted or discarded. Nothing is kept for a key that is not registered.
+        """
+        item = self._once((key, name), lambda: self._derived_lookup(key, name), lambda: self._derived_store(key, name, build))
+        return item["value"]
+
+    def _derived_lookup(self, key: str, name: Hashable) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            item = None if entry is None else entry["derived"].get(name)
+            if item is not None:
+                entry["derived"].move_to_end(name)
+            return item
+
+    def _derived_store(self, key: str, name: Hashable, build: Callable[[], Any]) -> Dict[str, Any]:
+        value = build()
+        item = {"value": value, "bytes": object_bytes(value)}
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                derived = entry["derived"]
+                derived[name] = item
+                entry["bytes"] += item["bytes"]
+                while len(derived) > self.max_derived:
+                    entry["bytes"] -= derived.pop(next(iter(derived)))["bytes"]
+                self._evict(keep=key)
+        return item
+
+    @staticmethod
+    def _touch(entry: Dict[str, Any], session: Optional[str]):
+        if session is not None:
+            entry["sessions"][session] = time.time()
+
+    def _evict(self, keep: str):
+        total = sum(e["bytes"] for e in self._entries.values())
+        while len(self._entries) > 1 and (total > self.max_bytes or len(self._entries) > self.max_entries):
+            oldest = next(iter(self._entries))
+            if oldest == keep:
+                break
+            total -= self._entries.pop(oldest)["bytes"]
+
+    def meta(self, key: str) -> Any:
+        """What the loader returned next to the frame (None if nothing, or if the dataset was dropped)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else entry["meta"]
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._entries)
+
+    def discard(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    # ---------- Stats ----------
+    def info(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        {"rows", "mb" (frame and derived objects), "derived" (count), "sessions" (active in the last
+        ACTIVE_SESSION_SECONDS), "hits", "load_s"} for one dataset.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            cutoff = time.time() - ACTIVE_SESSION_SECONDS
+            return {"rows": entry["rows"], "mb": round(entry["bytes"] / 1e6, 2), "hits": entry["hits"], "load_s": entry["load_s"],
+                    "derived": len(entry["derived"]),
+                    "sessions": sum(1 for t in entry["sessions"].values() if t >= cutoff)}
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            keys = list(self._entries)
+        return [{"key": k, **(self.info(k) or {})} for k in keys]
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return sum(e["bytes"] for e in self._entries.values())
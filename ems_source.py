@@ -0,0 +1,124 @@
+import os
+import threading
+from datetime import date
+from typing import Optional, List, Dict, Any, Tuple
+
+import pandas as pd
+
+from master_ems import ATT_CSV, EMP_CSV, LEAVE_CSV, PAYROLL_CSV, TASKS_CSV, Employee, MasterEMS
+
+# ---------- MasterEMS -> dashboard frame ----------
+WATCHED_CSVS = [EMP_CSV, TASKS_CSV, ATT_CSV, LEAVE_CSV, PAYROLL_CSV]
+FRAME_COLS = ["Employee_ID", "Name", "Department", "Designation", "Basic_Salary", "Tasks_Completed", "Tasks_Pending",
+              "Attendance_%", "Efficiency_%", "Attendance_Hours", "Points", "Last_Updated"]
+# columns compared when the CSVs are reloaded (Last_Updated is the refresh date, not a change)
+DIFF_COLS = [c for c in FRAME_COLS if c not in ("Employee_ID", "Last_Updated")]
+
+def employee_record(ems: MasterEMS, e: Employee) -> Dict[str, Any]:
+    """
+    One dashboard row for an EMS employee.
+    Efficiency_% is the average task progress, Attendance_% the share of tracked days with hours logged.
+    """
+    k = ems.compute_employee_kpi(e.emp_id) or {"assigned": 0, "completed": 0, "avg_progress": 0.0, "hours": 0.0}
+    days = len(e.attendance)
+    present = sum(1 for r in e.attendance if (r.get("hours") or 0) > 0)
+    return {
+        "Employee_ID": e.emp_id,
+        "Name": e.name,
+        "Department": e.department or "Unknown",
+        "Designation": e.role,
+        "Basic_Salary": e.basic_salary,
+        "Tasks_Completed": k["completed"],
+        "Tasks_Pending": k["assigned"] - k["completed"],
+        "Attendance_%": round(present / days * 100, 2) if days else 0.0,
+        "Efficiency_%": k["avg_progress"],
+        "Attendance_Hours": k["hours"],
+        "Points": e.points,
+        "Last_Updated": date.today().isoformat(),
+    }
+
+def _mtimes(paths: List[str]) -> Dict[str, float]:
+    return {p: os.path.getmtime(p) for p in paths if os.path.exists(p)}
+
+class EMSFrameSource:
+    """
+    Keeps a dashboard-shaped DataFrame in sync with a MasterEMS instance.
+    refresh() rebuilds only employees whose MasterEMS change counter moved since the last call.
+    If the backing CSVs were modified on disk (another process), the system is reloaded and its rows are
+    diffed against the frame: only employees that were added, removed or differ are replaced.
+    version only bumps when a row actually changed.
+    """
+    def __init__(self, ems: Optional[MasterEMS] = None, watch: Optional[List[str]] = None):
+        self.watch = WATCHED_CSVS if watch is None else watch
+        self.ems = ems or MasterEMS()
+        self.frame = pd.DataFrame(columns=FRAME_COLS).set_index("Employee_ID")
+        self.version = 0  # bumps whenever self.frame changes
+        self._seen: Dict[str, int] = {}
+        self._mtimes = _mtimes(self.watch)
+        self._lock = threading.Lock()
+        self._rebuild()
+
+    def _records(self, emp_ids) -> pd.DataFrame:
+        return pd.DataFrame([employee_record(self.ems, self.ems.employees[eid]) for eid in emp_ids],
+                            columns=FRAME_COLS).set_index("Employee_ID")
+
+    def _rebuild(self):
+        self.frame = self._records(self.ems.employees)
+        self._seen = {eid: self.ems.employee_versions.get(eid, 0) for eid in self.ems.employees}
+        self.version += 1
+
+    def _apply(self, upd: pd.DataFrame, removed) -> int:
+        """Replaces / appends the rows of `upd` and drops `removed`; returns the number of rows touched."""
+        if not len(upd) and not len(removed):
+            return 0
+        frame = self.frame.drop(index=removed)
+        if len(upd):
+            existing = upd.index.isin(frame.index)
+            frame.loc[upd.index[existing]] = upd[existing]
+            frame = pd.concat([frame, upd[~existing]])
+        self.frame = frame
+        self.version += 1
+        return len(upd) + len(removed)
+
+    def _reload(self) -> int:
+        """Reloads MasterEMS from disk and applies only the rows that differ from the current frame."""
+        self.ems = MasterEMS()
+        self._seen = {eid: self.ems.employee_versions.get(eid, 0) for eid in self.ems.employees}
+        new = self._records(self.ems.employees)
+        old = self.frame
+        common = new.index.intersection(old.index)
+        a, b = new.loc[common, DIFF_COLS], old.loc[common, DIFF_COLS]
+        same = ((a == b) | (a.isna() & b.isna())).all(axis=1).to_numpy()
+        upd = new.loc[common[~same].append(new.index[~new.index.isin(old.index)])]
+        return self._apply(upd, old.index.difference(new.index))
+
+    def refresh(self) -> int:
+        """Syncs the frame; returns the number of rows rebuilt (0 = unchanged)."""
+        with self._lock:
+            mt = _mtimes(self.watch)
+            if mt != self._mtimes:
+                self._mtimes = mt
+                return self._reload()
+            versions = self.ems.employee_versions
+            changed = [eid for eid in self.ems.employees if eid not in self._seen or versions.get(eid, 0) != self._seen[eid]]
+            removed = [eid for eid in self._seen if eid not in self.ems.employees]
+            if not changed and not removed:
+                return 0
+            n = self._apply(self._records(changed), removed)
+            for eid in removed:
+                self._seen.pop(eid, None)
+            for eid in changed:
+                self._seen[eid] = versions.get(eid, 0)
+            return n
+
+    def current(self) -> Tuple[int, pd.DataFrame]:
+        """
+        (version, frame) read together, so a refresh() from another session can't slip between them.
+        The frame is never modified afterwards (every change builds a new one); snapshot() gives a mutable copy.
+        """
+        with self._lock:
+            return self.version, self.frame
+
+    def snapshot(self) -> pd.DataFrame:
+        """Copy of the current frame with Employee_ID as a column (safe for callers to mutate)."""
+        return self.current()[1].reset_index()
@@ -0,0 +1,256 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional, Dict, Any, Tuple, Sequence
+
+import numpy as np
+import pandas as pd
+
+# scikit-learn is imported where a model is fitted, so importing this module stays cheap
+if TYPE_CHECKING:
+    from sklearn.linear_model import LinearRegression
+
+# ---------- Model config ----------
+FEATURE_COLS = ["Tasks_Assigned", "Attendance_%", "Basic_Salary", "Progress_%"]
+TARGET_COL = "Efficiency_%"
+MIN_TRAIN_ROWS = 10  # require minimum samples to get a somewhat reasonable model
+HOLDOUT_SIZE = 0.2
+RANDOM_STATE = 42
+
+PROJECTION_MONTHS = ["Now", "M+1", "M+2", "M+3", "M+4", "M+5"]
+PROJECTION_DECAY = 0.85
+# columns forecast_frame adds
+FORECAST_COLS = ["Predicted_Eff_Next"] + [f"Eff_{month}" for month in PROJECTION_MONTHS[1:]]
+NUM_COLS = ["Tasks_Completed", "Tasks_Pending", "Tasks_Assigned", "Efficiency_%", "Attendance_%", "Basic_Salary", "Progress_%"]
+
+# ---------- Derived metrics ----------
+def add_derived_metrics(df: pd.DataFrame) -> pd.DataFrame:
+    """Adds Tasks_Assigned / Progress_% and coerces the numeric columns in place."""
+    df["Tasks_Assigned"] = df["Tasks_Completed"].fillna(0) + df["Tasks_Pending"].fillna(0)
+    # avoid division by zero
+    df["Progress_%"] = np.where(df["Tasks_Assigned"] > 0, df["Tasks_Completed"] / df["Tasks_Assigned"] * 100, 0)
+    df["Progress_%"] = df["Progress_%"].fillna(0)
+    # make sure numeric types
+    for c in NUM_COLS:
+        df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0)
+    return df
+
+# ---------- Fingerprinting ----------
+def dataset_fingerprint(df: pd.DataFrame, cols: Optional[Sequence[str]] = None) -> str:
+    """Stable content hash of `cols` (default: all columns), independent of the index."""
+    cols = list(cols) if cols is not None else list(df.columns)
+    h = hashlib.sha1()
+    h.update("|".join(cols).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df[cols], index=False).values.tobytes())
+    return h.hexdigest()
+
+def _model_key(fingerprint: str, feature_cols: Sequence[str]) -> str:
+    feat_hash = hashlib.sha1("|".join(feature_cols).encode("utf-8")).hexdigest()[:10]
+    return f"{fingerprint[:16]}_{feat_hash}"
+
+# ---------- Training ----------
+def train_efficiency_model(df: pd.DataFrame, feature_cols: Sequence[str] = FEATURE_COLS,
+                           target_col: str = TARGET_COL) -> Tuple[Optional["LinearRegression"], Dict[str, Any]]:
+    """
+    Fit the efficiency regression on `df`.
+    The holdout R² is measured on a train_test_split model; the returned model is refit
+    on every row so predictions match a plain full-data fit.
+    returns (model or None when there is not enough data, metadata dict)
+    """
+    feature_cols = list(feature_cols)
+    meta: Dict[str, Any] = {"rows": int(len(df)), "features": feature_cols, "target": target_col,
+                            "r2_holdout": None, "trained_at": datetime.utcnow().isoformat()}
+    if len(df) < MIN_TRAIN_ROWS:
+        return None, meta
+    from sklearn.linear_model import LinearRegression
+    from sklearn.metrics import r2_score
+    from sklearn.model_selection import train_test_split
+    X = df[feature_cols].values
+    y = df[target_col].values
+    try:
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=HOLDOUT_SIZE, random_state=RANDOM_STATE)
+        if len(y_test) >= 2:
+            scorer = LinearRegression().fit(X_train, y_train)
+            meta["r2_holdout"] = round(float(r2_score(y_test, scorer.predict(X_test))), 4)
+        model = LinearRegression().fit(X, y)
+    except Exception:
+        return None, meta
+    return model, meta
+
+# ---------- Persistence ----------
+def save_model(model: "LinearRegression", meta: Dict[str, Any], fingerprint: str, model_dir: str) -> str:
+    import joblib
+    os.makedirs(model_dir, exist_ok=True)
+    key = _model_key(fingerprint, meta["features"])
+    path = os.path.join(model_dir, f"{key}.joblib")
+    joblib.dump(model, path)
+    with open(os.path.join(model_dir, f"{key}.json"), "w", encoding="utf-8") as f:
+        json.dump(dict(meta, fingerprint=fingerprint), f, indent=2)
+    return path
+
+def load_model(fingerprint: str, feature_cols: Sequence[str], model_dir: str) -> Optional[Tuple["LinearRegression", Dict[str, Any]]]:
+    import joblib
+    key = _model_key(fingerprint, list(feature_cols))
+    path = os.path.join(model_dir, f"{key}.joblib")
+    meta_path = os.path.join(model_dir, f"{key}.json")
+    if not (os.path.exists(path) and os.path.exists(meta_path)):
+        return None
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("fingerprint") != fingerprint or meta.get("features") != list(feature_cols):
+            return None
+        return joblib.load(path), meta
+    except Exception:
+        return None
+
+def load_or_train_model(df: pd.DataFrame, fingerprint: str, feature_cols: Sequence[str] = FEATURE_COLS,
+                        model_dir: str = "") -> Tuple[Optional["LinearRegression"], Dict[str, Any]]:
+    """Reuse a persisted model for this fingerprint if `model_dir` is set, otherwise train (and persist)."""
+    if model_dir:
+        cached = load_model(fingerprint, feature_cols, model_dir)
+        if cached is not None:
+            model, meta = cached
+            meta["source"] = "disk"
+            return model, meta
+    model, meta = train_efficiency_model(df, feature_cols)
+    meta["source"] = "trained"
+    if model is not None and model_dir:
+        try:
+            save_model(model, meta, fingerprint, model_dir)
+        except OSError:
+            pass
+    return model, meta
+
+# ---------- Prediction ----------
+def scenario_features(df: pd.DataFrame, attendance_adj_pct: float = 0.0, tasks_completed_adj_pct: float = 0.0) -> pd.DataFrame:
+    """Model features for every row after applying the attendance / tasks-completed adjustments (in %)."""
+    attendance = np.maximum(0.0, df["Attendance_%"].to_numpy(dtype="float64") * (1 + attendance_adj_pct / 100.0))
+    tasks_completed = np.maximum(0.0, df["Tasks_Completed"].to_numpy(dtype="float64") * (1 + tasks_completed_adj_pct / 100.0))
+    tasks_pending = df["Tasks_Pending"].to_numpy(dtype="float64") if "Tasks_Pending" in df.columns else np.zeros(len(df))
+    tasks_assigned = tasks_completed + tasks_pending
+    with np.errstate(invalid="ignore", divide="ignore"):
+        progress = np.where(tasks_assigned > 0, tasks_completed / np.where(tasks_assigned > 0, tasks_assigned, 1) * 100.0, 0.0)
+    return pd.DataFrame({"Tasks_Assigned": tasks_assigned, "Attendance_%": attendance,
+                         "Basic_Salary": df["Basic_Salary"].to_numpy(dtype="float64"), "Progress_%": progress,
+                         "Tasks_Completed": tasks_completed}, index=df.index)
+
+def predict_efficiency(model, df: pd.DataFrame, attendance_adj_pct: float = 0.0, tasks_completed_adj_pct: float = 0.0,
+                       feature_cols: Sequence[str] = FEATURE_COLS) -> np.ndarray:
+    """
+    Vectorized next-month efficiency for every row of `df` (derived metrics already added).
+    model: fitted regressor or None -> proportional heuristic on current efficiency
+    returns float64 array clipped to 0-100
+    """
+    current = df["Efficiency_%"].to_numpy(dtype="float64")
+    feats = scenario_features(df, attendance_adj_pct, tasks_completed_adj_pct)
+    if model is not None:
+        try:
+            return np.clip(model.predict(feats[list(feature_cols)].to_numpy()), 0, 100)
+        except Exception:
+            return current.copy()
+    # fallback heuristic: adjust current efficiency proportionally to attendance and progress
+    att0 = df["Attendance_%"].to_numpy(dtype="float64")
+    prog0 = df["Progress_%"].to_numpy(dtype="float64")
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        eff = current * (feats["Attendance_%"].to_numpy() / np.maximum(1e-6, att0)) \
+            * (feats["Progress_%"].to_numpy() / np.maximum(1e-6, np.where(prog0 > 0, prog0, 1)))
+    # if progress was zero, don't explode
+    return np.where(np.isfinite(eff) & (eff > 0), np.clip(eff, 0, 100), current)
+
+def project_efficiency(current, predicted) -> np.ndarray:
+    """
+    6-month projection: current -> predicted -> extrapolate with a decaying monthly step.
+    current / predicted: scalars or arrays; returns array [..., len(PROJECTION_MONTHS)]
+    """
+    current = np.asarray(current, dtype="float64")
+    predicted = np.asarray(predicted, dtype="float64")
+    monthly_step = (predicted - current) / 1.5  # faster convergence for demo
+    values = [current, predicted]
+    for i in range(2, len(PROJECTION_MONTHS)):
+        values.append(np.clip(values[-1] + monthly_step * (PROJECTION_DECAY ** (i - 2)), 0, 100))
+    return np.stack(values, axis=-1)
+
+def forecast_frame(df: pd.DataFrame, model, attendance_adj_pct: float = 0.0, tasks_completed_adj_pct: float = 0.0) -> pd.DataFrame:
+    """Adds Predicted_Eff_Next and the Eff_M+1..Eff_M+5 projection columns (in place)."""
+    pred = predict_efficiency(model, df, attendance_adj_pct, tasks_completed_adj_pct)
+    proj = project_efficiency(df["Efficiency_%"].to_numpy(dtype="float64"), pred)
+    df["Predicted_Eff_Next"] = pred
+    for j, month in enumerate(PROJECTION_MONTHS[1:], start=1):
+        df[f"Eff_{month}"] = proj[:, j]
+    return df
+
+# ---------- Scenario sweep ----------
+SWEEP_CELLS_PER_BLOCK = 4_000_000  # rows x grid cells evaluated per block
+
+def linear_coefficients(model, feature_cols: Sequence[str] = FEATURE_COLS) -> Optional[Tuple[Dict[str, float], float]]:
+    """
+    Raw-feature weights and intercept of a linear model, or None if `model` is not linear.
+    Models with a `scaler` + `regressor` pair (the incremental model) are folded back to raw units.
+    """
+    if model is None:
+        return None
+    reg, scaler = model, None
+    if hasattr(model, "regressor") and hasattr(model, "scaler"):
+        reg, scaler = model.regressor, model.scaler
+    if not hasattr(reg, "coef_") or np.ravel(reg.coef_).shape[0] != len(feature_cols):
+        return None
+    w = np.ravel(reg.coef_).astype("float64")
+    b = float(np.ravel(reg.intercept_)[0])
+    if scaler is not None:
+        w = w / scaler.scale_
+        b = b - float(np.sum(w * scaler.mean_))
+    return dict(zip(feature_cols, w)), b
+
+def scenario_sweep(model, df: pd.DataFrame, attendance_adjs: Sequence[float], task_adjs: Sequence[float],
+                   by: Optional[str] = "Department") -> Dict[str, Any]:
+    """
+    Average predicted efficiency for every (attendance adj, tasks-completed adj) pair, overall and per `by` group.
+    Linear models are evaluated as one broadcasted (rows x attendance x tasks) computation in row blocks;
+    anything else falls back to one vectorized predict_efficiency() call per grid cell.
+    returns dict(attendance_adj, tasks_adj, mean [A, T], groups, group_mean [G, A, T], group_rows)
+    """
+    A = np.asarray(attendance_adjs, dtype="float64")
+    T = np.asarray(task_adjs, dtype="float64")
+    n = len(df)
+    if by and by in df.columns:
+        codes, labels = pd.factorize(df[by], use_na_sentinel=False)
+        groups = [str(g) for g in labels]
+    else:
+        codes, groups = np.zeros(n, dtype="int64"), ["All"]
+    G = len(groups)
+    counts = np.bincount(codes, minlength=G).astype("float64")
+    sums = np.zeros((G, len(A), len(T)))
+
+    lin = linear_coefficients(model)
+    if lin is None:
+        for i, a in enumerate(A):
+            for j, t in enumerate(T):
+                sums[:, i, j] = np.bincount(codes, weights=predict_efficiency(model, df, a, t), minlength=G)
+    else:
+        w, b = lin
+        att0 = df["Attendance_%"].to_numpy(dtype="float64")
+        tc0 = df["Tasks_Completed"].to_numpy(dtype="float64")
+        pend = df["Tasks_Pending"].to_numpy(dtype="float64") if "Tasks_Pending" in df.columns else np.zeros(n)
+        sal = df["Basic_Salary"].to_numpy(dtype="float64")
+        block = max(1, SWEEP_CELLS_PER_BLOCK // max(1, len(A) * len(T)))
+        for s in range(0, n, block):
+            e = min(n, s + block)
+            att = np.maximum(0.0, att0[s:e, None] * (1 + A / 100.0))                  # [b, A]
+            tc = np.maximum(0.0, tc0[s:e, None] * (1 + T / 100.0))                    # [b, T]
+            assigned = tc + pend[s:e, None]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                progress = np.where(assigned > 0, tc / np.where(assigned > 0, assigned, 1) * 100.0, 0.0)
+            part_t = w["Tasks_Assigned"] * assigned + w["Progress_%"] * progress     # [b, T]
+            part_a = w["Attendance_%"] * att                                          # [b, A]
+            base = b + w["Basic_Salary"] * sal[s:e]                                   # [b]
+            pred = np.clip(base[:, None, None] + part_a[:, :, None] + part_t[:, None, :], 0, 100)
+            onehot = np.zeros((G, e - s))
+            onehot[codes[s:e], np.arange(e - s)] = 1.0
+            sums += (onehot @ pred.reshape(e - s, -1)).reshape(G, len(A), len(T))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        group_mean = sums / counts[:, None, None]
+    return {"attendance_adj": A, "tasks_adj": T, "mean": sums.sum(axis=0) / max(1, n),
+            "groups": groups, "group_mean": group_mean, "group_rows": counts.astype("int64")}
@@ -112,6 +112,9 @@ class MasterEMS:
         self.tasks: Dict[str, Task] = {}
         self.leaves: Dict[str, LeaveRequest] = {}
         self.payrolls: Dict[str, PayrollRecord] = {}  # payroll_id -> PayrollRecord
+        # change tracking: bumped by every mutation that affects an employee's KPIs
+        self.version = 0
+        self.employee_versions: Dict[str, int] = {}
         # demo auth
         self.default_users = {"admin@example.com":{"password":"admin","role":"Admin"}, "manager@example.com":{"password":"manager","role":"Manager"}}
 
@@ -122,6 +125,12 @@ class MasterEMS:
         self._load_leaves_csv()
         self._load_payrolls_csv()
 
+    def _touch(self, *emp_ids: Optional[str]):
+        self.version += 1
+        for emp_id in emp_ids:
+            if emp_id:
+                self.employee_versions[emp_id] = self.version
+
     # ---------- CSV load/save implementations ----------
     def _load_employees_csv(self):
         rows = load_csv_dict(EMP_CSV)
@@ -210,6 +219,7 @@ class MasterEMS:
         eid = _uid()
         e = Employee(eid, name, role, department, email, basic_salary)
         self.employees[eid] = e
+        self._touch(eid)
         return eid
 
     def update_employee(self, emp_id: str, **kwargs) -> bool:
@@ -218,6 +228,7 @@ class MasterEMS:
         for k,v in kwargs.items():
             if hasattr(e,k):
                 setattr(e,k,v)
+        self._touch(emp_id)
         return True
 
     def list_employees(self) -> List[Employee]:
@@ -230,6 +241,7 @@ class MasterEMS:
         self.tasks[tid] = t
         if assignee_id and assignee_id in self.employees:
             self.employees[assignee_id].task_ids.append(tid)
+            self._touch(assignee_id)
         return tid
 
     def assign_task(self, task_id: str, emp_id: str) -> bool:
@@ -240,7 +252,9 @@ class MasterEMS:
             old = self.employees[t.assignee_id]
             if task_id in old.task_ids:
                 old.task_ids.remove(task_id)
+            self._touch(t.assignee_id)
         t.assignee_id = emp_id
+        self._touch(emp_id)
         if task_id not in e.task_ids: e.task_ids.append(task_id)
         return True
 
@@ -255,6 +269,7 @@ class MasterEMS:
             t.status = "Completed"
         elif percent > 0:
             t.status = "In Progress"
+        self._touch(t.assignee_id)
         return True
 
     # ---------- Attendance ----------
@@ -267,8 +282,10 @@ class MasterEMS:
         for rec in e.attendance:
             if rec["date"] == today:
                 rec["check_in"] = ts
+                self._touch(emp_id)
                 return True
         e.attendance.append({"date": today, "check_in": ts, "check_out": None, "hours": 0.0})
+        self._touch(emp_id)
         return True
 
     def check_out(self, emp_id: str, ts: Optional[str] = None) -> bool:
@@ -289,9 +306,11 @@ class MasterEMS:
                         rec["hours"] = round(seconds/3600.0,2)
                     except Exception:
                         rec["hours"] = 0.0
+                self._touch(emp_id)
                 return True
         # no record
         e.attendance.append({"date": today, "check_in": None, "check_out": ts, "hours": 0.0})
+        self._touch(emp_id)
         return True
 
     # ---------- Leaves ----------
@@ -314,6 +333,7 @@ class MasterEMS:
         e = self.employees.get(emp_id)
         if not e: return False
         e.points += int(points)
+        self._touch(emp_id)
         return True
 
     def assign_badge(self, emp_id: str, badge: str) -> bool:
@@ -322,6 +342,7 @@ class MasterEMS:
         if badge not in e.badges:
             e.badges.append(badge)
             e.points += 50
+            self._touch(emp_id)
         return True
 
     def leaderboard(self, top_n: int = 10) -> List[Dict[str,Any]]:
@@ -0,0 +1,106 @@
+from typing import Optional, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+# ---------- Employee name index ----------
+class NameIndex:
+    """
+    Prefix index over lowercased employee names, keyed by Employee_ID.
+    Distinct names are indexed once at every word start ("michael ellis" and "ellis"), so a query
+    matches a prefix of the full name or of any later word. Lookups are binary searches on a sorted
+    key array; duplicate names map to all their rows (in file order).
+    Ranking: exact name, then full-name prefix, then word prefix.
+    """
+    def __init__(self, names: Sequence[str], ids: Optional[Sequence[str]] = None):
+        lower = pd.Series(np.asarray(names, dtype="object")).fillna("").astype(str).str.lower().str.strip()
+        self.names = np.asarray(names, dtype="object")
+        self.ids = np.asarray(ids if ids is not None else [f"#{i}" for i in range(len(lower))], dtype="object")
+        self._id_pos = pd.Index(self.ids)
+
+        # distinct name -> rows (CSR layout)
+        codes, uniq = pd.factorize(lower)
+        self._rows = np.argsort(codes, kind="stable")
+        self._counts = np.bincount(codes, minlength=len(uniq))
+        self._start = np.r_[0, np.cumsum(self._counts)[:-1]].astype("int64")
+
+        # one key per word start of every distinct name
+        keys, owners, fulls = [], [], []
+        s = pd.Series(uniq, dtype="object")
+        own = np.arange(len(uniq))
+        first = True
+        while len(s):
+            keys.append(s)
+            owners.append(own)
+            fulls.append(np.full(len(s), first))
+            s = s.str.partition(" ")[2]
+            ok = (s != "").to_numpy()
+            s, own, first = s[ok], own[ok], False
+        all_keys = pd.concat(keys, ignore_index=True) if keys else pd.Series([], dtype="object")
+        order = all_keys.sort_values(kind="stable").index.to_numpy()
+        self._keys = all_keys.to_numpy(dtype="object")[order]
+        self._owner = np.concatenate(owners)[order] if owners else np.array([], dtype="int64")
+        self._full = np.concatenate(fulls)[order] if fulls else np.array([], dtype=bool)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "NameIndex":
+        ids = df["Employee_ID"].astype(str).to_numpy() if "Employee_ID" in df.columns else None
+        return cls(df["Name"].to_numpy(), ids)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _matching_names(self, query: str) -> Optional[np.ndarray]:
+        """Ranked distinct-name ids for `query`; None means "no filter"."""
+        q = query.lower().strip()
+        if not q:
+            return None
+        lo = np.searchsorted(self._keys, q, side="left")
+        hi = np.searchsorted(self._keys, q + "\U0010ffff", side="left")
+        keys, owner, full = self._keys[lo:hi], self._owner[lo:hi], self._full[lo:hi]
+        exact = full & (keys == q)
+        return pd.unique(np.concatenate([owner[exact], owner[full & ~exact], owner[~full]]))
+
+    def _rows_of(self, name_ids: np.ndarray) -> np.ndarray:
+        lens = self._counts[name_ids]
+        if not len(lens):
+            return np.array([], dtype="int64")
+        offsets = np.repeat(self._start[name_ids] - np.r_[0, np.cumsum(lens)[:-1]], lens) + np.arange(lens.sum())
+        return self._rows[offsets]
+
+    def match_positions(self, query: str, limit: Optional[int] = None) -> np.ndarray:
+        """Row positions of the matches, ranked; file order for an empty query."""
+        name_ids = self._matching_names(query)
+        if name_ids is None:
+            n = len(self.names) if limit is None else min(limit, len(self.names))
+            return np.arange(n)
+        if limit is not None:
+            name_ids = name_ids[:limit]  # every distinct name has at least one row
+        rows = self._rows_of(name_ids)
+        return rows if limit is None else rows[:limit]
+
+    def search(self, query: str, limit: int = 50) -> List[str]:
+        """Employee_IDs of the best `limit` matches."""
+        return list(self.ids[self.match_positions(query, limit)])
+
+    def count(self, query: str) -> int:
+        name_ids = self._matching_names(query)
+        return len(self.names) if name_ids is None else int(self._counts[name_ids].sum())
+
+    def position_of(self, emp_id: str) -> Optional[int]:
+        try:
+            loc = self._id_pos.get_loc(emp_id)
+        except KeyError:
+            return None
+        if isinstance(loc, slice):
+            return loc.start
+        if isinstance(loc, np.ndarray):
+            return int(np.flatnonzero(loc)[0])
+        return int(loc)
+
+    @property
+    def nbytes(self) -> int:
+        """Index arrays, keys and id lookup (names are the frame's own column, not counted)."""
+        arrays = sum(a.nbytes for a in (self._rows, self._counts, self._start, self._owner, self._full))
+        keys = pd.Series(self._keys, dtype="object").memory_usage(deep=True, index=False)
+        return int(arrays + keys + self._id_pos.memory_usage(deep=True))
@@ -0,0 +1,74 @@
+from typing import Optional, List, Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+# ---------- Aggregation cube ----------
+DIMENSIONS = ["Department", "City", "Work_Mode", "Designation", "Gender"]
+MEASURES = ["Efficiency_%", "Attendance_%", "Productivity_Index", "Basic_Salary", "Overtime_Hours",
+            "Tasks_Completed", "Tasks_Assigned", "Progress_%"]
+
+class AggregationCube:
+    """
+    Base cuboid of the progress dataset: one cell per observed Department x City x Work_Mode x
+    Designation x Gender combination holding row count and, per measure, count / sum / sum of squares.
+    Every roll-up or slice is answered from these cells (a few thousand rows at most), never from the
+    raw frame; mean and std are recovered from the additive moments.
+    """
+    def __init__(self, df: pd.DataFrame, dimensions: Sequence[str] = DIMENSIONS, measures: Sequence[str] = MEASURES):
+        self.dimensions = [d for d in dimensions if d in df.columns]
+        self.measures = [m for m in measures if m in df.columns]
+        vals = {m: pd.to_numeric(df[m], errors="coerce").astype("float64") for m in self.measures}
+        tmp = pd.DataFrame({**{d: df[d] for d in self.dimensions}, **vals,
+                            **{f"sq:{m}": v * v for m, v in vals.items()}})
+        if not self.dimensions:
+            tmp["_all"] = "All"
+            keys = ["_all"]
+        else:
+            keys = self.dimensions
+        grouped = tmp.groupby(keys, observed=True, dropna=False)
+        cells = pd.concat([
+            grouped.size().rename("rows"),
+            grouped[self.measures].count().add_prefix("n:"),
+            grouped[self.measures].sum().add_prefix("sum:"),
+            grouped[[f"sq:{m}" for m in self.measures]].sum(),
+        ], axis=1).reset_index()
+        self.cells = cells.drop(columns=["_all"], errors="ignore")
+        self.total_rows = int(len(df))
+
+    def members(self, dim: str) -> List[str]:
+        return sorted(self.cells[dim].dropna().astype(str).unique())
+
+    def query(self, by: Sequence[str] = (), filters: Optional[Dict[str, Sequence[str]]] = None,
+              measures: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        by: dimensions to group by (empty = grand total)
+        filters: {dimension: allowed members}; empty/missing lists mean "all"
+        returns one row per group with rows, <measure> (mean), <measure>_std and <measure>_sum
+        """
+        measures = [m for m in (measures or self.measures) if m in self.measures]
+        cells = self.cells
+        for dim, allowed in (filters or {}).items():
+            if allowed and dim in self.dimensions:
+                cells = cells[cells[dim].isin(list(allowed))]
+        by = [d for d in by if d in self.dimensions]
+        moment_cols = ["rows"] + [f"{k}:{m}" for m in measures for k in ("n", "sum", "sq")]
+        if by:
+            agg = cells.groupby(by, observed=True, dropna=False)[moment_cols].sum().reset_index()
+        else:
+            agg = cells[moment_cols].sum().to_frame().T
+        out = agg[by + ["rows"]].copy()
+        out["rows"] = out["rows"].astype("int64")
+        for m in measures:
+            n, s, sq = agg[f"n:{m}"].to_numpy(float), agg[f"sum:{m}"].to_numpy(float), agg[f"sq:{m}"].to_numpy(float)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean = np.where(n > 0, s / n, np.nan)
+                var = np.where(n > 1, (sq - s * s / np.where(n > 0, n, 1)) / (n - 1), np.nan)
+            out[m] = mean
+            out[f"{m}_std"] = np.sqrt(np.clip(var, 0, None))
+            out[f"{m}_sum"] = s
+        return out
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.cells.memory_usage(deep=True).sum())
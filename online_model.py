@@ -0,0 +1,139 @@
+import os
+import threading
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Sequence
+
+import numpy as np
+import pandas as pd
+
+from forecasting import FEATURE_COLS, TARGET_COL
+
+# ---------- Incremental efficiency model ----------
+PARTIAL_FIT_EPOCHS = 5
+BATCH_ROWS = 10_000
+EVAL_SAMPLE_ROWS = 50_000
+ONLINE_MODEL_FILE = "online_model.joblib"
+
+def row_versions(df: pd.DataFrame, cols: Sequence[str]) -> pd.Series:
+    """
+    Version tag per employee: Last_Updated when the file has it, else a hash of the modelled columns.
+    returns Series indexed by Employee_ID (or row position when there is no ID column)
+    """
+    ids = df["Employee_ID"].astype(str).to_numpy() if "Employee_ID" in df.columns else np.arange(len(df)).astype(str)
+    if "Last_Updated" in df.columns:
+        ver = df["Last_Updated"].astype(str).to_numpy()
+    else:
+        ver = pd.util.hash_pandas_object(df[list(cols)], index=False).astype(str).to_numpy()
+    return pd.Series(ver, index=ids)
+
+class OnlineEfficiencyModel:
+    """
+    StandardScaler + SGDRegressor trained with partial_fit.
+    update() only learns from rows whose Employee_ID is new or whose Last_Updated changed since the
+    previous snapshot, so repeated monthly uploads cost proportional to what actually changed.
+    One instance is shared by every session: update(), predict() and evaluate() hold the same lock, so a
+    prediction never sees the scaler / regressor half-way through another session's partial_fit.
+    """
+    def __init__(self, feature_cols: Sequence[str] = FEATURE_COLS, target_col: str = TARGET_COL, random_state: int = 42):
+        # scikit-learn loads with the first model, not with this module
+        from sklearn.linear_model import SGDRegressor
+        from sklearn.preprocessing import StandardScaler
+        self.feature_cols = list(feature_cols)
+        self.target_col = target_col
+        self.scaler = StandardScaler()
+        self.regressor = SGDRegressor(alpha=1e-4, learning_rate="invscaling", eta0=0.01, random_state=random_state)
+        self.versions = pd.Series(dtype="object")
+        self.applied: List[str] = []  # dataset fingerprints already learned from
+        self.history: List[Dict[str, Any]] = []
+        self.rows_seen = 0
+        self._rng = np.random.default_rng(random_state)
+        self._lock = threading.Lock()
+
+    @property
+    def fitted(self) -> bool:
+        return hasattr(self.regressor, "coef_")
+
+    def changed_mask(self, df: pd.DataFrame) -> np.ndarray:
+        ver = row_versions(df, self.feature_cols + [self.target_col])
+        prev = self.versions.reindex(ver.index).to_numpy()
+        return prev != ver.to_numpy()
+
+    def update(self, df: pd.DataFrame, fingerprint: Optional[str] = None) -> Dict[str, Any]:
+        """Learn from new/changed rows of a snapshot; a fingerprint already applied is a no-op."""
+        with self._lock:
+            if fingerprint is not None and fingerprint in self.applied:
+                return {"rows": len(df), "updated": 0, "skipped": True}
+            mask = self.changed_mask(df)
+            delta = df.loc[mask, self.feature_cols + [self.target_col]]
+            X = delta[self.feature_cols].to_numpy(dtype="float64")
+            y = delta[self.target_col].to_numpy(dtype="float64")
+            if len(X):
+                self.scaler.partial_fit(X)
+                Xs = self.scaler.transform(X)
+                for _ in range(PARTIAL_FIT_EPOCHS):
+                    order = self._rng.permutation(len(Xs))
+                    for start in range(0, len(order), BATCH_ROWS):
+                        idx = order[start:start + BATCH_ROWS]
+                        self.regressor.partial_fit(Xs[idx], y[idx])
+                self.rows_seen += len(X)
+            ver = row_versions(df, self.feature_cols + [self.target_col])
+            ver = ver[~ver.index.duplicated(keep="last")]
+            self.versions = pd.concat([self.versions[~self.versions.index.isin(ver.index)], ver])
+            if fingerprint is not None:
+                self.applied.append(fingerprint)
+            return {"rows": len(df), "updated": int(len(X)), "skipped": False}
+
+    def _predict(self, X) -> np.ndarray:
+        return self.regressor.predict(self.scaler.transform(np.asarray(X, dtype="float64")))
+
+    def predict(self, X) -> np.ndarray:
+        with self._lock:
+            return self._predict(X)
+
+    def evaluate(self, df: pd.DataFrame, baseline=None, fingerprint: Optional[str] = None) -> Dict[str, Any]:
+        """
+        R²/MAE of the online model on (a sample of) `df`, next to the full-refit `baseline` model.
+        The result is appended to self.history.
+        """
+        from sklearn.metrics import mean_absolute_error, r2_score
+        sample = df if len(df) <= EVAL_SAMPLE_ROWS else df.sample(n=EVAL_SAMPLE_ROWS, random_state=0)
+        X = sample[self.feature_cols].to_numpy(dtype="float64")
+        y = sample[self.target_col].to_numpy(dtype="float64")
+        with self._lock:
+            pred = np.clip(self._predict(X), 0, 100)
+            rows_learned = self.rows_seen
+        rec: Dict[str, Any] = {"at": datetime.utcnow().isoformat(timespec="seconds"), "fingerprint": (fingerprint or "")[:12],
+                               "rows": int(len(df)), "rows_learned": int(rows_learned),
+                               "r2_online": round(float(r2_score(y, pred)), 4), "mae_online": round(float(mean_absolute_error(y, pred)), 3)}
+        if baseline is not None:
+            base = np.clip(baseline.predict(X), 0, 100)
+            rec["r2_full"] = round(float(r2_score(y, base)), 4)
+            rec["mae_full"] = round(float(mean_absolute_error(y, base)), 3)
+            rec["mae_vs_full"] = round(float(np.mean(np.abs(pred - base))), 3)
+        with self._lock:
+            self.history.append(rec)
+        return rec
+
+    # ---------- Persistence ----------
+    def save(self, model_dir: str) -> str:
+        import joblib
+        os.makedirs(model_dir, exist_ok=True)
+        path = os.path.join(model_dir, ONLINE_MODEL_FILE)
+        with self._lock:
+            state = {k: v for k, v in self.__dict__.items() if k != "_lock"}
+            joblib.dump(state, path)
+        return path
+
+    @classmethod
+    def load(cls, model_dir: str) -> Optional["OnlineEfficiencyModel"]:
+        import joblib
+        path = os.path.join(model_dir, ONLINE_MODEL_FILE)
+        if not os.path.exists(path):
+            return None
+        try:
+            state = joblib.load(path)
+        except Exception:
+            return None
+        m = cls(state.get("feature_cols", FEATURE_COLS), state.get("target_col", TARGET_COL))
+        m.__dict__.update(state)
+        return m
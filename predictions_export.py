@@ -0,0 +1,70 @@
+import gzip
+import importlib.util
+import io
+from typing import Optional, Dict, Sequence, Iterator, BinaryIO
+
+import pandas as pd
+
+# ---------- Export formats ----------
+# format -> label, file extension and MIME type; Parquet is only offered when pyarrow is installed (probed without importing it)
+EXPORT_FORMATS: Dict[str, Dict[str, str]] = {
+    "csv": {"label": "CSV", "ext": "csv", "mime": "text/csv"},
+    "csv.gz": {"label": "CSV (gzip)", "ext": "csv.gz", "mime": "application/gzip"},
+}
+if importlib.util.find_spec("pyarrow") is not None:
+    EXPORT_FORMATS["parquet"] = {"label": "Parquet", "ext": "parquet", "mime": "application/vnd.apache.parquet"}
+
+EXPORT_CHUNK_ROWS = 10_000
+GZIP_LEVEL = 6
+
+def export_file_name(stem: str, fmt: str) -> str:
+    return f"{stem}.{EXPORT_FORMATS[fmt]['ext']}"
+
+# ---------- Chunked serialization ----------
+def iter_csv_chunks(df: pd.DataFrame, chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """UTF-8 CSV of df (header first), `chunk_rows` rows at a time; same text as df.to_csv(index=False)."""
+    yield df.iloc[:0].to_csv(index=False).encode("utf-8")
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(index=False, header=False).encode("utf-8")
+
+def _write_parquet(df: pd.DataFrame, fileobj: BinaryIO, chunk_rows: int):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    writer = None
+    try:
+        # one row group per chunk, all cast to the first chunk's schema
+        for start in range(0, max(len(df), 1), chunk_rows):
+            table = pa.Table.from_pandas(df.iloc[start:start + chunk_rows], preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(fileobj, table.schema)
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+def write_export(df: pd.DataFrame, fileobj: BinaryIO, fmt: str = "csv", columns: Optional[Sequence[str]] = None,
+                 chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """
+    Serializes df (optionally only `columns`, in that order) into a binary file object chunk by chunk,
+    so no full-frame CSV string is ever built.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt} (available: {', '.join(EXPORT_FORMATS)})")
+    if columns is not None:
+        df = df[list(columns)]
+    if fmt == "parquet":
+        _write_parquet(df, fileobj, chunk_rows)
+    elif fmt == "csv.gz":
+        # mtime=0 keeps the archive byte-identical for identical data
+        with gzip.GzipFile(fileobj=fileobj, mode="wb", compresslevel=GZIP_LEVEL, mtime=0) as gz:
+            for chunk in iter_csv_chunks(df, chunk_rows):
+                gz.write(chunk)
+    else:
+        for chunk in iter_csv_chunks(df, chunk_rows):
+            fileobj.write(chunk)
+
+def export_bytes(df: pd.DataFrame, fmt: str = "csv", columns: Optional[Sequence[str]] = None,
+                 chunk_rows: int = EXPORT_CHUNK_ROWS) -> bytes:
+    buf = io.BytesIO()
+    write_export(df, buf, fmt, columns, chunk_rows)
+    return buf.getvalue()
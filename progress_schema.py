@@ -0,0 +1,242 @@
+import hashlib
+import importlib.util
+import os
+from typing import Optional, List, Dict, Any, Sequence, Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+
+# ---------- Declared schema for Employee_Progress_Data ----------
+# Only the columns the dashboard actually uses are read; the rest of the 34-column export is skipped.
+# Integer columns are parsed as float32 (so blanks survive) and narrowed to int32 afterwards when complete.
+PROGRESS_SCHEMA: Dict[str, str] = {
+    "Employee_ID": "object",
+    "Name": "object",
+    "Gender": "category",
+    "Department": "category",
+    "Designation": "category",
+    "Work_Mode": "category",
+    "City": "category",
+    "Basic_Salary": "float32",
+    "Productivity_Index": "float32",
+    "Tasks_Completed": "float32",
+    "Tasks_Pending": "float32",
+    "Attendance_%": "float32",
+    "Overtime_Hours": "float32",
+    "Efficiency_%": "float32",
+    "Join_Date": "category",
+    "Last_Updated": "category",
+}
+INT_COLS = ["Tasks_Completed", "Tasks_Pending", "Overtime_Hours"]
+# integers in exported files: INT_COLS plus Tasks_Assigned (added by forecasting.add_derived_metrics)
+EXPORT_INT_COLS = INT_COLS + ["Tasks_Assigned"]
+REQUIRED_COLS = ["Tasks_Completed", "Tasks_Pending", "Efficiency_%", "Attendance_%", "Basic_Salary", "Name"]
+
+# Value rules checked on upload (see progress_validation.py); a row breaking any of them is rejected.
+# Required columns must be present and non-missing in every row; ranges are inclusive (None = unbounded).
+VALUE_RANGES: Dict[str, Tuple[Optional[float], Optional[float]]] = {
+    "Efficiency_%": (0, 100),
+    "Attendance_%": (0, 100),
+    "Basic_Salary": (0, None),
+    "Tasks_Completed": (0, None),
+    "Tasks_Pending": (0, None),
+    "Overtime_Hours": (0, None),
+    "Productivity_Index": (0, None),
+}
+UNIQUE_COLS = ["Employee_ID"]
+DATE_COLS = ["Join_Date", "Last_Updated"]
+DATE_FORMAT = "ISO8601"  # yyyy-mm-dd, optionally with a time; blank dates are allowed
+
+# pyarrow's multi-threaded CSV parser is used when installed (probed without importing it)
+CSV_ENGINE = "pyarrow" if importlib.util.find_spec("pyarrow") is not None else "c"
+
+PARQUET_EXTS = (".parquet", ".pq")
+ARROW_EXTS = (".feather", ".arrow", ".ipc")
+
+# ---------- Helpers ----------
+def _source_name(source: Any) -> str:
+    if isinstance(source, (str, os.PathLike)):
+        return str(source)
+    return getattr(source, "name", "") or ""
+
+def _rewind(source: Any):
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+def source_format(source: Any) -> str:
+    name = _source_name(source).lower()
+    if name.endswith(PARQUET_EXTS):
+        return "parquet"
+    if name.endswith(ARROW_EXTS):
+        return "arrow"
+    return "csv"
+
+def source_fingerprint(source: Any, block_size: int = 1 << 20) -> str:
+    """sha1 of the raw upload bytes; cheap dataset key for caches (no parsing involved)."""
+    h = hashlib.sha1()
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                h.update(block)
+        return h.hexdigest()
+    _rewind(source)
+    for block in iter(lambda: source.read(block_size), b""):
+        h.update(block)
+    _rewind(source)
+    return h.hexdigest()
+
+def csv_columns(source: Any) -> List[str]:
+    """Header of a CSV source without parsing any rows."""
+    _rewind(source)
+    cols = list(pd.read_csv(source, nrows=0).columns)
+    _rewind(source)
+    return cols
+
+def _narrow_ints(df: pd.DataFrame) -> pd.DataFrame:
+    for c in INT_COLS:
+        if c in df.columns and not df[c].hasnans:
+            df[c] = df[c].astype("int32")
+    return df
+
+def nullable_ints(df: pd.DataFrame, cols: Sequence[str] = EXPORT_INT_COLS) -> pd.DataFrame:
+    """
+    Integer columns as nullable Int32 for export, with or without blanks, so files write 33 rather than 33.0
+    and every chunk of a batch output has the same schema. A column holding fractions is left as it is.
+    """
+    for c in cols:
+        if c not in df.columns or not pd.api.types.is_numeric_dtype(df[c]):
+            continue
+        v = df[c].to_numpy(dtype="float64", na_value=np.nan)
+        if np.all(np.mod(v[~np.isnan(v)], 1) == 0):
+            df[c] = df[c].astype("Int32")
+    return df
+
+def _str_categories(df: pd.DataFrame) -> pd.DataFrame:
+    """pyarrow's CSV parser turns date-like categories into datetime.date; keep them as the text of the file."""
+    for c in df.columns:
+        if isinstance(df[c].dtype, pd.CategoricalDtype) and df[c].cat.categories.dtype == object:
+            df[c] = df[c].cat.rename_categories(df[c].cat.categories.astype(str))
+    return df
+
+def _parse_dtypes(usecols: Sequence[str], schema: Dict[str, str], numeric: bool = True) -> Dict[str, str]:
+    """read_csv dtypes for `usecols`; numeric=False leaves numeric columns to the parser (coerced by apply_schema)."""
+    return {c: schema[c] for c in usecols
+            if c in schema and schema[c] != "object" and (numeric or not schema[c].startswith("float"))}
+
+def apply_schema(df: pd.DataFrame, schema: Optional[Dict[str, str]] = None,
+                 invalid: Optional[Dict[str, np.ndarray]] = None) -> pd.DataFrame:
+    """
+    Coerce an already-loaded frame (e.g. from Parquet) to the declared dtypes.
+    invalid: if given, receives column -> mask of the values that were present but not numeric (now NaN)
+    """
+    schema = schema or PROGRESS_SCHEMA
+    for c, dtype in schema.items():
+        if c not in df.columns or dtype == "object" or str(df[c].dtype) == dtype:
+            continue
+        if dtype.startswith("float"):
+            num = pd.to_numeric(df[c], errors="coerce")
+            if invalid is not None and not pd.api.types.is_numeric_dtype(df[c]):
+                bad = (num.isna() & df[c].notna()).to_numpy()
+                if bad.any():
+                    invalid[c] = bad
+            df[c] = num.astype(dtype)
+        elif dtype == "category":
+            df[c] = df[c].astype(str).where(df[c].notna()).astype("category")
+    return _narrow_ints(df)
+
+# ---------- Reader ----------
+def read_progress(source: Any, columns: Optional[Sequence[str]] = None,
+                  schema: Optional[Dict[str, str]] = None, invalid: Optional[Dict[str, np.ndarray]] = None) -> pd.DataFrame:
+    """
+    source: path or file-like (Streamlit UploadedFile) holding CSV, Parquet or Feather/Arrow IPC
+    columns: subset of the schema to load (default: every schema column present in the file)
+    invalid: if given, receives column -> mask of the cells that were not numeric (read as NaN)
+    returns frame with only the wanted columns, downcast numerics and categorical strings
+    """
+    schema = schema or PROGRESS_SCHEMA
+    wanted = list(columns) if columns is not None else list(schema)
+    fmt = source_format(source)
+    _rewind(source)
+    if fmt == "csv":
+        present = set(csv_columns(source))
+        usecols = [c for c in wanted if c in present]
+        try:
+            df = pd.read_csv(source, usecols=usecols, dtype=_parse_dtypes(usecols, schema), engine=CSV_ENGINE)
+        except ValueError:
+            # a non-numeric cell (e.g. "95%") fails the typed read: read those columns as parsed and
+            # coerce them like Parquet / Arrow input, so the bad cells become NaN. The C parser is used because
+            # pyarrow's fails on integer-looking columns with blanks once they are left to inference
+            _rewind(source)
+            df = pd.read_csv(source, usecols=usecols, dtype=_parse_dtypes(usecols, schema, numeric=False), engine="c")
+            return apply_schema(df, schema, invalid)[usecols]
+        return _str_categories(_narrow_ints(df))[usecols]
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        present = set(pq.read_schema(source).names)
+        _rewind(source)
+        df = pd.read_parquet(source, columns=[c for c in wanted if c in present])
+    else:
+        import pyarrow.feather as feather
+        import pyarrow.ipc as ipc
+        present = set(ipc.open_file(source).schema.names)
+        _rewind(source)
+        df = feather.read_table(source, columns=[c for c in wanted if c in present]).to_pandas()
+    return apply_schema(df, schema, invalid)
+
+# ---------- Chunked reader ----------
+DEFAULT_CHUNK_ROWS = 200_000
+
+def _cleared(invalid: Optional[Dict[str, np.ndarray]]) -> Optional[Dict[str, np.ndarray]]:
+    if invalid is not None:
+        invalid.clear()
+    return invalid
+
+def iter_progress_chunks(source: Any, chunksize: int = DEFAULT_CHUNK_ROWS, columns: Optional[Sequence[str]] = None,
+                         schema: Optional[Dict[str, str]] = None,
+                         invalid: Optional[Dict[str, np.ndarray]] = None) -> Iterator[Tuple[pd.DataFrame, float]]:
+    """
+    Streams the dataset in typed chunks so the full frame never has to fit in memory.
+    yields (chunk, fraction of the input consumed so far)
+    invalid: if given, holds the non-numeric cell masks (see read_progress) of the chunk just yielded
+    """
+    schema = schema or PROGRESS_SCHEMA
+    wanted = list(columns) if columns is not None else list(schema)
+    fmt = source_format(source)
+    _rewind(source)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        pf = pq.ParquetFile(source)
+        cols = [c for c in wanted if c in set(pf.schema_arrow.names)]
+        total = max(1, pf.metadata.num_rows)
+        done = 0
+        for batch in pf.iter_batches(batch_size=chunksize, columns=cols):
+            done += batch.num_rows
+            yield apply_schema(batch.to_pandas(), schema, _cleared(invalid)), min(1.0, done / total)
+        return
+    if fmt == "arrow":
+        import pyarrow.ipc as ipc
+        reader = ipc.open_file(source)
+        cols = [c for c in wanted if c in set(reader.schema.names)]
+        n = max(1, reader.num_record_batches)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i).select(cols)
+            yield apply_schema(batch.to_pandas(), schema, _cleared(invalid)), (i + 1) / n
+        return
+
+    present = set(csv_columns(source))
+    usecols = [c for c in wanted if c in present]
+    # numeric columns are coerced per chunk: a typed read would fail the whole stream on one bad cell
+    dtypes = _parse_dtypes(usecols, schema, numeric=False)
+    opened = None
+    if isinstance(source, (str, os.PathLike)):
+        source = opened = open(source, "rb")
+    try:
+        source.seek(0, os.SEEK_END)
+        total = max(1, source.tell())
+        source.seek(0)
+        # chunked reads need the C parser; pyarrow's engine has no chunksize
+        for chunk in pd.read_csv(source, usecols=usecols, dtype=dtypes, chunksize=chunksize):
+            yield apply_schema(chunk, schema, _cleared(invalid))[usecols], min(1.0, source.tell() / total)
+    finally:
+        if opened is not None:
+            opened.close()
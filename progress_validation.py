@@ -0,0 +1,141 @@
+import time
+from typing import Optional, List, Dict, Any, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from progress_schema import DATE_COLS, DATE_FORMAT, REQUIRED_COLS, UNIQUE_COLS, VALUE_RANGES
+
+# ---------- Data-quality validation ----------
+MAX_REJECTED_ROWS = 10_000  # rejected rows kept (with their reasons) for the report and its download
+
+def _date_failures(s: pd.Series) -> np.ndarray:
+    """Non-blank values of `s` that do not parse as DATE_FORMAT. Only distinct values are parsed."""
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return np.zeros(len(s), dtype=bool)
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        codes, uniq = s.cat.codes.to_numpy(), s.cat.categories
+    else:
+        codes, uniq = pd.factorize(s)
+    if not len(uniq):
+        return np.zeros(len(s), dtype=bool)
+    bad = pd.to_datetime(pd.Series(np.asarray(uniq, dtype="object")), errors="coerce", format=DATE_FORMAT).isna().to_numpy()
+    # code -1 is a blank value
+    return np.append(bad, False)[codes]
+
+class ProgressValidator:
+    """
+    Vectorized checks of the progress dataset against its declared rules (progress_schema: REQUIRED_COLS,
+    VALUE_RANGES, UNIQUE_COLS, DATE_COLS), one boolean array per check and column:
+    values that are not numeric (masks from read_progress(invalid=...)), missing required values, values out of
+    range, dates that do not parse and repeated IDs. IDs are compared among the rows that pass every other check,
+    so the first valid row of an employee is kept even when an earlier row with that ID was rejected.
+    check() can be fed chunks; repeated IDs are then only found within a chunk.
+    """
+    def __init__(self, required: Sequence[str] = REQUIRED_COLS, ranges: Optional[Dict[str, Tuple]] = None,
+                 unique: Sequence[str] = UNIQUE_COLS, dates: Sequence[str] = DATE_COLS,
+                 max_rejected: int = MAX_REJECTED_ROWS):
+        self.required = list(required)
+        self.ranges = VALUE_RANGES if ranges is None else ranges
+        self.unique = list(unique)
+        self.dates = list(dates)
+        self.max_rejected = max_rejected
+        self.rows = 0
+        self.rejected = 0
+        self.seconds = 0.0
+        self.chunks = 0
+        # (check, column, rule) -> failing rows
+        self.failures: Dict[Tuple[str, str, str], int] = {}
+        self._rejected_parts: List[pd.DataFrame] = []
+        self._kept = 0
+
+    def _checks(self, df: pd.DataFrame, invalid: Dict[str, np.ndarray]) -> List[Tuple[Tuple[str, str, str], np.ndarray]]:
+        """Row-level checks (everything but repeated IDs)."""
+        out = [(("not numeric", c, "number"), bad) for c, bad in invalid.items() if c in df.columns]
+        for c in self.required:
+            if c in df.columns:
+                missing = df[c].isna().to_numpy()
+                if c in invalid:
+                    missing = missing & ~invalid[c]
+                out.append((("missing", c, "required"), missing))
+        for c, (lo, hi) in self.ranges.items():
+            if c not in df.columns:
+                continue
+            v = pd.to_numeric(df[c], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+            # NaN compares False: missing values are only counted by the "missing" check
+            bad = np.zeros(len(v), dtype=bool)
+            if lo is not None:
+                bad |= v < lo
+            if hi is not None:
+                bad |= v > hi
+            rule = f"{'-inf' if lo is None else lo} to {'inf' if hi is None else hi}"
+            out.append((("out of range", c, rule), bad))
+        for c in self.dates:
+            if c in df.columns:
+                out.append((("bad date", c, DATE_FORMAT), _date_failures(df[c])))
+        return out
+
+    def _duplicates(self, df: pd.DataFrame, valid: np.ndarray) -> List[Tuple[Tuple[str, str, str], np.ndarray]]:
+        """Repeated IDs among the `valid` rows (the first of them is kept)."""
+        out = []
+        pos = None if valid.all() else np.flatnonzero(valid)
+        for c in self.unique:
+            if c not in df.columns:
+                continue
+            s = df[c] if pos is None else df[c].iloc[pos]
+            dup = (s.duplicated(keep="first") & s.notna()).to_numpy()
+            if pos is not None:
+                dup, sub = np.zeros(len(df), dtype=bool), dup
+                dup[pos] = sub
+            out.append((("duplicate", c, "unique"), dup))
+        return out
+
+    def check(self, df: pd.DataFrame, row_offset: int = 0, invalid: Optional[Dict[str, np.ndarray]] = None) -> np.ndarray:
+        """
+        Reject mask of `df` (True = breaks a rule). row_offset: position of df's first row in the whole file;
+        invalid: non-numeric cell masks of df, as filled by read_progress / iter_progress_chunks.
+        """
+        t0 = time.perf_counter()
+        checks = self._checks(df, invalid or {})
+        reject = np.zeros(len(df), dtype=bool)
+        for _, bad in checks:
+            reject |= bad
+        checks += self._duplicates(df, ~reject)
+        for key, bad in checks:
+            n = int(bad.sum())
+            if n:
+                self.failures[key] = self.failures.get(key, 0) + n
+                reject |= bad
+        self.rows += len(df)
+        self.chunks += 1
+        n_rejected = int(reject.sum())
+        self.rejected += n_rejected
+        room = self.max_rejected - self._kept
+        if n_rejected and room > 0:
+            pos = np.flatnonzero(reject)[:room]
+            reasons = [", ".join(f"{check}: {col}" for (check, col, _), bad in checks if bad[p]) for p in pos]
+            # Row: line of the file (1 = first data row)
+            part = df.iloc[pos].assign(Row=pos + row_offset + 1, Reject_Reason=reasons)
+            self._rejected_parts.append(part[["Row", "Reject_Reason"] + list(df.columns)])
+            self._kept += len(part)
+        self.seconds += time.perf_counter() - t0
+        return reject
+
+    def report(self) -> Dict[str, Any]:
+        """
+        {"rows", "rejected", "checks" (check / column / rule / rows / share_%, failing checks only),
+         "rejected_rows" (first MAX_REJECTED_ROWS rejected rows with Row and Reject_Reason), "seconds", "chunks"}
+        """
+        checks = pd.DataFrame([{"check": k[0], "column": k[1], "rule": k[2], "rows": n,
+                                "share_%": round(n / self.rows * 100, 2) if self.rows else 0.0}
+                               for k, n in self.failures.items()], columns=["check", "column", "rule", "rows", "share_%"])
+        rejected_rows = pd.concat(self._rejected_parts, ignore_index=True) if self._rejected_parts else pd.DataFrame()
+        return {"rows": self.rows, "rejected": self.rejected, "checks": checks, "rejected_rows": rejected_rows,
+                "seconds": round(self.seconds, 3), "chunks": self.chunks}
+
+def validate_progress(df: pd.DataFrame, invalid: Optional[Dict[str, np.ndarray]] = None,
+                      max_rejected: int = MAX_REJECTED_ROWS) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """One-shot validation of an in-memory frame: (reject mask, report) — see ProgressValidator."""
+    v = ProgressValidator(max_rejected=max_rejected)
+    mask = v.check(df, invalid=invalid)
+    return mask, v.report()
@@ -0,0 +1,180 @@
+import json
+import os
+import threading
+from datetime import date, datetime
+from typing import Optional, List, Dict, Any, Sequence
+
+import numpy as np
+import pandas as pd
+
+# ---------- Snapshot store ----------
+TREND_MEASURES = ["Efficiency_%", "Attendance_%", "Progress_%"]
+SNAPSHOT_COLS = ["Employee_ID", "Name", "Department", "Tasks_Completed", "Tasks_Assigned"] + TREND_MEASURES
+MANIFEST_FILE = "manifest.json"
+VERSIONS_FILE = "versions.parquet"
+DEPARTMENTS_FILE = "departments.parquet"
+ROWS_DIR = "rows"
+
+def snapshot_date(df: pd.DataFrame) -> str:
+    """The date an upload describes: its latest Last_Updated, else today (ISO yyyy-mm-dd)."""
+    if "Last_Updated" in df.columns:
+        latest = pd.to_datetime(df["Last_Updated"].astype(str), errors="coerce").max()
+        if pd.notna(latest):
+            return latest.date().isoformat()
+    return date.today().isoformat()
+
+def _compact(df: pd.DataFrame, snapshot: str) -> pd.DataFrame:
+    """Tracked columns only, one row per Employee_ID (last wins), narrow dtypes, plain strings."""
+    cols = [c for c in SNAPSHOT_COLS if c in df.columns]
+    out = df[cols].copy()
+    for c in ("Employee_ID", "Name", "Department"):
+        if c in out.columns:
+            out[c] = out[c].astype(str)
+    for c in cols:
+        if c not in ("Employee_ID", "Name", "Department"):
+            out[c] = pd.to_numeric(out[c], errors="coerce").astype("float32")
+    if "Department" not in out.columns:
+        out["Department"] = "All"
+    if "Last_Updated" in df.columns:
+        updated = pd.to_datetime(df["Last_Updated"].astype(str), errors="coerce")
+        out["Last_Updated"] = updated.fillna(pd.Timestamp(snapshot)).to_numpy()
+    else:
+        out["Last_Updated"] = pd.Timestamp(snapshot)
+    out["Last_Updated"] = out["Last_Updated"].astype("datetime64[ms]")
+    out["Snapshot"] = pd.Timestamp(snapshot)
+    out["Snapshot"] = out["Snapshot"].astype("datetime64[ms]")
+    return out.drop_duplicates("Employee_ID", keep="last").reset_index(drop=True)
+
+def department_moments(rows: pd.DataFrame, snapshot: str) -> pd.DataFrame:
+    """Per-department row count plus count / sum / sum of squares of each trend measure."""
+    measures = [m for m in TREND_MEASURES if m in rows.columns]
+    vals = rows[measures].astype("float64")
+    tmp = pd.concat([rows[["Department"]], vals, (vals * vals).add_prefix("sq:")], axis=1)
+    g = tmp.groupby("Department", observed=True)
+    out = pd.concat([g.size().rename("rows"), g[measures].count().add_prefix("n:"), g[measures].sum().add_prefix("sum:"),
+                     g[[f"sq:{m}" for m in measures]].sum()], axis=1).reset_index()
+    out.insert(0, "Snapshot", pd.Timestamp(snapshot))
+    out["Snapshot"] = out["Snapshot"].astype("datetime64[ms]")
+    return out
+
+class SnapshotStore:
+    """
+    Local history of progress uploads, one snapshot per Last_Updated date.
+    Rows are stored as Parquet parts holding only employees that are new or whose Last_Updated moved
+    since the last snapshot (so unchanged employees cost nothing per month); department aggregates
+    are kept per snapshot in a small side table so org/department trends never scan the row parts.
+    """
+    def __init__(self, root: str):
+        self.root = root
+        self.rows_dir = os.path.join(root, ROWS_DIR)
+        os.makedirs(self.rows_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        path = os.path.join(root, MANIFEST_FILE)
+        self.manifest: List[Dict[str, Any]] = []
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _save_manifest(self):
+        tmp = self._path(MANIFEST_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=1)
+        os.replace(tmp, self._path(MANIFEST_FILE))
+
+    def snapshots(self) -> List[str]:
+        return sorted({m["snapshot"] for m in self.manifest})
+
+    def has(self, fingerprint: str) -> bool:
+        return any(m["fingerprint"] == fingerprint for m in self.manifest)
+
+    def add(self, df: pd.DataFrame, fingerprint: str) -> Dict[str, Any]:
+        """
+        Stores an upload; an already stored fingerprint is a no-op.
+        returns {"snapshot", "rows", "stored", "skipped"} (stored = changed rows written)
+        """
+        if "Employee_ID" not in df.columns:
+            raise ValueError("Snapshots need an Employee_ID column to track employees across uploads")
+        with self._lock:
+            for m in self.manifest:
+                if m["fingerprint"] == fingerprint:
+                    return {"snapshot": m["snapshot"], "rows": m["rows"], "stored": 0, "skipped": True}
+            snap = snapshot_date(df)
+            rows = _compact(df, snap)
+
+            vpath = self._path(VERSIONS_FILE)
+            versions = pd.read_parquet(vpath) if os.path.exists(vpath) else \
+                pd.DataFrame({"Employee_ID": pd.Series(dtype=str), "Last_Updated": pd.Series(dtype="datetime64[ms]")})
+            prev = rows[["Employee_ID"]].merge(versions, on="Employee_ID", how="left")["Last_Updated"]
+            changed = rows[prev.to_numpy() != rows["Last_Updated"].to_numpy()]
+            if len(changed):
+                part = os.path.join(self.rows_dir, f"part-{snap}-{len(self.manifest):05d}.parquet")
+                # sorted by ID so row-group statistics let employee_history skip most of each part
+                changed.sort_values("Employee_ID").to_parquet(part, index=False)
+                versions = pd.concat([versions[~versions["Employee_ID"].isin(changed["Employee_ID"])],
+                                      changed[["Employee_ID", "Last_Updated"]]], ignore_index=True)
+                versions.to_parquet(vpath, index=False)
+
+            # department aggregates describe the whole upload; a re-upload of the same date replaces them
+            dpath = self._path(DEPARTMENTS_FILE)
+            depts = department_moments(rows, snap)
+            if os.path.exists(dpath):
+                old = pd.read_parquet(dpath)
+                depts = pd.concat([old[old["Snapshot"] != pd.Timestamp(snap)], depts], ignore_index=True)
+            depts.sort_values(["Snapshot", "Department"]).to_parquet(dpath, index=False)
+
+            self.manifest.append({"snapshot": snap, "fingerprint": fingerprint, "rows": int(len(rows)),
+                                  "stored": int(len(changed)), "added_at": datetime.utcnow().isoformat(timespec="seconds")})
+            self._save_manifest()
+            return {"snapshot": snap, "rows": int(len(rows)), "stored": int(len(changed)), "skipped": False}
+
+    # ---------- Reads ----------
+    def department_moments(self) -> pd.DataFrame:
+        dpath = self._path(DEPARTMENTS_FILE)
+        return pd.read_parquet(dpath) if os.path.exists(dpath) else pd.DataFrame()
+
+    def employee_history(self, emp_id: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Every stored version of one employee, oldest first (reads only the matching row groups)."""
+        if not os.listdir(self.rows_dir):
+            return pd.DataFrame()
+        cols = None if columns is None else list(dict.fromkeys(["Employee_ID", "Last_Updated", "Snapshot"] + list(columns)))
+        hist = pd.read_parquet(self.rows_dir, columns=cols, filters=[("Employee_ID", "==", str(emp_id))])
+        return hist.sort_values(["Last_Updated", "Snapshot"]).drop_duplicates("Last_Updated", keep="last").reset_index(drop=True)
+
+# ---------- Trend engine ----------
+def department_trend(moments: pd.DataFrame, measure: str = "Efficiency_%", overall: bool = True) -> pd.DataFrame:
+    """
+    moments: SnapshotStore.department_moments()
+    returns long frame Snapshot | Department | rows | mean | std, with an "All" series when overall=True
+    """
+    if moments.empty or f"n:{measure}" not in moments.columns:
+        return pd.DataFrame(columns=["Snapshot", "Department", "rows", "mean", "std"])
+    keep = ["Snapshot", "Department", "rows", f"n:{measure}", f"sum:{measure}", f"sq:{measure}"]
+    parts = [moments[keep]]
+    if overall:
+        org = moments.groupby("Snapshot")[keep[2:]].sum().reset_index()
+        org.insert(1, "Department", "All")
+        parts.append(org[keep])
+    m = pd.concat(parts, ignore_index=True)
+    n, s, sq = m[f"n:{measure}"].to_numpy(float), m[f"sum:{measure}"].to_numpy(float), m[f"sq:{measure}"].to_numpy(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(n > 0, s / n, np.nan)
+        var = np.where(n > 1, (sq - s * s / np.where(n > 0, n, 1)) / (n - 1), np.nan)
+    out = m[["Snapshot", "Department", "rows"]].copy()
+    out["rows"] = out["rows"].astype("int64")
+    out["mean"] = mean
+    out["std"] = np.sqrt(np.clip(var, 0, None))
+    return out.sort_values(["Department", "Snapshot"]).reset_index(drop=True)
+
+def rolling_stats(series: pd.DataFrame, value_col: str = "mean", by: Optional[str] = "Department",
+                  time_col: str = "Snapshot", window: int = 3) -> pd.DataFrame:
+    """Adds rolling mean / std over the last `window` points and the change vs the previous point, per `by` group."""
+    out = series.sort_values(([by] if by else []) + [time_col]).reset_index(drop=True)
+    grouped = out.groupby(by, sort=False)[value_col] if by else out[value_col]
+    roll = grouped.rolling(window, min_periods=1)
+    out[f"{value_col}_roll_mean"] = roll.mean().to_numpy()
+    out[f"{value_col}_roll_std"] = roll.std().to_numpy()
+    out[f"{value_col}_change"] = grouped.diff().to_numpy()
+    return out
@@ -0,0 +1,223 @@
+"""
+Per-stage wall time and peak memory of dashboard runs.
+
+A full script run is split into stages with checkpoints (begin -> mark("load data") -> mark(...) -> end);
+code that runs on its own (an st.fragment rerun, a deferred download) is profiled with run(name).
+Every finished run is kept in a short in-memory history and appended to a JSON-lines log:
+
+    python stage_profiler.py staffsphere_profile.jsonl     # per-stage stats across sessions
+"""
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+import weakref
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Iterator
+
+HISTORY_RUNS = 200
+TRACE_IDLE_SECONDS = 600
+_MB = 1024 * 1024
+
+# ---------- Memory tracing ----------
+# tracemalloc is process-wide: it runs while at least one session holds a lease. A lease is renewed on every
+# profiled run and dropped when the session turns memory tracing off, when its profiler is garbage-collected
+# (session closed) or after TRACE_IDLE_SECONDS without a run, so a tab closed with tracing on cannot keep
+# the whole server traced.
+_trace_lock = threading.Lock()
+_trace_leases: Dict[str, float] = {}
+# traced stages currently open in any session; reset_peak() in one of them cuts the others' peaks
+_open_traced: List[Dict[str, Any]] = []
+
+def _set_tracing(session: str, wanted: bool):
+    with _trace_lock:
+        now = time.monotonic()
+        if wanted:
+            _trace_leases[session] = now
+        else:
+            _trace_leases.pop(session, None)
+        for other, seen in list(_trace_leases.items()):
+            if now - seen > TRACE_IDLE_SECONDS:
+                del _trace_leases[other]
+        if _trace_leases and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not _trace_leases and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+def tracing_sessions() -> int:
+    """Sessions currently holding a memory-tracing lease."""
+    with _trace_lock:
+        return len(_trace_leases)
+
+# ---------- Profiler ----------
+class StageProfiler:
+    """
+    One per session. Disabled profilers make every call a no-op.
+    Stage record: {"stage", "wall_ms", "peak_mb", "net_mb", "overlap"} — peak_mb is the highest traced Python/NumPy
+    allocation above the stage's starting point, net_mb what the stage left allocated (both None without memory tracing).
+    Both are process-wide: they include other sessions' allocations, and overlap is True when another session was
+    profiling memory at the same time (its reset_peak may have cut this stage's peak).
+    """
+    def __init__(self, log_path: Optional[str] = None, history: int = HISTORY_RUNS):
+        self.session = uuid.uuid4().hex[:8]
+        self.log_path = log_path
+        self.enabled = False
+        self.trace_memory = False
+        self.history: deque = deque(maxlen=history)
+        self._run: Optional[Dict[str, Any]] = None
+        self._log_lock = threading.Lock()
+        # releases the tracing lease when the session (and with it this profiler) goes away
+        weakref.finalize(self, _set_tracing, self.session, False)
+
+    def configure(self, enabled: bool, trace_memory: bool = False):
+        trace = enabled and trace_memory
+        # every session calls this on every full run, which also expires the leases of idle sessions
+        _set_tracing(self.session, trace)
+        self.enabled, self.trace_memory = enabled, trace
+        if not enabled:
+            self._run = None
+
+    # ---------- Checkpoints (full script runs) ----------
+    def begin(self, kind: str = "script", **meta):
+        """Starts a run; an unfinished previous run (e.g. cut short by st.stop) is discarded."""
+        self._run = self._new_run(kind, meta) if self.enabled else None
+
+    def mark(self, stage: str):
+        """Closes the current stage and starts `stage`."""
+        if self._run is not None:
+            self._open_stage(self._run, stage)
+
+    def annotate(self, **meta):
+        if self._run is not None:
+            self._run["meta"].update(meta)
+
+    def end(self) -> Optional[Dict[str, Any]]:
+        """Finishes the run, adds it to the history and the log; returns the record."""
+        run, self._run = self._run, None
+        return None if run is None else self._finish(run)
+
+    # ---------- Standalone runs (fragments, downloads) ----------
+    def run(self, stage: str, kind: Optional[str] = None, **meta):
+        """
+        Context manager for code running outside a full script run (fragment reruns, deferred downloads).
+        Called from inside the active run's thread it does nothing, so the enclosing mark() accounts for it.
+        """
+        if not self.enabled or (self._run is not None and self._run["thread"] == threading.get_ident()):
+            return nullcontext()
+        return self._standalone(stage, kind or f"fragment:{stage}", meta)
+
+    @contextmanager
+    def _standalone(self, stage: str, kind: str, meta: Dict[str, Any]) -> Iterator[None]:
+        run = self._new_run(kind, meta)
+        self._open_stage(run, stage)
+        try:
+            yield
+        finally:
+            self._finish(run)
+
+    # ---------- Internals ----------
+    def _new_run(self, kind: str, meta: Dict[str, Any]) -> Dict[str, Any]:
+        if self.trace_memory:
+            _set_tracing(self.session, True)  # renews the lease (fragment reruns do not call configure)
+        return {"kind": kind, "meta": dict(meta), "stages": [], "stage": None, "thread": threading.get_ident(),
+                "t0": time.perf_counter()}
+
+    def _open_stage(self, run: Dict[str, Any], stage: str):
+        self._close_stage(run)
+        st = {"stage": stage, "t0": time.perf_counter(), "mem0": None, "overlap": False}
+        if self.trace_memory and tracemalloc.is_tracing():
+            with _trace_lock:
+                st["mem0"], _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                _open_traced.append(st)
+                if len(_open_traced) > 1:
+                    for other in _open_traced:
+                        other["overlap"] = True
+        run["stage"] = st
+
+    def _close_stage(self, run: Dict[str, Any]):
+        st, run["stage"] = run["stage"], None
+        if st is None:
+            return
+        rec = {"stage": st["stage"], "wall_ms": round((time.perf_counter() - st["t0"]) * 1000, 1), "peak_mb": None,
+               "net_mb": None, "overlap": False}
+        if st["mem0"] is not None:
+            with _trace_lock:
+                _open_traced[:] = [other for other in _open_traced if other is not st]
+                if tracemalloc.is_tracing():
+                    current, peak = tracemalloc.get_traced_memory()
+                    rec["peak_mb"] = round(max(peak - st["mem0"], 0) / _MB, 2)
+                    rec["net_mb"] = round((current - st["mem0"]) / _MB, 2)
+                    rec["overlap"] = st["overlap"]
+        run["stages"].append(rec)
+
+    def _finish(self, run: Dict[str, Any]) -> Dict[str, Any]:
+        self._close_stage(run)
+        record = {"ts": datetime.now().isoformat(timespec="seconds"), "session": self.session, "kind": run["kind"],
+                  **run["meta"], "total_ms": round((time.perf_counter() - run["t0"]) * 1000, 1), "stages": run["stages"]}
+        self.history.append(record)
+        self._log(record)
+        return record
+
+    def _log(self, record: Dict[str, Any]):
+        if not self.log_path:
+            return
+        line = json.dumps(record, default=str)
+        with self._log_lock:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+# ---------- Aggregation ----------
+def read_log(path: str) -> List[Dict[str, Any]]:
+    """Records of a JSON-lines profile log; unreadable lines (e.g. a torn last write) are skipped."""
+    if not os.path.exists(path):
+        return []
+    out = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                out.append(json.loads(line))
+            except ValueError:
+                continue
+    return out
+
+def _percentile(values: List[float], q: float) -> float:
+    s = sorted(values)
+    return s[min(int(round(q * (len(s) - 1))), len(s) - 1)]
+
+def aggregate_stages(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per (run kind, stage): count, median / p95 / max wall ms and max peak MB, slowest median first."""
+    groups: Dict[tuple, Dict[str, list]] = {}
+    for r in records:
+        for s in r.get("stages", []):
+            g = groups.setdefault((r.get("kind", "script"), s["stage"]), {"wall": [], "peak": []})
+            g["wall"].append(s["wall_ms"])
+            if s.get("peak_mb") is not None:
+                g["peak"].append(s["peak_mb"])
+    rows = [{"kind": kind, "stage": stage, "runs": len(g["wall"]), "median_ms": round(statistics.median(g["wall"]), 1),
+             "p95_ms": round(_percentile(g["wall"], 0.95), 1), "max_ms": round(max(g["wall"]), 1),
+             "max_peak_mb": round(max(g["peak"]), 2) if g["peak"] else None}
+            for (kind, stage), g in groups.items()]
+    return sorted(rows, key=lambda r: -r["median_ms"])
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 1:
+        print("usage: python stage_profiler.py PROFILE_LOG.jsonl", file=sys.stderr)
+        return 2
+    records = read_log(args[0])
+    print(f"{len(records)} runs from {len({r.get('session') for r in records})} session(s)")
+    print(f"{'kind':<28} {'stage':<22} {'runs':>5} {'median ms':>10} {'p95 ms':>9} {'max ms':>9} {'peak MB':>8}")
+    for r in aggregate_stages(records):
+        peak = "-" if r["max_peak_mb"] is None else r["max_peak_mb"]
+        print(f"{r['kind']:<28} {r['stage']:<22} {r['runs']:>5} {r['median_ms']:>10} {r['p95_ms']:>9} {r['max_ms']:>9} {peak:>8}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
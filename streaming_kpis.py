@@ -0,0 +1,66 @@
+from typing import Optional, Dict, Any
+
+import pandas as pd
+
+# ---------- Incremental KPI aggregates ----------
+class ProgressAggregator:
+    """
+    Running Smart Highlights / KPI aggregates over chunks of the progress dataset.
+    Feeding the whole frame as one chunk gives the same numbers as the non-streaming dashboard
+    (top performer = first row with max Efficiency_%, lowest attendance = first row with min Attendance_%).
+    """
+    def __init__(self):
+        self.rows = 0
+        self.sum_eff = 0.0
+        self.sum_att = 0.0
+        self.sum_completed = 0.0
+        self.sum_assigned = 0.0
+        self.top: Optional[Dict[str, Any]] = None
+        self.low: Optional[Dict[str, Any]] = None
+        self.dept_att_sum: Dict[str, float] = {}
+        self.dept_count: Dict[str, int] = {}
+
+    def update(self, chunk: pd.DataFrame) -> "ProgressAggregator":
+        """chunk: typed rows, with or without the derived columns (nothing is added to it)."""
+        if chunk.empty:
+            return self
+        num = lambda c: pd.to_numeric(chunk[c], errors="coerce").fillna(0)
+        eff, att, completed = num("Efficiency_%"), num("Attendance_%"), num("Tasks_Completed")
+        assigned = completed + num("Tasks_Pending")
+        self.rows += len(chunk)
+        self.sum_eff += float(eff.sum())
+        self.sum_att += float(att.sum())
+        self.sum_completed += float(completed.sum())
+        self.sum_assigned += float(assigned.sum())
+
+        # strict comparisons keep the earliest row on ties, like idxmax/idxmin
+        i = eff.idxmax()
+        if self.top is None or eff[i] > self.top["eff"]:
+            self.top = {"name": chunk.at[i, "Name"], "eff": float(eff[i]), "att": float(att[i])}
+        i = att.idxmin()
+        if self.low is None or att[i] < self.low["att"]:
+            self.low = {"name": chunk.at[i, "Name"], "eff": float(eff[i]), "att": float(att[i])}
+
+        if "Department" in chunk.columns:
+            g = att.groupby(chunk["Department"], observed=True).agg(["sum", "count"])
+            for dept, r in g.iterrows():
+                self.dept_att_sum[dept] = self.dept_att_sum.get(dept, 0.0) + float(r["sum"])
+                self.dept_count[dept] = self.dept_count.get(dept, 0) + int(r["count"])
+        return self
+
+    def summary(self) -> Dict[str, Any]:
+        n = self.rows
+        dept_att = pd.Series({d: self.dept_att_sum[d] / self.dept_count[d] for d in self.dept_count}, dtype="float64")
+        return {
+            "rows": n,
+            "top": self.top or {"name": "N/A", "eff": 0.0, "att": 0.0},
+            "low": self.low or {"name": "N/A", "eff": 0.0, "att": 0.0},
+            "avg_eff": self.sum_eff / n if n else 0.0,
+            "avg_att": self.sum_att / n if n else 0.0,
+            "completion_rate": (self.sum_completed / self.sum_assigned * 100) if self.sum_assigned > 0 else 0,
+            "dept_attendance": dept_att.sort_values(ascending=False),
+        }
+
+def summarize_progress(df: pd.DataFrame) -> Dict[str, Any]:
+    """One-shot summary of an in-memory frame (same shape as ProgressAggregator.summary())."""
+    return ProgressAggregator().update(df).summary()
@@ -0,0 +1,53 @@
+from typing import Optional, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# ---------- Server-side sort / filter / paging ----------
+# A table is an index array over the frame: sort once (cached by the caller), filter with a boolean
+# mask applied in sorted order, and materialise only the rows of the visible page.
+PAGE_SIZES = [25, 50, 100, 250]
+
+def sort_order(values: pd.Series, descending: bool = False) -> np.ndarray:
+    """Row positions that sort `values` (stable; NaN last for numerics)."""
+    if isinstance(values.dtype, pd.CategoricalDtype) and values.cat.categories.is_monotonic_increasing:
+        keys = values.cat.codes.to_numpy()
+    elif pd.api.types.is_numeric_dtype(values):
+        keys = values.to_numpy(dtype="float64")
+        if descending:
+            return np.argsort(-keys, kind="stable")
+        return np.argsort(keys, kind="stable")
+    else:
+        keys = values.astype(str).to_numpy()
+    order = np.argsort(keys, kind="stable")
+    return order[::-1] if descending else order
+
+def filter_mask(df: pd.DataFrame, name_query: str = "", departments: Sequence[str] = (),
+                value_col: Optional[str] = None, value_range: Optional[Tuple[float, float]] = None) -> Optional[np.ndarray]:
+    """Boolean mask for the active filters, or None when nothing is filtered."""
+    mask = None
+    def _and(m):
+        return m if mask is None else mask & m
+    if name_query:
+        mask = _and(df["Name"].str.contains(name_query, case=False, na=False, regex=False).to_numpy())
+    if departments and "Department" in df.columns:
+        mask = _and(df["Department"].isin(list(departments)).to_numpy())
+    if value_col and value_range is not None:
+        lo, hi = value_range
+        v = df[value_col].to_numpy()
+        mask = _and((v >= lo) & (v <= hi))
+    return mask
+
+def filtered_positions(order: np.ndarray, mask: Optional[np.ndarray]) -> np.ndarray:
+    """Positions in sorted order that pass the mask (no re-sort needed)."""
+    return order if mask is None else order[mask[order]]
+
+def page_count(n_rows: int, page_size: int) -> int:
+    return max(1, -(-n_rows // page_size))
+
+def page_rows(df: pd.DataFrame, positions: np.ndarray, page: int, page_size: int,
+              cols: Optional[List[str]] = None) -> pd.DataFrame:
+    """Materialises only the rows on `page` (1-based)."""
+    start = (max(1, page) - 1) * page_size
+    out = df.iloc[positions[start:start + page_size]]
+    return out[cols] if cols is not None else out
@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SAMPLE_CSV = os.path.join(ROOT, "Employee_Progress_Data_1500.csv")
+
+@pytest.fixture
+def sample_frame() -> pd.DataFrame:
+    """The bundled 1,500-row export, read like the dashboard does, with derived metrics."""
+    from forecasting import add_derived_metrics
+    from progress_schema import read_progress
+    return add_derived_metrics(read_progress(SAMPLE_CSV))
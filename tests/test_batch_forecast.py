@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import batch_forecast
+from conftest import SAMPLE_CSV
+from forecasting import add_derived_metrics, forecast_frame, train_efficiency_model
+from predictions_export import export_bytes
+from progress_schema import nullable_ints, read_progress
+from progress_validation import validate_progress
+
+@pytest.fixture
+def dirty_csv(tmp_path):
+    """The sample export with 50 rows broken in five different ways."""
+    df = pd.read_csv(SAMPLE_CSV, dtype=str)
+    rows = np.random.default_rng(0).choice(len(df), 50, replace=False)
+    for k, i in enumerate(rows):
+        if k % 5 == 0:
+            df.loc[i, "Efficiency_%"] += "%"
+        elif k % 5 == 1:
+            df.loc[i, "Attendance_%"] = "130"
+        elif k % 5 == 2:
+            df.loc[i, "Employee_ID"] = df.loc[(i + 7) % len(df), "Employee_ID"]
+        elif k % 5 == 3:
+            df.loc[i, "Last_Updated"] = "soon"
+        else:
+            df.loc[i, "Basic_Salary"] = None
+    path = tmp_path / "dirty.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+def dashboard_predictions(path):
+    """What app2.load_upload_frame + the forecast section produce for an upload of `path`."""
+    invalid = {}
+    df = read_progress(path, invalid=invalid)
+    reject, report = validate_progress(df, invalid)
+    df = add_derived_metrics(df[~reject].reset_index(drop=True))
+    model, _ = train_efficiency_model(df)
+    return forecast_frame(df, model), report
+
+def dashboard_export(path) -> bytes:
+    """Bytes of the dashboard's Download Predictions (CSV, every column) for an upload of `path`."""
+    return export_bytes(nullable_ints(dashboard_predictions(path)[0]), "csv")
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_batch_csv_is_the_dashboard_export(tmp_path, workers):
+    dst = tmp_path / "out.csv"
+    [result] = batch_forecast.run([SAMPLE_CSV], output=str(dst), chunksize=400, workers=workers)
+    assert result["rows"] == 1500 and result["model"] == "trained"
+    assert dst.read_bytes() == dashboard_export(SAMPLE_CSV)
+
+def test_integer_columns_are_written_as_integers(tmp_path):
+    raw = pd.read_csv(SAMPLE_CSV, dtype=str)
+    raw.loc[450, "Overtime_Hours"] = None  # blanks are allowed here, and only in the second chunk
+    src = tmp_path / "blank.csv"
+    raw.to_csv(src, index=False)
+    for fmt in ("csv", "parquet"):
+        batch_forecast.run([str(src)], out_dir=str(tmp_path / fmt), fmt=fmt, chunksize=400, workers=1)
+    out = tmp_path / "csv" / "blank_predictions.csv"
+    assert out.read_bytes() == dashboard_export(str(src))
+    first = out.read_text().splitlines()[1].split(",")
+    header = out.read_text().splitlines()[0].split(",")
+    assert first[header.index("Tasks_Completed")] == raw.loc[0, "Tasks_Completed"]
+    pq = pd.read_parquet(tmp_path / "parquet" / "blank_predictions.parquet")
+    assert str(pq["Overtime_Hours"].dtype) == "Int32" and pq["Overtime_Hours"].isna().sum() == 1
+
+def test_given_model_is_used_for_every_file(tmp_path):
+    df = add_derived_metrics(read_progress(SAMPLE_CSV))
+    model, _ = train_efficiency_model(df.iloc[:500])
+    [result] = batch_forecast.run([SAMPLE_CSV], out_dir=str(tmp_path), model=model, workers=1)
+    got = pd.read_csv(result["output"])
+    np.testing.assert_allclose(got["Predicted_Eff_Next"], forecast_frame(df, model)["Predicted_Eff_Next"], atol=1e-9)
+
+def test_cli_rejects_bad_arguments(tmp_path, capsys):
+    assert batch_forecast.main([str(tmp_path / "missing.csv")]) == 2
+    assert batch_forecast.main([SAMPLE_CSV, SAMPLE_CSV, "--output", str(tmp_path / "x.csv")]) == 2
+    assert "--output" in capsys.readouterr().err
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_dirty_file_matches_dashboard(dirty_csv, tmp_path, workers):
+    expected, report = dashboard_predictions(dirty_csv)
+    dst = tmp_path / "out" / "dirty_predictions.csv"
+    [result] = batch_forecast.run([dirty_csv], output=str(dst), chunksize=300, workers=workers)
+    assert result["rows"] == len(expected)
+    assert result["rejected"] == report["rejected"] == 50
+    assert dst.read_bytes() == dashboard_export(dirty_csv)
+
+    rejected = pd.read_csv(result["rejects"])
+    assert result["rejects"] == str(tmp_path / "out" / "dirty_rejected.csv")
+    assert rejected["Row"].tolist() == report["rejected_rows"]["Row"].tolist()
+
+def test_clean_file_leaves_no_rejects_file(tmp_path):
+    stale = tmp_path / "Employee_Progress_Data_1500_rejected.csv"
+    stale.write_text("Row\n1\n")
+    [result] = batch_forecast.run([SAMPLE_CSV], out_dir=str(tmp_path), workers=1)
+    assert result["rows"] == 1500 and result["rejected"] == 0 and result["rejects"] is None
+    assert not stale.exists()
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from chart_data import choose_render_mode, grid_bins, stratified_sample, top_n
+
+def test_top_n_matches_sort(sample_frame):
+    got = top_n(sample_frame, "Efficiency_%", 10, ["Name", "Efficiency_%"])
+    want = sample_frame.sort_values("Efficiency_%", ascending=False, kind="stable").head(10)
+    assert list(got.columns) == ["Name", "Efficiency_%"]
+    assert got.index.tolist() == want.index.tolist()
+
+def test_stratified_sample_keeps_group_shares(sample_frame):
+    sample = stratified_sample(sample_frame, budget=300)
+    assert 300 - sample_frame["Department"].nunique() <= len(sample) <= 300
+    assert sample.index.is_monotonic_increasing and not sample.index.duplicated().any()
+    share = sample["Department"].value_counts(normalize=True)
+    full = sample_frame["Department"].value_counts(normalize=True)
+    np.testing.assert_allclose(share[full.index], full, atol=0.02)
+    # same seed, same rows
+    assert stratified_sample(sample_frame, budget=300).index.equals(sample.index)
+
+def test_stratified_sample_small_groups_and_fallbacks():
+    df = pd.DataFrame({"Department": ["big"] * 990 + ["tiny"] * 10, "v": np.arange(1000)})
+    sample = stratified_sample(df, budget=50)
+    assert (sample["Department"] == "tiny").sum() >= 1
+    assert len(stratified_sample(df, budget=50, by=None)) == 50
+    assert stratified_sample(df, budget=5000) is df
+
+def test_grid_bins_counts_finite_points():
+    df = pd.DataFrame({"x": [0.0, 1.0, 1.0, np.nan, 2.0], "y": [0.0, 0.0, 1.0, 1.0, np.inf]})
+    grid = grid_bins(df, "x", "y", bins=(2, 2))
+    assert grid["counts"].shape == (2, 2)
+    assert grid["counts"].sum() == 3
+    np.testing.assert_allclose(grid["x"], [0.25, 0.75])
+
+def test_render_mode_thresholds():
+    assert choose_render_mode(5000) == "svg"
+    assert choose_render_mode(5001) == "webgl"
+    assert choose_render_mode(100_000) == "webgl"
+    assert choose_render_mode(100_001) == "density"
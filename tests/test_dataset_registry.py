@@ -0,0 +1,124 @@
+import gc
+import threading
+import time
+import tracemalloc
+import weakref
+
+import pandas as pd
+import pytest
+
+from dataset_registry import DatasetRegistry
+
+def frame(n=1000):
+    return pd.DataFrame({"a": range(n), "b": [1.0] * n})
+
+def test_loads_once_and_sessions_get_private_copies():
+    reg = DatasetRegistry()
+    calls = []
+    load = lambda: calls.append(1) or frame()
+    one, two = reg.get("k", load, "s1"), reg.get("k", load, "s2")
+    assert len(calls) == 1
+    one["a"] = -1
+    one["c"] = 0
+    assert (two["a"] >= 0).all() and "c" not in two.columns
+    assert (reg.get("k", load)["a"] >= 0).all()
+    assert reg.info("k")["sessions"] == 2 and reg.info("k")["hits"] == 2
+
+def test_concurrent_first_requests_load_once():
+    reg = DatasetRegistry()
+    calls = []
+    def load():
+        calls.append(1)
+        time.sleep(0.05)
+        return frame()
+    threads = [threading.Thread(target=reg.get, args=("k", load)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+
+def test_failed_load_can_be_retried():
+    reg = DatasetRegistry()
+    def broken():
+        raise OSError("disk gone")
+    with pytest.raises(OSError):
+        reg.get("k", broken)
+    assert reg.get("k", frame).shape == (1000, 2)
+
+def test_meta_and_lru_eviction():
+    reg = DatasetRegistry(max_entries=2)
+    reg.get("a", lambda: (frame(), {"report": 1}))
+    reg.get("b", frame)
+    reg.get("a", frame)  # touch: b is now the oldest
+    reg.get("c", frame)
+    assert [s["key"] for s in reg.stats()] == ["a", "c"]
+    assert reg.meta("a") == {"report": 1} and reg.meta("b") is None
+
+def test_derived_built_once_and_counted():
+    reg = DatasetRegistry()
+    calls = []
+    df = reg.get("k", frame)
+    base = reg.nbytes
+    build = lambda: calls.append(1) or df[["b"]].copy()
+    one, two = reg.derived("k", "extra", build), reg.derived("k", "extra", build)
+    assert one is two and len(calls) == 1
+    assert reg.nbytes == base + int(one.memory_usage(deep=True).sum())
+    assert reg.info("k")["derived"] == 1
+    # nothing is kept for a dataset that is not registered
+    reg.derived("gone", "extra", build)
+    reg.derived("gone", "extra", build)
+    assert len(calls) == 3 and reg.keys() == ["k"]
+
+def test_derived_lru_per_dataset():
+    reg = DatasetRegistry(max_derived=2)
+    reg.get("k", frame)
+    for name in ("a", "b", "a", "c"):
+        reg.derived("k", name, lambda: object())
+    calls = []
+    reg.derived("k", "b", lambda: calls.append(1))
+    assert calls == [1]
+
+def test_derived_counts_toward_the_budget():
+    reg = DatasetRegistry(max_bytes=3 * frame().memory_usage(deep=True).sum())
+    reg.get("a", frame)
+    reg.get("b", frame)
+    reg.derived("b", "big", lambda: frame(2000))
+    assert reg.keys() == ["b"]
+
+def test_memory_flat_beyond_registry_capacity(sample_frame):
+    """Datasets (and their ranker / cube / name index / forecast columns) beyond max_entries are freed."""
+    from group_ranks import GroupRanker
+    from name_index import NameIndex
+    from olap_cube import AggregationCube
+    reg = DatasetRegistry(max_entries=2)
+    big = pd.concat([sample_frame] * 10, ignore_index=True)
+    first = {}
+
+    def open_dataset(i):
+        df = reg.get(f"k{i}", lambda: big.assign(Basic_Salary=big["Basic_Salary"] + i))
+        objs = [reg.derived(f"k{i}", "ranker", lambda: GroupRanker(df)),
+                reg.derived(f"k{i}", "cube", lambda: AggregationCube(df)),
+                reg.derived(f"k{i}", "names", lambda: NameIndex.from_frame(df)),
+                reg.derived(f"k{i}", ("forecast", 0, 0), lambda: df[["Efficiency_%"]] * 1.01)]
+        if not first:
+            first.update(cube=weakref.ref(objs[1]), ranker=weakref.ref(objs[0]))
+
+    tracemalloc.start()
+    try:
+        for i in range(3):
+            open_dataset(i)
+        gc.collect()
+        warm = tracemalloc.get_traced_memory()[0]
+        for i in range(3, 15):
+            open_dataset(i)
+        gc.collect()
+        grown = tracemalloc.get_traced_memory()[0] - warm
+    finally:
+        tracemalloc.stop()
+    assert reg.keys() == ["k13", "k14"]
+    assert first["cube"]() is None and first["ranker"]() is None
+    assert reg.info("k14")["derived"] == 4
+    # twelve more datasets than the registry holds, each several MB with its derived objects
+    assert reg.nbytes > 2 * big.memory_usage(deep=True).sum()
+    assert grown < 0.5 * reg.nbytes
@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+from ems_source import FRAME_COLS, EMSFrameSource
+from master_ems import MasterEMS
+
+EMPLOYEES = "id,name,role,department,email,basic_salary\n" \
+            "e1,Ann,Dev,Eng,ann@example.com,5000.0\n" \
+            "e2,Bob,QA,Eng,bob@example.com,4000.0\n"
+
+@pytest.fixture
+def ems_dir(tmp_path, monkeypatch):
+    # MasterEMS reads and writes its CSVs in the working directory
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "employees.csv").write_text(EMPLOYEES)
+    return tmp_path
+
+def rewrite(path, text):
+    before = os.path.getmtime(path)
+    path.write_text(text)
+    os.utime(path, (before + 5, before + 5))
+
+def test_touch_bumps_only_affected_employees(ems_dir):
+    ems = MasterEMS()
+    start = dict(ems.employee_versions)
+    tid = ems.create_task("t", "e1")
+    assert ems.employee_versions["e1"] > start.get("e1", 0)
+    assert ems.employee_versions.get("e2", 0) == start.get("e2", 0)
+    v = ems.employee_versions["e1"]
+    ems.update_task_progress(tid, 50)
+    assert ems.employee_versions["e1"] > v
+    v = ems.version
+    ems.assign_task(tid, "e2")  # both the old and the new assignee change
+    assert ems.employee_versions["e1"] > v and ems.employee_versions["e2"] > v
+
+def test_initial_frame(ems_dir):
+    src = EMSFrameSource()
+    version, frame = src.current()
+    assert version == 1
+    assert list(frame.reset_index().columns) == FRAME_COLS
+    assert sorted(frame.index) == ["e1", "e2"]
+    assert src.refresh() == 0 and src.version == 1
+
+def test_refresh_rebuilds_only_changed_rows(ems_dir):
+    src = EMSFrameSource()
+    _, before = src.current()
+    tid = src.ems.create_task("t", "e1")
+    src.ems.update_task_progress(tid, 100)
+    assert src.refresh() == 1
+    version, after = src.current()
+    assert version == 2
+    assert after.loc["e1", "Tasks_Completed"] == 1 and after.loc["e1", "Efficiency_%"] == 100
+    assert after.loc["e2"].equals(before.loc["e2"])
+    # the frame handed out earlier is left as it was
+    assert before.loc["e1", "Tasks_Completed"] == 0
+    assert src.refresh() == 0 and src.version == 2
+
+def test_refresh_adds_and_removes(ems_dir):
+    src = EMSFrameSource()
+    eid = src.ems.add_employee("Cy", "Ops", "IT")
+    del src.ems.employees["e2"]
+    assert src.refresh() == 2
+    assert sorted(src.current()[1].index) == sorted(["e1", eid])
+
+def test_reload_applies_only_rows_that_differ(ems_dir):
+    src = EMSFrameSource()
+    rewrite(ems_dir / "employees.csv", EMPLOYEES)
+    assert src.refresh() == 0 and src.version == 1
+    rewrite(ems_dir / "employees.csv", EMPLOYEES.replace("4000.0", "4500.0") + "e3,Cy,Ops,IT,,100\n")
+    assert src.refresh() == 2
+    version, frame = src.current()
+    assert version == 2
+    assert frame.loc["e2", "Basic_Salary"] == 4500.0 and "e3" in frame.index
+
+def test_snapshot_is_a_copy(ems_dir):
+    src = EMSFrameSource()
+    snap = src.snapshot()
+    snap.loc[0, "Name"] = "changed"
+    assert "changed" not in src.current()[1]["Name"].tolist()
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecasting import (FEATURE_COLS, PROJECTION_MONTHS, dataset_fingerprint, load_or_train_model, predict_efficiency,
+                         project_efficiency, scenario_sweep, train_efficiency_model)
+
+def test_fingerprint_ignores_index(sample_frame):
+    shuffled_index = sample_frame.set_axis(np.arange(len(sample_frame))[::-1])
+    assert dataset_fingerprint(sample_frame) == dataset_fingerprint(shuffled_index)
+    changed = sample_frame.copy()
+    changed.loc[0, "Efficiency_%"] += 1
+    assert dataset_fingerprint(changed) != dataset_fingerprint(sample_frame)
+
+def test_fingerprint_of_selected_columns(sample_frame):
+    other = sample_frame.assign(Name="someone else")
+    cols = ["Efficiency_%", "Attendance_%"]
+    assert dataset_fingerprint(other, cols) == dataset_fingerprint(sample_frame, cols)
+    assert dataset_fingerprint(other) != dataset_fingerprint(sample_frame)
+
+def test_model_is_persisted_per_fingerprint(sample_frame, tmp_path):
+    fp = dataset_fingerprint(sample_frame)
+    model, meta = load_or_train_model(sample_frame, fp, FEATURE_COLS, str(tmp_path))
+    assert meta["source"] == "trained" and meta["rows"] == len(sample_frame)
+    again, meta2 = load_or_train_model(sample_frame, fp, FEATURE_COLS, str(tmp_path))
+    assert meta2["source"] == "disk"
+    X = sample_frame[FEATURE_COLS].to_numpy()
+    np.testing.assert_allclose(again.predict(X), model.predict(X))
+    # another dataset (or feature list) never reuses it
+    assert load_or_train_model(sample_frame, "other", FEATURE_COLS, str(tmp_path))[1]["source"] == "trained"
+
+def test_projection_shape_and_bounds():
+    proj = project_efficiency(np.array([50.0, 99.0]), np.array([60.0, 100.0]))
+    assert proj.shape == (2, len(PROJECTION_MONTHS))
+    assert proj[:, 0].tolist() == [50.0, 99.0] and proj[:, 1].tolist() == [60.0, 100.0]
+    assert proj.min() >= 0 and proj.max() <= 100
+    # scalars (the dashboard's averages) give one row
+    assert project_efficiency(50.0, 60.0).shape == (len(PROJECTION_MONTHS),)
+
+# ---------- Scenario sweep ----------
+ATT = [-20.0, 0.0, 15.0]
+TASKS = [-10.0, 0.0, 25.0, 50.0]
+
+def looped_sweep(model, df, by="Department"):
+    """One predict_efficiency() call per grid cell, averaged per group with pandas."""
+    mean = np.zeros((len(ATT), len(TASKS)))
+    groups = {}
+    for i, a in enumerate(ATT):
+        for j, t in enumerate(TASKS):
+            pred = pd.Series(predict_efficiency(model, df, a, t), index=df.index)
+            mean[i, j] = pred.mean()
+            for g, v in pred.groupby(df[by].astype(str), observed=True).mean().items():
+                groups.setdefault(g, np.zeros_like(mean))[i, j] = v
+    return mean, groups
+
+@pytest.mark.parametrize("trained", [True, False])
+def test_sweep_matches_per_cell_predictions(sample_frame, trained):
+    model = train_efficiency_model(sample_frame)[0] if trained else None
+    sweep = scenario_sweep(model, sample_frame, ATT, TASKS)
+    mean, groups = looped_sweep(model, sample_frame)
+    np.testing.assert_allclose(sweep["mean"], mean, atol=1e-9)
+    for k, g in enumerate(sweep["groups"]):
+        np.testing.assert_allclose(sweep["group_mean"][k], groups[g], atol=1e-9)
+    assert sweep["group_rows"].sum() == len(sample_frame)
+
+def test_sweep_blocks_do_not_change_results(sample_frame, monkeypatch):
+    import forecasting
+    model = train_efficiency_model(sample_frame)[0]
+    whole = scenario_sweep(model, sample_frame, ATT, TASKS)
+    monkeypatch.setattr(forecasting, "SWEEP_CELLS_PER_BLOCK", 100)
+    blocked = scenario_sweep(model, sample_frame, ATT, TASKS, by=None)
+    np.testing.assert_allclose(blocked["mean"], whole["mean"], atol=1e-9)
+    assert blocked["groups"] == ["All"]
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from group_ranks import GroupRanker, ORGANIZATION, _select, ordinal
+
+def test_ordinal():
+    assert [ordinal(n) for n in (1, 2, 3, 4, 11, 12, 13, 21, 22, 101, 111)] == \
+        ["1st", "2nd", "3rd", "4th", "11th", "12th", "13th", "21st", "22nd", "101st", "111th"]
+
+@pytest.mark.parametrize("largest", [True, False])
+def test_select_matches_stable_sort(largest):
+    v = np.random.default_rng(1).integers(0, 20, 500).astype(float)  # many ties
+    for k in (1, 10, 499, 500, 600):
+        order = np.argsort(-v if largest else v, kind="stable")
+        assert _select(v, k, largest).tolist() == order[:k].tolist()
+
+def test_top_and_bottom_match_nlargest(sample_frame):
+    r = GroupRanker(sample_frame)
+    for level in r.levels:
+        groups = [None] if level == ORGANIZATION else r.groups(level)
+        for g in groups:
+            rows = sample_frame if g is None else sample_frame[sample_frame[level].astype(str) == g]
+            for m in r.metrics:
+                top = r.top(m, level, g)
+                bottom = r.top(m, level, g, bottom=True)
+                assert top.tolist() == sample_frame.index.get_indexer(rows[m].nlargest(r.k).index).tolist()
+                assert bottom.tolist() == sample_frame.index.get_indexer(rows[m].nsmallest(r.k).index).tolist()
+
+def test_percentile_matches_lower_cut_points(sample_frame):
+    r = GroupRanker(sample_frame)
+    dept = r.groups("Department")[0]
+    v = sample_frame.loc[sample_frame["Department"].astype(str) == dept, "Efficiency_%"].dropna().to_numpy(float)
+    cuts = np.percentile(v, np.arange(101), method="lower")
+    for value in (v.min(), np.median(v), v.max(), v.max() + 1, v.min() - 1):
+        expected = max(0, int(np.searchsorted(cuts, value, side="right")) - 1)
+        assert r.percentile("Efficiency_%", value, "Department", dept) == expected
+    assert r.percentile("Efficiency_%", v.max(), "Department", dept) == 100
+
+def test_unknown_inputs_and_nans():
+    df = pd.DataFrame({"Department": ["A", "A", "B"], "Efficiency_%": [50.0, np.nan, 70.0]})
+    r = GroupRanker(df, metrics=["Efficiency_%"], k=5)
+    assert r.percentile("Efficiency_%", 60, "Department", "Z") is None
+    assert r.percentile("Efficiency_%", np.nan) is None
+    assert r.percentile("Nope", 60) is None
+    # NaN rows are never ranked
+    assert r.top("Efficiency_%", "Department", "A").tolist() == [0]
+    assert r.top("Efficiency_%").tolist() == [2, 0]
+
+def test_employee_percentiles_and_leaders(sample_frame):
+    r = GroupRanker(sample_frame)
+    table = r.employee_percentiles(sample_frame.iloc[0])
+    assert list(table.index) == r.metrics
+    assert table.columns[0] == ORGANIZATION
+    leaders = r.leaders(sample_frame, "Efficiency_%", k=3)
+    assert len(leaders) == 3
+    assert leaders["Percentile"].iloc[0] == 100
@@ -0,0 +1,43 @@
+import numpy as np
+
+from name_index import NameIndex
+
+NAMES = ["Michael Ellis", "Ellis Grey", "Mia Ellison", "michael ellis", None, "Ann Lee"]
+IDS = ["E1", "E2", "E3", "E4", "E5", "E6"]
+
+def naive(query):
+    q = query.lower().strip()
+    return {i for n, i in zip(NAMES, IDS) if n and any(w.startswith(q) for w in
+            [" ".join(n.lower().split(" ")[k:]) for k in range(len(n.split(" ")))])}
+
+def test_matches_every_word_prefix():
+    idx = NameIndex(NAMES, IDS)
+    for q in ["el", "ellis", "mi", "michael e", "lee", "zz", "ELLIS "]:
+        assert set(idx.search(q, limit=10)) == naive(q), q
+        assert idx.count(q) == len(naive(q))
+
+def test_ranking_exact_then_full_prefix_then_word_prefix():
+    idx = NameIndex(NAMES, IDS)
+    # names differing only in case are one name: both rows, in file order
+    assert idx.search("michael ellis") == ["E1", "E4"]
+    # "Ellis Grey" starts with the query, the others only have a word that does
+    assert idx.search("ellis") == ["E2", "E1", "E4", "E3"]
+
+def test_empty_query_is_file_order():
+    idx = NameIndex(NAMES, IDS)
+    assert idx.match_positions("").tolist() == list(range(len(NAMES)))
+    assert idx.match_positions("", limit=2).tolist() == [0, 1]
+    assert idx.count("") == len(NAMES)
+
+def test_limit_and_positions():
+    idx = NameIndex(NAMES, IDS)
+    assert len(idx.match_positions("e", limit=2)) == 2
+    assert idx.position_of("E3") == 2
+    assert idx.position_of("missing") is None
+
+def test_from_frame(sample_frame):
+    idx = NameIndex.from_frame(sample_frame)
+    name = sample_frame["Name"].iloc[7]
+    hits = idx.match_positions(name)
+    assert 7 in hits
+    assert np.all(sample_frame["Name"].iloc[hits].str.lower().str.contains(name.lower().split(" ")[0]))
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from olap_cube import AggregationCube
+
+def test_rollups_match_groupby(sample_frame):
+    cube = AggregationCube(sample_frame)
+    for by in (["Department"], ["Department", "Gender"], ["City"]):
+        got = cube.query(by, measures=["Efficiency_%", "Basic_Salary"]).sort_values(by).reset_index(drop=True)
+        g = sample_frame.groupby(by, observed=True)
+        want = pd.DataFrame({"rows": g.size(), "Efficiency_%": g["Efficiency_%"].mean(),
+                             "Efficiency_%_std": g["Efficiency_%"].std(),
+                             "Basic_Salary_sum": g["Basic_Salary"].sum()}).reset_index().sort_values(by)
+        assert got["rows"].tolist() == want["rows"].tolist()
+        for c in ("Efficiency_%", "Efficiency_%_std", "Basic_Salary_sum"):
+            np.testing.assert_allclose(got[c], want[c].astype(float), rtol=1e-5)
+
+def test_grand_total_and_filters(sample_frame):
+    cube = AggregationCube(sample_frame)
+    total = cube.query()
+    assert total["rows"].iloc[0] == len(sample_frame) == cube.total_rows
+    np.testing.assert_allclose(total["Attendance_%"].iloc[0], sample_frame["Attendance_%"].mean(), rtol=1e-5)
+
+    dept = cube.members("Department")[0]
+    mode = cube.members("Work_Mode")[0]
+    got = cube.query(["Gender"], filters={"Department": [dept], "Work_Mode": [mode], "City": []})
+    sel = sample_frame[(sample_frame["Department"] == dept) & (sample_frame["Work_Mode"] == mode)]
+    assert got["rows"].sum() == len(sel)
+
+def test_missing_values_and_no_dimensions():
+    df = pd.DataFrame({"Efficiency_%": [10.0, np.nan, 30.0]})
+    cube = AggregationCube(df)
+    out = cube.query()
+    assert out["rows"].iloc[0] == 3
+    assert out["Efficiency_%"].iloc[0] == 20.0
+    assert out["Efficiency_%_sum"].iloc[0] == 40.0
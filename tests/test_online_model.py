@@ -0,0 +1,80 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecasting import FEATURE_COLS
+from online_model import OnlineEfficiencyModel, row_versions
+
+@pytest.fixture
+def month(sample_frame):
+    return sample_frame.assign(Last_Updated="2025-01-31")
+
+def test_changed_mask_tracks_last_updated(month):
+    m = OnlineEfficiencyModel()
+    assert m.changed_mask(month).all()
+    m.update(month)
+    assert not m.changed_mask(month).any()
+    nxt = month.copy()
+    nxt.loc[[3, 7], "Last_Updated"] = "2025-02-28"
+    assert np.flatnonzero(m.changed_mask(nxt)).tolist() == [3, 7]
+
+def test_update_learns_only_changed_rows(month):
+    m = OnlineEfficiencyModel()
+    first = m.update(month, "f1")
+    assert first == {"rows": len(month), "updated": len(month), "skipped": False} and m.fitted
+    coef = m.regressor.coef_.copy()
+
+    # same rows under another fingerprint: nothing changed, nothing learned
+    assert m.update(month, "f2")["updated"] == 0
+    np.testing.assert_array_equal(m.regressor.coef_, coef)
+    # a fingerprint already applied is skipped outright
+    assert m.update(month, "f1")["skipped"]
+
+    nxt = month.copy()
+    nxt.loc[:9, "Last_Updated"] = "2025-02-28"
+    assert m.update(nxt, "f3")["updated"] == 10
+    assert m.rows_seen == len(month) + 10
+
+def test_versions_without_last_updated_hash_the_modelled_columns(sample_frame):
+    df = sample_frame.drop(columns="Last_Updated")
+    cols = FEATURE_COLS + ["Efficiency_%"]
+    before = row_versions(df, cols)
+    assert before.equals(row_versions(df.assign(Name="renamed"), cols))
+    changed = df.copy()
+    changed.loc[0, "Efficiency_%"] += 1
+    assert (row_versions(changed, cols) != before).sum() == 1
+
+def test_save_load_round_trip(month, tmp_path):
+    m = OnlineEfficiencyModel()
+    m.update(month, "f1")
+    m.evaluate(month, fingerprint="f1")
+    m.save(str(tmp_path))
+    loaded = OnlineEfficiencyModel.load(str(tmp_path))
+    X = month[FEATURE_COLS].to_numpy()
+    np.testing.assert_allclose(loaded.predict(X), m.predict(X))
+    assert loaded.applied == ["f1"] and loaded.rows_seen == m.rows_seen and len(loaded.history) == 1
+    assert loaded.update(month, "f1")["skipped"]
+    assert not loaded.changed_mask(month).any()
+    assert OnlineEfficiencyModel.load(str(tmp_path / "empty")) is None
+
+def test_predict_waits_for_a_running_update(month):
+    m = OnlineEfficiencyModel()
+    m.update(month)
+    X = month[FEATURE_COLS].to_numpy()
+    done = threading.Event()
+    with m._lock:  # stands in for another session's partial_fit
+        t = threading.Thread(target=lambda: (m.predict(X), done.set()))
+        t.start()
+        assert not done.wait(0.2)
+    t.join(5)
+    assert done.is_set()
+
+def test_evaluate_records_both_models(month):
+    from forecasting import train_efficiency_model
+    m = OnlineEfficiencyModel()
+    m.update(month)
+    rec = m.evaluate(month, train_efficiency_model(month)[0], "abc")
+    assert {"r2_online", "mae_online", "r2_full", "mae_full", "mae_vs_full"} <= set(rec)
+    assert m.history == [rec]
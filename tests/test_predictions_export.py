@@ -0,0 +1,28 @@
+import gzip
+import io
+
+import pandas as pd
+import pytest
+
+from predictions_export import EXPORT_FORMATS, export_bytes, export_file_name
+
+@pytest.fixture
+def small():
+    return pd.DataFrame({"Employee_ID": ["E1", "E2", "E3"], "Predicted_Eff_Next": [71.5, 80.25, 99.0], "x": [1, 2, 3]})
+
+def test_chunked_csv_is_plain_to_csv(small):
+    assert export_bytes(small, "csv", chunk_rows=2) == small.to_csv(index=False).encode()
+    assert gzip.decompress(export_bytes(small, "csv.gz", chunk_rows=1)) == small.to_csv(index=False).encode()
+    # mtime is fixed, so identical data gives identical archives
+    assert export_bytes(small, "csv.gz") == export_bytes(small, "csv.gz")
+
+def test_columns_and_names(small):
+    out = pd.read_csv(io.BytesIO(export_bytes(small, "csv", columns=["Predicted_Eff_Next", "Employee_ID"])))
+    assert list(out.columns) == ["Predicted_Eff_Next", "Employee_ID"]
+    assert export_file_name("predictions", "csv.gz") == "predictions.csv.gz"
+    with pytest.raises(ValueError):
+        export_bytes(small, "xlsx")
+
+@pytest.mark.skipif("parquet" not in EXPORT_FORMATS, reason="pyarrow not installed")
+def test_parquet_round_trip(small):
+    pd.testing.assert_frame_equal(pd.read_parquet(io.BytesIO(export_bytes(small, "parquet", chunk_rows=2))), small)
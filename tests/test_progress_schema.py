@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from conftest import SAMPLE_CSV
+from progress_schema import PROGRESS_SCHEMA, iter_progress_chunks, read_progress
+
+def plain(df: pd.DataFrame) -> pd.DataFrame:
+    """Categoricals as plain strings: their category dtype differs between readers."""
+    return df.astype({c: object for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)})
+
+@pytest.fixture
+def csv_frame():
+    return read_progress(SAMPLE_CSV)
+
+def test_csv_read_uses_declared_schema(csv_frame):
+    assert list(csv_frame.columns) == [c for c in PROGRESS_SCHEMA if c in pd.read_csv(SAMPLE_CSV, nrows=0).columns]
+    assert csv_frame["Efficiency_%"].dtype == "float32"
+    assert isinstance(csv_frame["Department"].dtype, pd.CategoricalDtype)
+    assert csv_frame["Tasks_Completed"].dtype == "int32"
+
+@pytest.mark.parametrize("ext", ["parquet", "feather"])
+def test_columnar_formats_read_the_same(csv_frame, tmp_path, ext):
+    raw = pd.read_csv(SAMPLE_CSV)
+    path = tmp_path / f"data.{ext}"
+    raw.to_parquet(path) if ext == "parquet" else raw.to_feather(path)
+    pd.testing.assert_frame_equal(plain(read_progress(str(path))[csv_frame.columns]), plain(csv_frame))
+
+def test_chunks_add_up_to_the_full_read(csv_frame):
+    chunks = list(iter_progress_chunks(SAMPLE_CSV, chunksize=400))
+    assert [len(c) for c, _ in chunks] == [400, 400, 400, 300]
+    assert chunks[-1][1] == 1.0
+    whole = pd.concat([c for c, _ in chunks], ignore_index=True)
+    pd.testing.assert_frame_equal(plain(whole), plain(csv_frame), check_dtype=False)
+
+def test_column_subset():
+    df = read_progress(SAMPLE_CSV, columns=["Employee_ID", "Efficiency_%", "Not_A_Column"])
+    assert list(df.columns) == ["Employee_ID", "Efficiency_%"]
+
+def test_non_numeric_cells_become_nan(tmp_path):
+    path = tmp_path / "pct.csv"
+    path.write_text("Employee_ID,Tasks_Completed,Efficiency_%,Attendance_%,Join_Date\n"
+                    "E1,3,95%,90,2020-01-02\nE2,,80,,2021-03-04\n")
+    df = read_progress(str(path))
+    assert df["Efficiency_%"].dtype == "float32" and df["Efficiency_%"].isna().tolist() == [True, False]
+    assert df["Tasks_Completed"].isna().tolist() == [False, True]
+    chunked = pd.concat([c for c, _ in iter_progress_chunks(str(path), chunksize=1)], ignore_index=True)
+    pd.testing.assert_frame_equal(plain(chunked), plain(df), check_dtype=False)
+
+def test_date_categories_stay_text(csv_frame):
+    assert all(isinstance(v, str) for v in csv_frame["Join_Date"].cat.categories[:5])
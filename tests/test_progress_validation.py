@@ -0,0 +1,76 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from progress_schema import iter_progress_chunks, read_progress
+from progress_validation import ProgressValidator, validate_progress
+
+CSV = """Employee_ID,Name,Basic_Salary,Tasks_Completed,Tasks_Pending,Attendance_%,Efficiency_%,Last_Updated
+E1,Ann,5000,10,2,95,80,2025-11-01
+E2,Bob,5000,10,2,95%,80,2025-11-01
+E3,Cy,5000,10,2,,80,2025-11-01
+E4,Di,5000,10,2,130,80,2025-11-01
+E5,Ed,5000,10,2,90,80,soon
+E5,Ed,5000,10,2,90,80,2025-11-01
+E5,Ed,5000,10,2,90,70,2025-11-01
+"""
+
+def _read(text=CSV):
+    invalid = {}
+    df = read_progress(io.BytesIO(text.encode()), invalid=invalid)
+    return df, invalid
+
+def test_non_numeric_cells_are_read_as_nan_and_flagged():
+    df, invalid = _read()
+    assert df["Attendance_%"].dtype == "float32"
+    assert np.isnan(df["Attendance_%"].iloc[1])
+    assert invalid["Attendance_%"].tolist() == [False, True] + [False] * 5
+
+def test_masks_and_reasons():
+    df, invalid = _read()
+    reject, report = validate_progress(df, invalid)
+    # E5 on line 5 has a bad date, so the first valid E5 (line 6) is kept and only line 7 is a duplicate
+    assert reject.tolist() == [False, True, True, True, True, False, True]
+    reasons = dict(zip(report["rejected_rows"]["Row"], report["rejected_rows"]["Reject_Reason"]))
+    assert reasons == {2: "not numeric: Attendance_%", 3: "missing: Attendance_%", 4: "out of range: Attendance_%",
+                       5: "bad date: Last_Updated", 7: "duplicate: Employee_ID"}
+
+def test_report_counts():
+    df, invalid = _read()
+    _, report = validate_progress(df, invalid)
+    assert (report["rows"], report["rejected"], report["chunks"]) == (7, 5, 1)
+    checks = report["checks"].set_index(["check", "column"])["rows"]
+    assert checks[("not numeric", "Attendance_%")] == 1
+    assert checks[("missing", "Attendance_%")] == 1
+    assert checks[("duplicate", "Employee_ID")] == 1
+
+def test_without_invalid_masks_bad_cells_count_as_missing():
+    df, _ = _read()
+    _, report = validate_progress(df)
+    checks = report["checks"].set_index(["check", "column"])["rows"]
+    assert checks[("missing", "Attendance_%")] == 2
+    assert ("not numeric", "Attendance_%") not in checks.index
+
+def test_chunks_report_file_rows():
+    v = ProgressValidator()
+    invalid = {}
+    masks = [v.check(chunk, row_offset=v.rows, invalid=invalid)
+             for chunk, _ in iter_progress_chunks(io.BytesIO(CSV.encode()), chunksize=3, invalid=invalid)]
+    report = v.report()
+    assert report["chunks"] == 3
+    # lines 6 and 7 fall in different chunks, so the repeated E5 is not seen
+    assert np.concatenate(masks).tolist() == [False, True, True, True, True, False, False]
+    assert report["rejected_rows"]["Row"].tolist() == [2, 3, 4, 5]
+
+def test_max_rejected_caps_kept_rows_only():
+    df, invalid = _read()
+    _, report = validate_progress(df, invalid, max_rejected=2)
+    assert report["rejected"] == 5
+    assert len(report["rejected_rows"]) == 2
+
+def test_clean_file_has_no_rejects(sample_frame):
+    reject, report = validate_progress(sample_frame)
+    assert not reject.any()
+    assert report["checks"].empty
+    assert isinstance(report["rejected_rows"], pd.DataFrame) and report["rejected_rows"].empty
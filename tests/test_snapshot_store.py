@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from snapshot_store import SnapshotStore, department_trend, rolling_stats
+
+def upload(n=6, updated="2025-01-31", eff=None):
+    return pd.DataFrame({
+        "Employee_ID": [f"E{i}" for i in range(n)],
+        "Name": [f"Name {i}" for i in range(n)],
+        "Department": ["A", "B"] * (n // 2),
+        "Efficiency_%": eff if eff is not None else np.linspace(50, 100, n),
+        "Attendance_%": np.full(n, 90.0),
+        "Last_Updated": [updated] * n,
+    })
+
+def test_only_changed_rows_are_stored(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    first = store.add(upload(), "f1")
+    assert first == {"snapshot": "2025-01-31", "rows": 6, "stored": 6, "skipped": False}
+
+    nxt = upload()
+    nxt.loc[[1, 4], "Last_Updated"] = "2025-02-28"
+    nxt.loc[[1, 4], "Efficiency_%"] = 10.0
+    second = store.add(nxt, "f2")
+    assert (second["snapshot"], second["stored"]) == ("2025-02-28", 2)
+    assert store.add(nxt, "f2")["skipped"]
+    assert store.snapshots() == ["2025-01-31", "2025-02-28"]
+
+    hist = store.employee_history("E1")
+    assert hist["Efficiency_%"].tolist() == [60.0, 10.0]
+    assert len(store.employee_history("E0")) == 1
+
+def test_manifest_survives_reopen(tmp_path):
+    SnapshotStore(str(tmp_path)).add(upload(), "f1")
+    reopened = SnapshotStore(str(tmp_path))
+    assert reopened.has("f1") and not reopened.has("f2")
+
+def test_upload_without_employee_id_is_refused(tmp_path):
+    with pytest.raises(ValueError):
+        SnapshotStore(str(tmp_path)).add(upload().drop(columns="Employee_ID"), "f1")
+
+def test_department_trend_matches_raw_stats(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    jan, feb = upload(), upload(updated="2025-02-28", eff=np.linspace(40, 90, 6))
+    store.add(jan, "f1")
+    store.add(feb, "f2")
+    trend = department_trend(store.department_moments())
+    for snap, df in (("2025-01-31", jan), ("2025-02-28", feb)):
+        at = trend[trend["Snapshot"] == pd.Timestamp(snap)].set_index("Department")
+        want = df.groupby("Department")["Efficiency_%"].agg(["mean", "std"])
+        np.testing.assert_allclose(at.loc[["A", "B"], "mean"], want["mean"], rtol=1e-6)
+        np.testing.assert_allclose(at.loc[["A", "B"], "std"], want["std"], rtol=1e-4)
+        np.testing.assert_allclose(at.loc["All", "mean"], df["Efficiency_%"].mean(), rtol=1e-6)
+
+    rolled = rolling_stats(trend, window=2)
+    a = rolled[rolled["Department"] == "A"]
+    assert np.isnan(a["mean_change"].iloc[0])
+    np.testing.assert_allclose(a["mean_change"].iloc[1], a["mean"].iloc[1] - a["mean"].iloc[0])
+    np.testing.assert_allclose(a["mean_roll_mean"].iloc[1], a["mean"].mean())
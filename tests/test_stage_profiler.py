@@ -0,0 +1,150 @@
+import gc
+import json
+import threading
+import tracemalloc
+
+import pytest
+
+import stage_profiler
+from stage_profiler import StageProfiler, aggregate_stages, main, read_log, tracing_sessions
+
+@pytest.fixture(autouse=True)
+def no_leases():
+    yield
+    with stage_profiler._trace_lock:
+        stage_profiler._trace_leases.clear()
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+def test_disabled_is_a_no_op(tmp_path):
+    prof = StageProfiler(log_path=str(tmp_path / "p.jsonl"))
+    prof.begin()
+    prof.mark("load")
+    assert prof.end() is None
+    with prof.run("chart"):
+        pass
+    assert not prof.history and not (tmp_path / "p.jsonl").exists()
+
+def test_checkpoints_record_stages_and_log(tmp_path):
+    log = tmp_path / "p.jsonl"
+    prof = StageProfiler(log_path=str(log))
+    prof.configure(True)
+    prof.begin(rows=10)
+    prof.mark("load")
+    prof.mark("charts")
+    prof.annotate(source="upload")
+    rec = prof.end()
+    assert rec["kind"] == "script" and rec["rows"] == 10 and rec["source"] == "upload"
+    assert [s["stage"] for s in rec["stages"]] == ["load", "charts"]
+    assert all(s["peak_mb"] is None and s["wall_ms"] >= 0 for s in rec["stages"])
+    assert list(prof.history) == [rec]
+    assert read_log(str(log)) == [json.loads(json.dumps(rec))]
+
+def test_unfinished_run_is_discarded():
+    prof = StageProfiler()
+    prof.configure(True)
+    prof.begin()
+    prof.mark("load")  # cut short by st.stop
+    prof.begin()
+    prof.mark("charts")
+    assert [s["stage"] for s in prof.end()["stages"]] == ["charts"]
+
+def test_run_inside_active_run_is_folded_in():
+    prof = StageProfiler()
+    prof.configure(True)
+    prof.begin()
+    prof.mark("charts")
+    with prof.run("chart"):
+        pass
+    assert not prof.history
+    prof.end()
+    with prof.run("chart"):
+        pass
+    assert prof.history[-1]["kind"] == "fragment:chart"
+    assert [s["stage"] for s in prof.history[-1]["stages"]] == ["chart"]
+
+def test_run_from_another_thread_is_standalone():
+    prof = StageProfiler()
+    prof.configure(True)
+    prof.begin()
+    prof.mark("charts")
+
+    def download():
+        with prof.run("export", kind="download"):
+            pass
+    t = threading.Thread(target=download)
+    t.start()
+    t.join()
+    assert prof.history[-1]["kind"] == "download"
+
+def test_memory_tracing_records_peak():
+    prof = StageProfiler()
+    prof.configure(True, trace_memory=True)
+    assert tracemalloc.is_tracing() and tracing_sessions() == 1
+    prof.begin()
+    prof.mark("alloc")
+    block = bytearray(4 * 1024 * 1024)
+    del block
+    stage = prof.end()["stages"][0]
+    assert stage["peak_mb"] >= 4 and stage["net_mb"] < 1 and stage["overlap"] is False
+
+def test_tracing_needs_profiling_enabled():
+    prof = StageProfiler()
+    prof.configure(False, trace_memory=True)
+    assert not prof.trace_memory and not tracemalloc.is_tracing()
+
+def test_lease_released_when_turned_off_or_collected():
+    a, b = StageProfiler(), StageProfiler()
+    a.configure(True, trace_memory=True)
+    b.configure(True, trace_memory=True)
+    assert tracing_sessions() == 2
+    a.configure(True, trace_memory=False)
+    assert tracing_sessions() == 1 and tracemalloc.is_tracing()
+    del b
+    gc.collect()
+    assert tracing_sessions() == 0 and not tracemalloc.is_tracing()
+
+def test_idle_leases_expire(monkeypatch):
+    stage_profiler._set_tracing("idle", True)
+    now = stage_profiler.time.monotonic()
+    monkeypatch.setattr(stage_profiler.time, "monotonic", lambda: now + stage_profiler.TRACE_IDLE_SECONDS + 1)
+    StageProfiler().configure(True)
+    assert tracing_sessions() == 0 and not tracemalloc.is_tracing()
+
+def test_overlapping_traced_stages_are_flagged():
+    a, b = StageProfiler(), StageProfiler()
+    a.configure(True, trace_memory=True)
+    b.configure(True, trace_memory=True)
+    a.begin()
+    a.mark("load")
+    b.begin()
+    b.mark("load")
+    assert b.end()["stages"][0]["overlap"] and a.end()["stages"][0]["overlap"]
+
+def test_read_log_skips_torn_lines(tmp_path):
+    log = tmp_path / "p.jsonl"
+    log.write_text('{"kind": "script", "stages": []}\n{"kind": "scr')
+    assert read_log(str(log)) == [{"kind": "script", "stages": []}]
+    assert read_log(str(tmp_path / "missing.jsonl")) == []
+
+def test_aggregate_stages():
+    records = [{"kind": "script", "stages": [{"stage": "load", "wall_ms": w, "peak_mb": p},
+                                             {"stage": "charts", "wall_ms": 1.0}]}
+               for w, p in ((10.0, 2.0), (30.0, None), (20.0, 5.0))]
+    rows = aggregate_stages(records)
+    assert [r["stage"] for r in rows] == ["load", "charts"]
+    assert rows[0] == {"kind": "script", "stage": "load", "runs": 3, "median_ms": 20.0, "p95_ms": 30.0,
+                       "max_ms": 30.0, "max_peak_mb": 5.0}
+    assert rows[1]["max_peak_mb"] is None
+
+def test_main(tmp_path, capsys):
+    log = tmp_path / "p.jsonl"
+    prof = StageProfiler(log_path=str(log))
+    prof.configure(True)
+    prof.begin()
+    prof.mark("load")
+    prof.end()
+    assert main([str(log)]) == 0
+    out = capsys.readouterr().out
+    assert out.startswith("1 runs from 1 session(s)") and "load" in out
+    assert main([]) == 2
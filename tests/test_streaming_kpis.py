@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+
+from streaming_kpis import ProgressAggregator, summarize_progress
+
+def test_chunked_summary_matches_one_shot(sample_frame):
+    whole = summarize_progress(sample_frame)
+    agg = ProgressAggregator()
+    for start in range(0, len(sample_frame), 250):
+        agg.update(sample_frame.iloc[start:start + 250])
+    chunked = agg.summary()
+    assert chunked["rows"] == whole["rows"] == len(sample_frame)
+    assert chunked["top"] == whole["top"] and chunked["low"] == whole["low"]
+    for k in ("avg_eff", "avg_att", "completion_rate"):
+        np.testing.assert_allclose(chunked[k], whole[k], rtol=1e-6)  # float32 sums in a different order
+    pd.testing.assert_series_equal(chunked["dept_attendance"].sort_index(), whole["dept_attendance"].sort_index())
+
+def test_matches_the_dashboard_kpis(sample_frame):
+    s = summarize_progress(sample_frame)
+    np.testing.assert_allclose(s["avg_eff"], sample_frame["Efficiency_%"].mean(), rtol=1e-6)
+    assert s["top"]["name"] == sample_frame.loc[sample_frame["Efficiency_%"].idxmax(), "Name"]
+    assert s["low"]["name"] == sample_frame.loc[sample_frame["Attendance_%"].idxmin(), "Name"]
+
+def test_empty_input():
+    s = ProgressAggregator().update(pd.DataFrame()).summary()
+    assert s["rows"] == 0 and s["top"]["name"] == "N/A" and s["avg_eff"] == 0.0
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from table_pager import filter_mask, filtered_positions, page_count, page_rows, sort_order
+
+def test_sort_order_matches_sort_values(sample_frame):
+    for col in ("Efficiency_%", "Name", "Department"):
+        values = sample_frame[col] if col == "Efficiency_%" else sample_frame[col].astype(str)
+        for desc in (False, True):
+            got = values.iloc[sort_order(sample_frame[col], desc)]
+            assert got.tolist() == values.sort_values(ascending=not desc).tolist()
+
+def test_numeric_nan_sorts_last():
+    s = pd.Series([2.0, np.nan, 1.0])
+    assert sort_order(s).tolist() == [2, 0, 1]
+    assert sort_order(s, descending=True).tolist() == [0, 2, 1]
+
+def test_filters_keep_sorted_order(sample_frame):
+    order = sort_order(sample_frame["Efficiency_%"], descending=True)
+    dept = str(sample_frame["Department"].iloc[0])
+    mask = filter_mask(sample_frame, departments=[dept], value_col="Attendance_%", value_range=(80, 100))
+    pos = filtered_positions(order, mask)
+    rows = sample_frame.iloc[pos]
+    assert (rows["Department"] == dept).all() and rows["Attendance_%"].between(80, 100).all()
+    assert rows["Efficiency_%"].is_monotonic_decreasing
+    assert len(pos) == int(mask.sum())
+    assert filter_mask(sample_frame) is None
+
+def test_paging(sample_frame):
+    pos = np.arange(len(sample_frame))
+    assert page_count(0, 25) == 1 and page_count(1500, 25) == 60 and page_count(1501, 25) == 61
+    last = page_rows(sample_frame, pos, 60, 25, cols=["Employee_ID"])
+    assert list(last.columns) == ["Employee_ID"] and len(last) == 25
+    assert last.index[-1] == sample_frame.index[-1]